@@ -0,0 +1,112 @@
+"""
+Benchmark: per-call sqlite3.connect vs the pooled WAL connection layer.
+
+Simulates API traffic (a mix of pet-list reads and pet inserts) from several
+threads, like uvicorn workers plus the Telegram thread, and reports
+requests/sec for both strategies.
+
+Usage (from backend/):
+    python -m benchmarks.bench_db_pool --threads 8 --requests 2000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from services.db_pool import ConnectionPool
+from services.migrations import run_migrations
+
+def _seed(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    run_migrations(conn)
+    conn.executemany(
+        "INSERT INTO pets (id, name, species, owner_name, owner_phone) VALUES (?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), f"Pet {i}", "Dog" if i % 2 else "Cat", f"Owner {i}", f"080{i:08d}") for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+def _request(conn, i: int):
+    if i % 5 == 0:
+        conn.execute(
+            "INSERT INTO pets (id, name, species, owner_name, owner_phone) VALUES (?, ?, ?, ?, ?)",
+            (str(uuid.uuid4()), "Bench", "Dog", "Bench Owner", "08000000000")
+        )
+    else:
+        conn.execute("SELECT * FROM pets ORDER BY created_at DESC LIMIT 50").fetchall()
+
+def _per_call(path: str):
+    def handle(i):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            _request(conn, i)
+            conn.commit()
+        finally:
+            conn.close()
+    return handle, lambda: None
+
+def _pooled(path: str, size: int):
+    pool = ConnectionPool(path, size=size)
+    def handle(i):
+        with pool.connection() as conn:
+            _request(conn, i)
+    return handle, pool.close
+
+def _run(handle, threads: int, requests: int):
+    errors = []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            try:
+                handle(i)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label in ("per-call connect", "pooled WAL"):
+            path = os.path.join(tmp, f"{label.replace(' ', '_')}.db")
+            _seed(path, args.rows)
+            if label == "pooled WAL":
+                handle, close = _pooled(path, args.threads)
+            else:
+                handle, close = _per_call(path)
+            results[label] = _run(handle, args.threads, args.requests)
+            close()
+
+    print(f"{'strategy':<18} {'req/s':>10} {'errors':>8}")
+    for label, (rps, errors) in results.items():
+        print(f"{label:<18} {rps:>10.0f} {errors:>8}")
+    base = results["per-call connect"][0]
+    print(f"speedup: {results['pooled WAL'][0] / base:.1f}x")
+
+if __name__ == "__main__":
+    main()
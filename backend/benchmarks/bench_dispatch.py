@@ -0,0 +1,71 @@
+"""
+Benchmark: one-at-a-time sends vs the bulk dispatcher, against the stub.
+
+Starts benchmarks.stub_kapso in-process and reports messages/sec for
+1) sequential send_whatsapp_reminder calls (one at a time, as
+process_draft does), 2) the dispatcher with its token bucket set to the
+stub's limit and 3) the dispatcher over-driving the stub, so 429s and the
+backoff path show up in the metrics.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dispatch --messages 1000 --limit 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.stub_kapso import StubKapso
+
+async def _sequential(send, items) -> dict:
+    started = time.perf_counter()
+    ok = 0
+    for to, message in items:
+        ok += bool((await send(to, message)).get("success"))
+    elapsed = time.perf_counter() - started
+    return {"sent": ok, "elapsedSec": round(elapsed, 3), "messagesPerSec": round(len(items) / elapsed, 2)}
+
+async def _dispatched(items, rate, concurrency) -> dict:
+    from services.dispatcher import Dispatcher
+
+    dispatcher = Dispatcher(rate=rate, burst=max(1, int(rate)), concurrency=concurrency)
+    await dispatcher.dispatch(items)
+    return dispatcher.metrics.snapshot()
+
+async def main(args):
+    stub = StubKapso(args.limit, args.latency)
+    server = await stub.start()
+    port = server.sockets[0].getsockname()[1]
+    os.environ.update({
+        "KAPSO_BASE_URL": f"http://127.0.0.1:{port}",
+        "KAPSO_API_KEY": "stub-key",
+        "KAPSO_PHONE_NUMBER_ID": "1000000",
+        "DISPATCH_BACKOFF_BASE_SEC": "0.1",
+    })
+    # Imported after the env is pointed at the stub
+    import services.kapso as kapso
+
+    items = [(f"+23480{i:08d}", f"Hello owner {i}, Rex is due!") for i in range(args.messages)]
+    baseline = items[:min(len(items), args.baseline)]
+
+    async with server:
+        print(f"Stub on :{port}, limit {args.limit}/s, latency {args.latency * 1000:.0f}ms, {len(items)} messages\n")
+        seq = await _sequential(kapso.send_whatsapp_reminder, baseline)
+        print(f"sequential ({len(baseline)} msgs)   {seq}")
+        stub.rejected = 0
+        matched = await _dispatched(items, args.limit, args.concurrency)
+        print(f"dispatcher @ {args.limit:g}/s       {matched}")
+        over = await _dispatched(items, args.limit * 2, args.concurrency)
+        print(f"dispatcher @ {args.limit * 2:g}/s (2x)  {over}")
+        await kapso.close_client()
+        print(f"\nspeedup vs sequential: {matched['messagesPerSec'] / seq['messagesPerSec']:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--baseline", type=int, default=100, help="messages for the sequential run")
+    parser.add_argument("--limit", type=float, default=200, help="stub requests/sec before 429s")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""
+Load test: cheap-request latency while heavy queries run.
+
+Measures how long a trivial coroutine (standing in for /api/health) waits to
+be scheduled while heavy SQLite queries run either inline on the event loop
+(the old behaviour) or through services.async_db.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_loop --rows 200000 --heavy 8
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+
+HEAVY_QUERY = """
+    SELECT species, COUNT(*), MAX(length(owner_name || name))
+    FROM pets WHERE owner_phone LIKE '%7%' GROUP BY species
+"""
+
+def _seed(path: str, rows: int):
+    from services.migrations import run_migrations
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    run_migrations(conn)
+    conn.executemany(
+        "INSERT INTO pets (id, name, species, owner_name, owner_phone) VALUES (?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), f"Pet {i}", ("Dog", "Cat", "Bird")[i % 3], f"Owner {i}", f"080{i:08d}") for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def _probe(stop: asyncio.Event, interval: float, samples: list):
+    """Schedule a cheap 'request' every interval and record its wait time"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+async def _scenario(mode: str, path: str, heavy: int) -> list:
+    from services.async_db import fetch_all
+
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, 0.002, samples))
+    await asyncio.sleep(0.05)
+
+    if mode == "inline":
+        conn = sqlite3.connect(path)
+        for _ in range(heavy):
+            conn.execute(HEAVY_QUERY).fetchall()
+            await asyncio.sleep(0)
+        conn.close()
+    elif mode == "async_db":
+        await asyncio.gather(*(fetch_all(HEAVY_QUERY) for _ in range(heavy)))
+    else:
+        await asyncio.sleep(0.5)
+
+    stop.set()
+    await probe
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--heavy", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        os.environ["KIZUNA_DB_PATH"] = path
+        _seed(path, args.rows)
+
+        print(f"{'scenario':<10} {'probes':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for mode in ("idle", "inline", "async_db"):
+            samples = asyncio.run(_scenario(mode, path, args.heavy))
+            print(
+                f"{mode:<10} {len(samples):>7} {statistics.median(samples):>8.2f} "
+                f"{_percentile(samples, 99):>8.2f} {max(samples):>8.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
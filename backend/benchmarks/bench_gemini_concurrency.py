@@ -0,0 +1,68 @@
+"""
+Benchmark: concurrent /api/reminders/generate calls, inline vs executor.
+
+Replaces the Gemini model with a fake whose generate_content blocks for
+``--latency`` seconds, then fires ``--requests`` concurrent requests at the
+app in-process. "inline" reproduces the old behaviour (the blocking call
+made directly inside the async route), "executor" is services.gemini.generate.
+With the executor the wall time is ~latency * ceil(requests / GEMINI_MAX_CONCURRENCY)
+instead of ~latency * requests.
+
+Usage (from backend/):
+    python -m benchmarks.bench_gemini_concurrency --requests 10 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, contents, **kwargs):
+        time.sleep(self.latency)
+        return FakeResponse("Hi! Rex is due for a checkup 🐾")
+
+async def _fire(app, count: int) -> float:
+    body = {"petName": "Rex", "ownerName": "Ada", "clinicName": "Kizuna", "type": "checkup", "bookingUrl": "https://x"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/api/reminders/generate", json=body) for _ in range(count)))
+        elapsed = time.perf_counter() - started
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+async def main(args):
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    from main import app
+    from services import gemini
+
+    fake = FakeModel(args.latency)
+    gemini.get_model = lambda *a, **k: fake
+
+    async def inline_generate(contents, **kwargs):
+        return fake.generate_content(contents).text
+
+    executor_generate = gemini.generate
+    print(f"{args.requests} concurrent requests, {args.latency * 1000:.0f}ms per Gemini call, "
+          f"GEMINI_MAX_CONCURRENCY={gemini.MAX_CONCURRENCY}\n")
+    for label, generate in (("inline", inline_generate), ("executor", executor_generate)):
+        gemini.generate = generate
+        elapsed = await _fire(app, args.requests)
+        print(f"{label:<9} wall {elapsed:.2f}s  ({args.requests / elapsed:.1f} req/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Benchmark: fetching and serializing a large /api/pets page.
+
+Seeds ``--rows`` pets and renders all of them three ways:
+
+  legacy   sqlite3.Row -> dict -> map_pet -> JSONResponse (jsonable_encoder + json)
+  mapped   sqlite3.Row -> dict -> map_pet -> fast_json.dumps
+  aliased  build_pets_query aliases -> fetch_records -> fast_json.dumps (what /api/pets does)
+
+and reports fetch and serialize time separately (best of ``--repeat``).
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_response --rows 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+def _seed(count: int, seed: int = 7):
+    from services.sqlite_db import db_connection
+
+    rng = random.Random(seed)
+    rows = [
+        (
+            str(uuid.uuid4()), f"Pet {i}", rng.choice(("Dog", "Cat")), rng.choice(("Boerboel", "Siamese", "Mixed")),
+            f"Owner {i}", f"+234803{rng.randrange(10**7):07d}",
+            f"2026-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}" if rng.random() < 0.8 else None,
+        )
+        for i in range(count)
+    ]
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO pets (id, name, species, breed, owner_name, owner_phone, next_vaccination_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+def _best(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+def main(args):
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from main import DEFAULT_PET_FIELDS, PET_CURSOR_COLUMNS, build_pets_query, map_pet
+    from services import fast_json
+    from services.sqlite_db import db_connection, init_db
+
+    init_db()
+    _seed(args.rows)
+    print(f"seeded {args.rows:,} pets; encoder: {'orjson' if fast_json.orjson else 'stdlib json'}\n")
+
+    query, params = build_pets_query(DEFAULT_PET_FIELDS, args.rows)
+    legacy_query = "SELECT * FROM pets ORDER BY created_at DESC, id DESC LIMIT ?"
+
+    with db_connection() as conn:
+        fetch_rows_ms, rows = _best(lambda: [dict(r) for r in conn.execute(legacy_query, (args.rows,)).fetchall()], args.repeat)
+        map_ms, mapped = _best(lambda: [map_pet(r) for r in rows], args.repeat)
+        fetch_alias_ms, (records, _) = _best(
+            lambda: fast_json.fetch_records(conn, query, params, PET_CURSOR_COLUMNS), args.repeat
+        )
+
+    legacy_ms, legacy_body = _best(lambda: JSONResponse(jsonable_encoder(mapped)).body, args.repeat)
+    mapped_ms, _ = _best(lambda: fast_json.dumps(mapped), args.repeat)
+    aliased_ms, aliased_body = _best(lambda: fast_json.dumps(records), args.repeat)
+    assert mapped == records, "aliased rows differ from map_pet output"
+
+    print(f"{'path':<9} {'fetch ms':>9} {'map ms':>8} {'encode ms':>10} {'total ms':>9} {'body MB':>8}")
+    for name, fetch_ms, mapping_ms, encode_ms, body in (
+        ("legacy", fetch_rows_ms, map_ms, legacy_ms, legacy_body),
+        ("mapped", fetch_rows_ms, map_ms, mapped_ms, legacy_body),
+        ("aliased", fetch_alias_ms, 0.0, aliased_ms, aliased_body),
+    ):
+        total = fetch_ms + mapping_ms + encode_ms
+        print(f"{name:<9} {fetch_ms:>9.1f} {mapping_ms:>8.1f} {encode_ms:>10.1f} {total:>9.1f} {len(body) / 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""
+Benchmark: a fresh httpx.AsyncClient per message vs the shared pooled client.
+
+Runs against the in-process benchmarks.stub_kapso (rate limit off) and
+reports per-message latency (p50/p95) and sends/sec, sequentially and with
+``--concurrency`` sends in flight. The stub speaks plain HTTP, so the gap
+shown is TCP setup + client construction only; against api.kapso.ai each
+fresh client also pays a TLS handshake.
+
+Usage (from backend/):
+    python -m benchmarks.bench_kapso_client --messages 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.stub_kapso import StubKapso
+
+async def _run(send, count: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await send(f"+23480{i:08d}", "Hello from the benchmark")
+            latencies.append(time.perf_counter() - started)
+            assert result.get("success"), result
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50Ms": round(statistics.median(latencies) * 1000, 2),
+        "p95Ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "sendsPerSec": round(count / elapsed, 1),
+    }
+
+async def main(args):
+    stub = StubKapso(limit=0, latency=args.latency)
+    server = await stub.start()
+    os.environ.update({
+        "KAPSO_BASE_URL": f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}",
+        "KAPSO_API_KEY": "stub-key",
+        "KAPSO_PHONE_NUMBER_ID": "1000000",
+        "KAPSO_MAX_CONNECTIONS": str(args.concurrency),
+    })
+    # Imported after the env is pointed at the stub
+    from services import kapso
+
+    async def per_call(to, message):
+        async with httpx.AsyncClient() as client:
+            return await kapso.send_whatsapp_reminder(to, message, client=client)
+
+    async with server:
+        print(f"{args.messages} messages, stub latency {args.latency * 1000:.0f}ms\n")
+        for concurrency in (1, args.concurrency):
+            fresh = await _run(per_call, args.messages, concurrency)
+            pooled = await _run(kapso.send_whatsapp_reminder, args.messages, concurrency)
+            print(f"concurrency {concurrency:>3}  per-call client {fresh}")
+            print(f"                 pooled client   {pooled}")
+        await kapso.close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub seconds per request")
+    asyncio.run(main(parser.parse_args()))
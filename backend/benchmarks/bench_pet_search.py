@@ -0,0 +1,90 @@
+"""
+Benchmark: /api/pets/search queries against a large patient table.
+
+Seeds ``--pets`` pets through the normal INSERT path (so the FTS triggers
+do the indexing), then times services.search.search_pets for a mix of
+full names, short prefixes, owner + pet pairs, phone prefixes and
+medical-history words, reporting p50/p95/max per query.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pet_search --pets 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+PET_NAMES = [
+    "Rex", "Bella", "Max", "Luna", "Bingo", "Fluffy", "Simba", "Coco", "Rocky", "Daisy", "Tiger", "Bruno",
+    "Lucky", "Snowy", "Oscar", "Milo", "Nala", "Zeus", "Bobby", "Princess", "Shadow", "Ginger", "Pepper", "Toby",
+    "Jack", "Lola", "Buddy", "Cleo", "Duke", "Kiki", "Leo", "Molly", "Oreo", "Peanut", "Rambo", "Sasha",
+]
+FIRST_NAMES = [
+    "Ada", "Samuel", "Amaka", "Chidi", "Tunde", "Ngozi", "Bola", "Emeka", "Funmi", "Kemi", "Ifeanyi", "Zainab",
+    "Yemi", "Segun", "Chioma", "Musa", "Aisha", "Obinna", "Tope", "Uche", "Bisi", "Kunle", "Nkechi", "Femi",
+]
+LAST_NAMES = [
+    "Okafor", "Adeyemi", "Balogun", "Eze", "Nwosu", "Okonkwo", "Bello", "Ibrahim", "Adebayo", "Obi",
+    "Olawale", "Chukwu", "Danjuma", "Ogunleye", "Nnamdi", "Afolabi", "Lawal", "Onyeka", "Babatunde", "Uzor",
+]
+BREEDS = ["Boerboel", "German Shepherd", "Siamese", "Persian", "Lhasa Apso", "Rottweiler", "Mixed", "Unknown"]
+NOTES = ["Rabies vaccine", "Deworming", "Mild fever", "Skin allergy", "Dental cleaning", "Limping, x-ray", "Annual checkup"]
+
+QUERIES = ["Bingo", "bi", "b", "Okafor", "ada oka", "rex adeyemi", "0801234", "08031234567", "boerboel", "fever", "zzzz"]
+
+def _seed(count: int, seed: int = 7):
+    from services.sqlite_db import db_connection
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for start in range(0, count, 50_000):
+        rows = []
+        for i in range(start, min(start + 50_000, count)):
+            name = rng.choice(PET_NAMES) if rng.random() < 0.9 else f"{rng.choice(PET_NAMES)} {rng.choice(PET_NAMES)}"
+            history = [{"date": "2026-01-01", "note": rng.choice(NOTES)}] if rng.random() < 0.3 else []
+            rows.append((
+                str(uuid.uuid4()), name, "Dog",
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"+234{rng.choice(('801', '803', '806', '809'))}{rng.randrange(10**7):07d}",
+                rng.choice(BREEDS), json.dumps(history),
+            ))
+        with db_connection() as conn:
+            conn.executemany(
+                "INSERT INTO pets (id, name, species, owner_name, owner_phone, breed, medical_history) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    return time.perf_counter() - started
+
+def main(args):
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    from services.search import search_pets
+    from services.sqlite_db import db_connection, init_db
+
+    init_db()
+    seeded = _seed(args.pets)
+    print(f"seeded {args.pets} pets (FTS triggers included) in {seeded:.1f}s "
+          f"({args.pets / seeded:,.0f} rows/s)\n")
+
+    columns = ["id", "name", "owner_name", "owner_phone", "breed", "next_vaccination_date"]
+    print(f"{'query':<14} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    with db_connection() as conn:
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                hits = search_pets(conn, query, columns, args.limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{query:<14} {len(hits):>5} {statistics.median(timings):>8.2f} {p95:>8.2f} {timings[-1]:>8.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pets", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+"""
+Benchmark: /api/reminders/generate-batch against a fake structured-output model.
+
+Seeds ``--pets`` pets due within two weeks, replaces the Gemini model with a
+fake that answers each batch after ``--latency`` seconds (dropping every
+``--bad-every``-th entry to exercise the template fallback), and reports
+LLM round trips and wall time against one call per pet.
+
+Usage (from backend/):
+    python -m benchmarks.bench_reminder_batch --pets 500 --batch-size 25 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+
+import httpx
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeBatchModel:
+    def __init__(self, latency: float, bad_every: int):
+        self.latency = latency
+        self.bad_every = bad_every
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        entries = []
+        for ref, pet, owner in re.findall(r"(\d+)\. pet: (.+?) \(.*?\), owner: (.+)", contents):
+            if self.bad_every and int(ref) % self.bad_every == 0:
+                continue
+            entries.append({"ref": int(ref), "message": f"Hi {owner}! {pet} is due for a checkup 🐾"})
+        return FakeResponse(json.dumps(entries))
+
+def _seed(count: int):
+    from services.dates import due_window
+    from services.sqlite_db import db_connection
+
+    due = due_window(7)[1]
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO pets (id, name, species, owner_name, owner_phone, next_vaccination_date) VALUES (?, ?, ?, ?, ?, ?)",
+            [(str(uuid.uuid4()), f"Pet {i}", "Dog", f"Owner {i}", f"+23480{i:08d}", due) for i in range(count)]
+        )
+
+async def main(args):
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    from main import app
+    from services import gemini
+    from services.sqlite_db import init_db
+
+    init_db()
+    _seed(args.pets)
+    fake = FakeBatchModel(args.latency, args.bad_every)
+    gemini.get_model = lambda *a, **k: fake
+
+    body = {"clinicName": "Kizuna", "type": "vaccination", "bookingUrl": "https://book.example",
+            "dueWithin": 14, "batchSize": args.batch_size, "limit": args.pets}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        result = (await client.post("/api/reminders/generate-batch", json=body)).json()
+        elapsed = time.perf_counter() - started
+
+    print(f"{result}")
+    print(f"batched:  {fake.calls} LLM calls, wall {elapsed:.2f}s")
+    print(f"per pet:  {args.pets} LLM calls, ~{args.pets * args.latency:.0f}s sequential "
+          f"({args.pets / max(fake.calls, 1):.0f}x more round trips)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pets", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--bad-every", type=int, default=10, help="drop every Nth entry (0 = none)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""
+Benchmark: generate_reminder latency with the two-tier response cache.
+
+Uses a fake Gemini model that takes ``--latency`` seconds and returns a
+placeholder template. Generates reminders for ``--pets`` different pets of
+one clinic (one miss, then memory hits), then drops the in-memory tier to
+simulate a restart and repeats (SQLite tier hits).
+
+Usage (from backend/):
+    python -m benchmarks.bench_response_cache --pets 200 --latency 0.8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+class FakeResponse:
+    text = "Hi {owner_name}! 🐾 {pet_name} is due for a checkup. Book: https://book.example"
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse()
+
+async def _timed(pets: int, gemini) -> list:
+    latencies = []
+    for i in range(pets):
+        started = time.perf_counter()
+        message = await gemini.generate_reminder(f"Pet {i}", f"Owner {i}", "Kizuna Vet", "checkup", "https://book.example")
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert f"Pet {i}" in message
+    return latencies
+
+def _report(label: str, latencies: list):
+    print(f"{label:<22} first {latencies[0]:8.2f}ms  p50 {statistics.median(latencies):6.3f}ms  "
+          f"max(rest) {max(latencies[1:] or [0]):6.3f}ms")
+
+async def main(args):
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    from services.sqlite_db import init_db
+    from services import gemini
+    from services.response_cache import response_cache
+
+    init_db()
+    fake = FakeModel(args.latency)
+    gemini.get_model = lambda *a, **k: fake
+
+    _report("cold + memory hits", await _timed(args.pets, gemini))
+    response_cache.clear_memory()
+    _report("after restart (disk)", await _timed(args.pets, gemini))
+    print(f"\nGemini calls: {fake.calls} for {args.pets * 2} reminders; cache {response_cache.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pets", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.8)
+    asyncio.run(main(parser.parse_args()))
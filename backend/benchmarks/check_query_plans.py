@@ -0,0 +1,134 @@
+"""
+Query-plan check: every query issued by main.py must use an index.
+
+Runs EXPLAIN QUERY PLAN for each statement against a freshly migrated
+database and fails if any plan contains a full table scan, except for the
+statements listed in INTENTIONAL_SCANS. Statements come from the SQL
+constants and builders the app itself runs, never from copies, so the
+check can't drift from production. tests/test_query_plans.py runs it with
+the test suite.
+
+Usage (from backend/):
+    python -m benchmarks.check_query_plans
+"""
+
+import re
+import sqlite3
+import sys
+
+# Queries that must visit every row by design (or hit a tiny table)
+INTENTIONAL_SCANS = {
+    "campaign: All Patients",  # COUNT over every pet, once per campaign
+    "generate_auto_wishes",
+    "get_settings",
+    "list_pet_merges",  # walks the rowid backwards and stops at LIMIT
+}
+
+# FTS5 MATCH lookups show up as "SCAN pets_fts VIRTUAL TABLE INDEX n:M...";
+# "SCAN CONSTANT ROW" is a SELECT without FROM
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)(?!.*(USING (COVERING )?INDEX|VIRTUAL TABLE INDEX \d+:M))")
+
+# Trigger bodies refer to the written row as new.<column>; plans take a parameter there
+TRIGGER_ROW = re.compile(r"\b(?:new|old)\.\w+")
+
+def collect_queries():
+    """(label, sql, params) for every statement main.py runs"""
+    from main import (
+        AUTO_WISHES_QUERY, CAMPAIGNS_QUERY, DEFAULT_PET_FIELDS, DELETE_PET_SQL, DRAFTS_QUERY, OUTBOX_QUERY,
+        PET_MERGES_QUERY, build_pets_query,
+    )
+    from services.campaigns import LAST_PET_SQL, WINDOW_END_SQL, fan_out_batch_sql, recipients_sql, target_filter
+    from services.config import SETTINGS_SQL
+    from services.due_reminders import INSERT_SQL as DUE_INSERT_SQL, KINDS, NEWEST_PET_SQL, new_pets_sql, window_sql
+    from services.http_cache import versions_sql
+    from services.migrations import CONVERSION_SQL
+    from services.outbox import CLAIM_SQL, ENQUEUE_SQL, EXPIRE_LEASES_SQL, OPEN_DRAFT, REQUEUE_DRAFT_SQL
+    from services.pet_store import UPSERT_SQL, pet_row
+    from services.reminders import DUE_PETS_SQL, pets_by_id_sql
+    from services.retention import FINAL_STATUSES, FINALIZED_BATCH_SQL, archived_drafts_query
+    from services.search import CANDIDATES_SQL, pets_by_search_rowid_sql
+    from services.stats import COUNTERS, COUNTERS_SQL, DUE_BETWEEN, OVERDUE, due_count_sql
+
+    queries = []
+    cursor = ["2026-01-01 00:00:00", "id"]
+    for label, kwargs in (
+        ("get_pets", {}),
+        ("get_pets: next page", {"cursor": cursor}),
+        ("get_pets: species", {"species": "Dog", "cursor": cursor}),
+        ("get_pets: status", {"status": "Overdue", "cursor": cursor}),
+        ("get_pets: due range", {"due_from": "2026-01-01", "due_to": "2026-01-31"}),
+    ):
+        sql, params = build_pets_query(DEFAULT_PET_FIELDS, 101, **kwargs)
+        queries.append((label, sql, params))
+
+    for target in ("All Patients", "Dogs Only", "Cats Only", "Overdue Patients", "Due This Month", "Due in 14 Days"):
+        where, params = target_filter(target)
+        queries.append((f"campaign: {target}", recipients_sql(where), params))
+        window = ["msg", "id", "2026-01-01 00:00:00", "a", "2026-02-01 00:00:00", "b", *params]
+        queries.append((f"campaign batch: {target}", fan_out_batch_sql(where), window))
+
+    queries += [
+        ("campaign: window end", WINDOW_END_SQL, ["2026-01-01 00:00:00", "a", 4999]),
+        ("campaign: last pet", LAST_PET_SQL, []),
+        ("delete_pet", DELETE_PET_SQL, ["id"]),
+        ("list_campaigns", CAMPAIGNS_QUERY, []),
+        ("get_all_drafts", DRAFTS_QUERY, []),
+        ("process_draft: requeue", REQUEUE_DRAFT_SQL, [0, "id", "id"]),
+        ("process_draft: enqueue", ENQUEUE_SQL.format(where=OPEN_DRAFT), ["id"]),
+        ("send_campaign: enqueue",
+         ENQUEUE_SQL.format(where="d.campaign_id = ? AND d.status = 'pending_review'"), ["id"]),
+        ("reminder batch: due pets", DUE_PETS_SQL, ["2026-01-01", "2026-01-14", 1000]),
+        ("reminder batch: pet ids", pets_by_id_sql(2), ["a", "b"]),
+        ("outbox: expire leases", EXPIRE_LEASES_SQL, [0]),
+        ("outbox: claim", CLAIM_SQL, [0, 0, 200]),
+        ("outbox: dead letters", OUTBOX_QUERY, ["dead", 100]),
+        ("pet upsert", UPSERT_SQL, list(pet_row({"name": "Rex", "ownerPhone": "+2348012345678"}))),
+        ("search: candidates", CANDIDATES_SQL, ['"rex"*', 200]),
+        ("search: pets by rowid", pets_by_search_rowid_sql(["id", "name"], 2), [1, 2]),
+        ("stats: counters", COUNTERS_SQL, list(COUNTERS)),
+        ("stats: overdue", due_count_sql(OVERDUE), ["2026-01-01"]),
+        ("stats: due window", due_count_sql(DUE_BETWEEN), ["2026-01-01", "2026-01-31"]),
+        ("http cache: versions", versions_sql(2), ["drafts", "pets"]),
+        ("archive: finalized batch", FINALIZED_BATCH_SQL, [*FINAL_STATUSES, "2026-01-01 00:00:00", 1000]),
+        ("archive: history", *archived_drafts_query(101, cursor=cursor)),
+        ("archive: pet history", *archived_drafts_query(101, pet_id="id", cursor=cursor)),
+        ("due reminders: insert", DUE_INSERT_SQL, ["d", "id", "vaccination", "msg", "id", "vaccination"]),
+        ("due reminders: newest pet", NEWEST_PET_SQL, []),
+        ("list_pet_merges", PET_MERGES_QUERY, [100]),
+        ("generate_auto_wishes", AUTO_WISHES_QUERY, []),
+        ("get_settings", SETTINGS_SQL, []),
+    ]
+    for table in ("drafts", "drafts_archive"):
+        sql = TRIGGER_ROW.sub("?", CONVERSION_SQL.format(table=table))
+        queries.append((f"stats: conversion ({table})", sql, ["id", "2026-01-01", "2026-01-01"]))
+    for kind, (column, _) in KINDS.items():
+        queries.append((f"due reminders: {kind}", window_sql(column), ["2026-01-01", "", "2026-01-15", kind, 25]))
+        queries.append((f"due reminders: new {kind}", new_pets_sql(column),
+                        ["2026-01-01 00:00:00", "a", "2026-01-02 00:00:00", "b", "2026-01-01", "2026-01-15", kind, 25]))
+    return queries
+
+def explain_all(conn) -> list:
+    """(label, plan steps, ok) for every collected query on a migrated connection"""
+    results = []
+    for label, sql, params in collect_queries():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        results.append((label, plan, not scans or label in INTENTIONAL_SCANS))
+    return results
+
+def main() -> int:
+    from services.migrations import run_migrations
+
+    conn = sqlite3.connect(":memory:")
+    run_migrations(conn)
+    failures = 0
+    for label, plan, ok in explain_all(conn):
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label:<28} {' | '.join(plan)}")
+    conn.close()
+
+    print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} fell back to a full scan")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+In-process fakes for the external services, for benchmarks.
+
+- Gemini: ``services.gemini.get_model`` returns a FakeGeminiModel whose
+  blocking generate_content sleeps ``latency`` seconds (on the Gemini
+  executor, like the SDK) and answers each prompt kind with well-formed
+  output: reminder templates, structured batch reminders, card / voice /
+  text extractions and analytics summaries.
+- Kapso: ``services.kapso.build_client`` returns an httpx client on a
+  MockTransport, so send_whatsapp_reminder, the dispatcher and the outbox
+  worker run unchanged down to the HTTP request.
+- Telegram: FakeMessage / FakeBot / fake_update, enough of the
+  python-telegram-bot surface for the handlers and the media pipeline.
+
+Call ``install()`` before the app starts.
+"""
+
+import asyncio
+import io
+import json
+import re
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeGeminiModel:
+    def __init__(self, latency: float = 0.2, generation_config: dict = None):
+        self.latency = latency
+        self.generation_config = generation_config or {}
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        time.sleep(self.latency)
+        self.calls += 1
+        prompt = contents if isinstance(contents, str) else contents[0]
+        return FakeGeminiResponse(self._answer(prompt, contents))
+
+    def _answer(self, prompt: str, contents) -> str:
+        if self.generation_config.get("response_schema") is not None:
+            pets = re.findall(r"^\s*(\d+)\. pet: (.+?) \(", prompt, re.MULTILINE)
+            return json.dumps([
+                {"ref": int(ref), "message": f"Hi! {name} is due for a visit 🐾 Book here: https://book.vet/kizuna"}
+                for ref, name in pets
+            ])
+        if "vaccination cards" in prompt:
+            images = len(contents) - 1
+            return json.dumps([
+                {"pet_name": f"Card Pet {uuid.uuid4().hex[:6]}", "species": "Dog", "breed": "Mixed",
+                 "owner_name": "Card Owner", "owner_phone": f"+234803{uuid.uuid4().int % 10**7:07d}",
+                 "last_vaccination": "2026-01-10", "next_vaccination": "2027-01-10", "notes": None}
+                for _ in range(max(1, images))
+            ])
+        if "voice note" in prompt:
+            return json.dumps({
+                "pet_name": f"Voice Pet {uuid.uuid4().hex[:6]}", "owner_name": "Voice Owner",
+                "owner_phone": f"+234806{uuid.uuid4().int % 10**7:07d}", "species": "Cat",
+                "action": "add_pet", "details": "New patient",
+            })
+        if "Extract all pet and owner information" in prompt:
+            lines = [line for line in prompt.split('"""')[1].splitlines() if line.strip()]
+            return json.dumps([
+                {"name": f"Text Pet {uuid.uuid4().hex[:6]}", "ownerName": "Text Owner",
+                 "ownerPhone": f"+234809{uuid.uuid4().int % 10**7:07d}", "species": "Dog", "breed": "Mixed",
+                 "age": "2", "status": "Healthy", "nextVaccinationDate": "2027-02-01"}
+                for _ in lines
+            ])
+        if "Summarize these veterinary clinic performance stats" in prompt:
+            return "Reminders are converting well. Follow up on overdue patients this week to lift bookings."
+        # Reminder template; keeps the placeholders when asked to
+        return "Hi {owner_name}! {pet_name} is due for a visit 🐾 Book here: https://book.vet/kizuna"
+
+class FakeKapso:
+    """MockTransport handler answering like the WhatsApp messages endpoint"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.sent = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+        return httpx.Response(200, json={"messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]})
+
+def install(gemini_latency: float = 0.2, kapso_latency: float = 0.05) -> dict:
+    """Swap in the Gemini and Kapso fakes; returns them for counters"""
+    from services import gemini, kapso
+
+    models = {}
+
+    def get_model(name: str = gemini.GEMINI_MODEL, generation_config: dict = None):
+        key = json.dumps(generation_config, default=str, sort_keys=True)
+        if key not in models:
+            models[key] = FakeGeminiModel(gemini_latency, generation_config)
+        return models[key]
+
+    fake_kapso = FakeKapso(kapso_latency)
+
+    def build_client(config=None):
+        return httpx.AsyncClient(transport=httpx.MockTransport(fake_kapso))
+
+    gemini.get_model = get_model
+    kapso.build_client = build_client
+    return {"gemini": models, "kapso": fake_kapso}
+
+# --- Telegram ---
+
+def sample_photo() -> bytes:
+    """A 2000x1500 JPEG (so the pipeline's downscale runs) when Pillow is installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\xff\xd8\xff\xe0fake-jpeg"
+    out = io.BytesIO()
+    Image.new("RGB", (2000, 1500), (200, 180, 160)).save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+class FakeFile:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def download_to_memory(self, buffer):
+        buffer.write(self.data)
+
+class FakeBot:
+    def __init__(self, photo: bytes = None, voice: bytes = b"OggS fake voice note"):
+        self.photo = photo if photo is not None else sample_photo()
+        self.voice = voice
+
+    async def get_file(self, file_id: str):
+        return FakeFile(self.voice if file_id.startswith("voice") else self.photo)
+
+class FakeMessage:
+    def __init__(self, text: str = None, photo: bool = False, voice: bool = False, media_group_id: str = None):
+        self.text = text
+        self.photo = [SimpleNamespace(file_id=f"photo-{uuid.uuid4().hex}")] if photo else []
+        self.voice = SimpleNamespace(file_id=f"voice-{uuid.uuid4().hex}") if voice else None
+        self.media_group_id = media_group_id
+        self.replies = []
+        self.last_reply_at = None
+
+    async def reply_text(self, text: str, **kwargs):
+        self.replies.append(text)
+        self.last_reply_at = time.perf_counter()
+
+def fake_update(message: FakeMessage, bot: FakeBot):
+    """(update, context) pair for a handler call"""
+    return SimpleNamespace(message=message), SimpleNamespace(bot=bot)
@@ -0,0 +1,542 @@
+"""
+Load-test suite: every main.py route, Excel import, campaign fan-out and the
+Telegram handlers against a seeded SQLite dataset, with in-process fakes for
+Gemini, Kapso and Telegram (benchmarks.fakes).
+
+Per scale (``--pets``, one fresh database and one process each) it seeds
+pets plus ``--drafts-per-pet`` drafts (finalized ones older than the archive
+cutoff land in drafts_archive, as if the archiver had run), campaigns and
+dead-lettered outbox rows, starts the app's lifespan (outbox worker, Kapso
+client; the scheduler stays off), then runs each route ``--requests`` times
+at ``--concurrency`` through an in-process ASGI client and reports
+throughput and p50/p95/p99 latency. Expensive routes run a fixed handful of
+times, and a route stops early after ``--route-budget`` seconds.
+
+Results go to ``--out`` as JSON (by default benchmarks/results/, named by
+commit and scale); ``--compare`` prints the change against an earlier file.
+
+Usage (from backend/):
+    python -m benchmarks.load_suite --pets 1000 100000
+    python -m benchmarks.load_suite --pets 1000000 --requests 50 --route-budget 20
+    python -m benchmarks.load_suite --pets 1000 --only pets,drafts --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+PET_NAMES = ["Rex", "Bella", "Max", "Luna", "Bingo", "Simba", "Coco", "Rocky", "Daisy", "Tiger", "Bruno", "Milo"]
+OWNER_NAMES = ["Ada Okafor", "Samuel Eze", "Amaka Bello", "Chidi Obi", "Tunde Lawal", "Ngozi Uzor", "Zainab Musa"]
+BREEDS = ["Boerboel", "German Shepherd", "Siamese", "Persian", "Lhasa Apso", "Mixed"]
+STATUSES = ["Healthy", "Healthy", "Healthy", "Due Soon", "Overdue"]
+# Draft status mix: (status, share)
+DRAFT_MIX = [("pending_review", 0.10), ("sent", 0.55), ("rejected", 0.25), ("failed", 0.05), ("queued", 0.05)]
+DRAFT_TYPES = ["vaccination", "checkup", "campaign", "wellness_wish"]
+SEARCH_QUERIES = ["Rex", "be", "b", "Okafor", "ada oka", "0803000", "boerboel", "zzzz"]
+DRAFTS_PER_CAMPAIGN = 5
+SEED_CHUNK = 50_000
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def pet_name(i: int) -> str:
+    return f"{PET_NAMES[i % len(PET_NAMES)]} {i}"
+
+def pet_phone(i: int) -> str:
+    return f"+234803{i:07d}"
+
+def _timestamp(now: datetime, rng: random.Random, max_days: int) -> str:
+    return (now - timedelta(seconds=rng.randrange(max_days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+# --- Seeding ---
+
+def seed(args) -> dict:
+    """Fill the database; returns ids and cursors the scenarios draw from"""
+    from services.pagination import encode_cursor
+    from services.pet_store import RECORD_COLUMNS, dedup_key
+    from services.retention import archive_cutoff
+    from services.sqlite_db import db_connection
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    today = date.today()
+    started = time.perf_counter()
+    count = args.pets
+    pets = []  # (created_at, id)
+
+    columns = ["id", *RECORD_COLUMNS.values(), "dedup_key", "created_at"]
+    insert_pet = f"INSERT INTO pets ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    for start in range(0, count, SEED_CHUNK):
+        rows = []
+        for i in range(start, min(start + SEED_CHUNK, count)):
+            pet_id, created_at = str(uuid.uuid4()), _timestamp(now, rng, 730)
+            record = {
+                "name": pet_name(i), "species": rng.choice(("Dog", "Dog", "Cat", "Bird")), "breed": rng.choice(BREEDS),
+                "sex": rng.choice(("Male", "Female")), "color": "Brown", "age": str(rng.randrange(1, 15)),
+                "weight": f"{rng.randrange(2, 60)}kg", "ownerName": rng.choice(OWNER_NAMES), "ownerPhone": pet_phone(i),
+                "status": rng.choice(STATUSES), "birthday": None,
+                "lastVaccinationDate": (today - timedelta(days=rng.randrange(30, 400))).isoformat(),
+                "nextVaccinationDate": (today + timedelta(days=rng.randrange(-180, 365))).isoformat(),
+                "lastDewormingDate": None,
+                "lastCheckupDate": (today - timedelta(days=rng.randrange(0, 730))).isoformat(),
+            }
+            rows.append((pet_id, *(record[key] for key in RECORD_COLUMNS),
+                         dedup_key(record["name"], record["ownerPhone"]), created_at))
+            pets.append((created_at, pet_id))
+        with db_connection() as conn:
+            conn.executemany(insert_pet, rows)
+    pets_sec = time.perf_counter() - started
+
+    cutoff = archive_cutoff(now)
+    statuses, weights = zip(*DRAFT_MIX)
+    pending, archived = [], []
+    drafts_total = int(count * args.drafts_per_pet)
+    for start in range(0, drafts_total, SEED_CHUNK):
+        live_rows, archive_rows = [], []
+        for _ in range(start, min(start + SEED_CHUNK, drafts_total)):
+            pet_id = pets[rng.randrange(count)][1]
+            status = rng.choices(statuses, weights)[0]
+            row = (str(uuid.uuid4()), pet_id, rng.choice(DRAFT_TYPES), "Hi! Time for a visit 🐾", status,
+                   _timestamp(now, rng, 365))
+            if status in ("sent", "rejected") and row[5] < cutoff:
+                archive_rows.append(row)
+                archived.append((row[5], row[0]))
+            else:
+                live_rows.append(row)
+                if status == "pending_review":
+                    pending.append(row[0])
+        with db_connection() as conn:
+            conn.executemany(
+                "INSERT INTO drafts (id, pet_id, type, draft_message, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                live_rows
+            )
+            conn.executemany(
+                "INSERT INTO drafts_archive (id, pet_id, type, draft_message, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                archive_rows
+            )
+
+    campaigns = [str(uuid.uuid4()) for _ in range(max(10, args.requests))]
+    dead = []
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO campaigns (id, name, message, target_audience, status, drafts_created) VALUES (?, ?, ?, 'All Patients', 'active', ?)",
+            [(campaign_id, f"Campaign {n}", "Hi {owner_name}, {pet_name} says hello!", DRAFTS_PER_CAMPAIGN)
+             for n, campaign_id in enumerate(campaigns)]
+        )
+        conn.executemany(
+            "INSERT INTO drafts (id, pet_id, type, draft_message, status, campaign_id) VALUES (?, ?, 'campaign', 'Hello from the clinic 🐾', 'pending_review', ?)",
+            [(str(uuid.uuid4()), pets[rng.randrange(count)][1], campaign_id)
+             for campaign_id in campaigns for _ in range(DRAFTS_PER_CAMPAIGN)]
+        )
+        for n in range(args.requests):
+            dead.append(conn.execute(
+                "INSERT INTO outbox (to_phone, message, status, attempts, last_error) VALUES (?, 'Hello 🐾', 'dead', 6, 'HTTP 500') RETURNING id",
+                (pet_phone(n),)
+            ).fetchone()[0])
+        conn.executemany(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            [("clinic_name", "Kizuna Bench Clinic"), ("booking_url", "https://book.vet/kizuna"), ("ai_tone", "friendly"),
+             ("kapso_api_key", "bench-key"), ("kapso_phone_id", "bench-phone")]
+        )
+
+    rng.shuffle(pending)
+    sample = rng.sample(pets, min(count, args.requests))
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "petsPerSec": round(count / pets_sec) if pets_sec else 0,
+        "pets": count,
+        "drafts": drafts_total - len(archived) + len(campaigns) * DRAFTS_PER_CAMPAIGN,
+        "draftsPending": len(pending) + len(campaigns) * DRAFTS_PER_CAMPAIGN,
+        "draftsArchived": len(archived),
+        "campaigns": len(campaigns),
+        # Not reported: what the scenarios draw from
+        "_pet_cursors": [encode_cursor(*pet) for pet in sample],
+        "_archive_cursors": [encode_cursor(*row) for row in rng.sample(archived, min(len(archived), args.requests))],
+        "_delete_ids": [pet_id for _, pet_id in rng.sample(pets, min(count, args.requests))],
+        "_pending": pending,
+        "_campaigns": campaigns,
+        "_dead": dead,
+    }
+
+# --- Measurement ---
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of sorted ``values``"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(p / 100 * len(values)) - 1))]
+
+def summarize(latencies: list, wall: float, concurrency: int, statuses: dict = None) -> dict:
+    ordered = sorted(sec * 1000 for sec in latencies)
+    summary = {
+        "requests": len(ordered),
+        "concurrency": concurrency,
+        "wallSec": round(wall, 3),
+        "throughputRps": round(len(ordered) / wall, 1) if wall else 0.0,
+        "meanMs": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50Ms": round(percentile(ordered, 50), 2),
+        "p95Ms": round(percentile(ordered, 95), 2),
+        "p99Ms": round(percentile(ordered, 99), 2),
+        "maxMs": round(ordered[-1], 2) if ordered else 0.0,
+    }
+    if statuses is not None:
+        summary["statusCodes"] = statuses
+        summary["errors"] = sum(n for code, n in statuses.items() if not (200 <= int(code) < 300 or int(code) == 304))
+    return summary
+
+async def run_route(client, make, count: int, concurrency: int, budget: float) -> dict:
+    """Issue ``make(i)`` requests for i in range(count), ``concurrency`` at a time"""
+    latencies, statuses = [], {}
+    indexes = iter(range(count))
+    deadline = time.perf_counter() + budget
+
+    async def worker():
+        for i in indexes:
+            if time.perf_counter() > deadline:
+                break
+            method, url, kwargs = make(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    method, url, kwargs = make(0)
+    if method == "GET":
+        await client.request(method, url, **kwargs)  # Warm-up, not measured
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, count)))))
+    return summarize(latencies, time.perf_counter() - started, min(concurrency, count), statuses)
+
+def routes(ctx: dict, args) -> list:
+    """(name, request count or None for --requests, make(i) -> (method, url, kwargs))"""
+    n = args.requests
+    at = lambda items, i: items[i % len(items)] if items else "missing"
+    get = lambda url: ("GET", url, {})
+    post = lambda url, body=None: ("POST", url, {"json": body} if body is not None else {})
+
+    return [
+        ("GET /api/health", None, lambda i: get("/api/health")),
+        # Distinct cursors: each request misses the conditional-GET cache
+        ("GET /api/pets", None, lambda i: get(f"/api/pets?cursor={at(ctx['_pet_cursors'], i)}")),
+        ("GET /api/pets (304)", None, lambda i: ("GET", "/api/pets", {"headers": {"If-None-Match": ctx.get("pets_etag", "")}})),
+        ("GET /api/pets?due_within", None, lambda i: get(f"/api/pets?due_within={1 + i % 365}")),
+        ("GET /api/pets?fields", None, lambda i: get(f"/api/pets?fields=id,name,ownerPhone&limit=1000&cursor={at(ctx['_pet_cursors'], i)}")),
+        ("GET /api/pets/search", None, lambda i: get(f"/api/pets/search?q={at(SEARCH_QUERIES, i)}&limit={10 + i % 10}")),
+        ("GET /api/pets/merges", None, lambda i: get(f"/api/pets/merges?limit={1 + i % 100}")),
+        ("GET /api/campaigns", None, lambda i: get(f"/api/campaigns?_={i}")),
+        ("GET /api/campaigns/{id}", None, lambda i: get(f"/api/campaigns/{at(ctx['_campaigns'], i)}")),
+        ("GET /api/agent/drafts", None, lambda i: get(f"/api/agent/drafts?_={i}")),
+        ("GET /api/agent/drafts/archive", None, lambda i: get(f"/api/agent/drafts/archive?cursor={at(ctx['_archive_cursors'], i)}")),
+        ("GET /api/stats", None, lambda i: get("/api/stats")),
+        ("GET /api/insights", None, lambda i: get("/api/insights")),
+        ("POST /api/insights", None, lambda i: post("/api/insights", {})),
+        ("GET /api/dispatch/metrics", None, lambda i: get("/api/dispatch/metrics")),
+        ("GET /api/telegram/media-metrics", None, lambda i: get("/api/telegram/media-metrics")),
+        ("GET /api/outbox", None, lambda i: get(f"/api/outbox?status=dead&limit={1 + i % 100}")),
+        ("GET /api/http-cache", None, lambda i: get("/api/http-cache")),
+        ("GET /api/reminders/cache", None, lambda i: get("/api/reminders/cache")),
+        ("GET /api/scheduler", None, lambda i: get("/api/scheduler")),
+        ("GET /api/settings", None, lambda i: get(f"/api/settings?_={i}")),
+        ("GET /metrics", None, lambda i: get("/metrics")),
+        # Writes
+        ("POST /api/pets", None, lambda i: post("/api/pets", {
+            "name": f"New Pet {i}", "ownerName": "Load Test", "ownerPhone": f"+234802{i:07d}", "species": "Dog",
+            "nextVaccinationDate": (date.today() + timedelta(days=i % 90)).isoformat(),
+        })),
+        ("DELETE /api/pets/{id}", None, lambda i: ("DELETE", f"/api/pets/{at(ctx['_delete_ids'], i)}", {})),
+        ("POST /api/reminders/generate", None, lambda i: post("/api/reminders/generate", {
+            "petName": pet_name(i), "ownerName": at(OWNER_NAMES, i), "type": at(("vaccination", "checkup"), i),
+        })),
+        ("POST /api/reminders/send", None, lambda i: post("/api/reminders/send", {
+            "to": pet_phone(i), "message": "Hi! Time for a visit 🐾", "petId": "bench",
+        })),
+        ("POST /api/agent/process-draft", None, lambda i: post("/api/agent/process-draft", {
+            "draftId": at(ctx["_pending"], i), "approved": i % 2 == 0,
+        })),
+        ("POST /api/outbox/{id}/retry", None, lambda i: post(f"/api/outbox/{at(ctx['_dead'], i)}/retry")),
+        ("POST /api/campaigns/{id}/send", None, lambda i: post(f"/api/campaigns/{at(ctx['_campaigns'], i)}/send")),
+        ("POST /api/settings", None, lambda i: post("/api/settings", {"ai_tone": at(("friendly", "professional"), i)})),
+        ("POST /api/reminders/generate-batch", min(n, 5), lambda i: post("/api/reminders/generate-batch", {
+            "type": "vaccination", "dueWithin": 30, "limit": 200,
+        })),
+        ("POST /api/scheduler/due_reminders/run", 1, lambda i: post("/api/scheduler/due_reminders/run")),
+        ("POST /api/scheduler/archive_drafts/run", 1, lambda i: post("/api/scheduler/archive_drafts/run")),
+    ]
+
+def excel_upload(rows: int, seeded: int) -> bytes:
+    """An .xlsx of new pets, every tenth row a repeat of a seeded pet (merged on import)"""
+    from io import BytesIO
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Pet Name", "Owner Name", "Phone", "Species", "Breed", "Next Vaccination"])
+    for i in range(rows):
+        if i % 10 == 0 and seeded:
+            j = i % seeded
+            sheet.append([pet_name(j), at_owner(j), "0803" + f"{j:07d}", "Dog", "Mixed", "2027-01-15"])
+        else:
+            sheet.append([f"Import Pet {i}", at_owner(i), "0805" + f"{i:07d}", "cat", "Persian", "15/02/2027"])
+    out = BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+def at_owner(i: int) -> str:
+    return OWNER_NAMES[i % len(OWNER_NAMES)]
+
+async def run_import(client, args, seeded: int) -> tuple:
+    """POST the upload, following a background job to completion; (route summary, job summary)"""
+    data = excel_upload(args.import_rows, seeded)
+    started = time.perf_counter()
+    response = await client.post("/api/pets/import-excel", files={
+        "file": ("bench.xlsx", data, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    })
+    posted = time.perf_counter() - started
+    body = response.json()
+    job_id = body.get("jobId")
+    if job_id:
+        while body.get("status") not in ("completed", "failed"):
+            await asyncio.sleep(0.05)
+            body = (await client.get(f"/api/pets/import-jobs/{job_id}")).json()
+    elapsed = time.perf_counter() - started
+    imported = body.get("imported", body.get("count", 0))
+    return summarize([posted], posted, 1, {str(response.status_code): 1}), {
+        "rows": args.import_rows, "bytes": len(data), "background": bool(job_id), "jobId": job_id,
+        "imported": imported, "merged": body.get("merged", 0), "failed": body.get("failed", 0),
+        "seconds": round(elapsed, 3), "rowsPerSec": round(args.import_rows / elapsed) if elapsed else 0,
+    }
+
+async def run_fan_out(client) -> tuple:
+    """Create an all-patients campaign and wait for its drafts; (route summary, job summary)"""
+    started = time.perf_counter()
+    response = await client.post("/api/campaigns", json={
+        "name": "Load test", "message": "Hi {owner_name}! {pet_name} is due 🐾", "target": "All Patients",
+    })
+    posted = time.perf_counter() - started
+    campaign_id = response.json()["campaign_id"]
+    while True:
+        campaign = (await client.get(f"/api/campaigns/{campaign_id}")).json()
+        if campaign["status"] not in ("queued", "fanning_out"):
+            break
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    return summarize([posted], posted, 1, {str(response.status_code): 1}), {
+        "status": campaign["status"], "drafts": campaign["drafts_created"], "seconds": round(elapsed, 3),
+        "draftsPerSec": round(campaign["drafts_created"] / elapsed) if elapsed else 0,
+    }
+
+async def run_telegram(args) -> dict:
+    """Text batches, photos and voice notes through the bot handlers and the media pipeline"""
+    from benchmarks.fakes import FakeBot, FakeMessage, fake_update
+    from services.telegram_bot import handle_photo, handle_text, handle_voice
+    from services.telegram_media import media_pipeline
+
+    if media_pipeline.queue is None:
+        media_pipeline.start()
+    bot = FakeBot()
+    count = args.telegram_messages
+    text = "\n".join(f"{pet_name(i)}, owner Tele Owner, phone 0807{i:07d}, dog" for i in range(5))
+    results = {}
+    for name, handler, message in (
+        ("handle_text", handle_text, lambda: FakeMessage(text=text)),
+        ("handle_photo", handle_photo, lambda: FakeMessage(photo=True)),
+        ("handle_voice", handle_voice, lambda: FakeMessage(voice=True)),
+    ):
+        calls = []
+        started = time.perf_counter()
+        for _ in range(count):
+            sent = message()
+            calls.append((time.perf_counter(), sent))
+            await handler(*fake_update(sent, bot))
+        # Photo / voice handlers only enqueue; wait for the workers too
+        await media_pipeline.queue.join()
+        # Latency is until the message's last reply (the result, not the "queued" ack)
+        latencies = [sent.last_reply_at - call_started for call_started, sent in calls if sent.last_reply_at]
+        results[name] = summarize(latencies, time.perf_counter() - started, 1)
+    results["mediaPipeline"] = media_pipeline.metrics()
+    return results
+
+async def run_scale(args) -> dict:
+    os.environ["KIZUNA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["SCHEDULER_ENABLED"] = "0"
+    import httpx
+
+    from benchmarks import fakes
+    import main
+    from services import fast_json, telegram_media
+    from services.sqlite_db import init_db
+
+    installed = fakes.install(args.gemini_latency, args.kapso_latency)
+    # Never start a real bot, whatever the environment says
+    main.start_telegram_bot = lambda: None
+
+    init_db()
+    print(f"🌱 Seeding {args.pets:,} pets ...")
+    ctx = seed(args)
+    print(f"🌱 Seeded in {ctx['seconds']}s ({ctx['drafts']:,} live drafts, {ctx['draftsArchived']:,} archived)")
+
+    only = [word.strip().lower() for word in args.only.split(",")] if args.only else None
+    wanted = lambda name: not only or any(word in name.lower() for word in only)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "startedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "sqlite": sqlite3.sqlite_version,
+            "orjson": fast_json.orjson is not None,
+            "pillow": telegram_media.Image is not None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "routeBudgetSec": args.route_budget,
+            "geminiLatencyMs": args.gemini_latency * 1000,
+            "kapsoLatencyMs": args.kapso_latency * 1000,
+        },
+        "dataset": {key: value for key, value in ctx.items() if not key.startswith("_")},
+        "routes": {},
+        "jobs": {},
+    }
+
+    def record(name: str, result: dict):
+        report["routes"][name] = result
+        print(f"  {name:<42} {result['throughputRps']:>8.1f} req/s  p50 {result['p50Ms']:>8.2f}  "
+              f"p95 {result['p95Ms']:>8.2f}  p99 {result['p99Ms']:>8.2f} ms  errors {result['errors']}")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            ctx["pets_etag"] = (await client.get("/api/pets")).headers.get("etag", "")
+            for name, count, make in routes(ctx, args):
+                if not wanted(name):
+                    continue
+                record(name, await run_route(client, make, count or args.requests, args.concurrency, args.route_budget))
+
+            if wanted("import"):
+                route, job = await run_import(client, args, args.pets)
+                record("POST /api/pets/import-excel", route)
+                report["jobs"]["excelImport"] = job
+                print(f"  Excel import: {job['rows']:,} rows in {job['seconds']}s ({job['rowsPerSec']:,} rows/s)")
+                if job["jobId"]:
+                    record("GET /api/pets/import-jobs/{id}", await run_route(
+                        client, lambda i: ("GET", f"/api/pets/import-jobs/{job['jobId']}", {}),
+                        args.requests, args.concurrency, args.route_budget
+                    ))
+            if wanted("fan-out") or wanted("campaigns"):
+                route, job = await run_fan_out(client)
+                record("POST /api/campaigns", route)
+                report["jobs"]["campaignFanOut"] = job
+                print(f"  Campaign fan-out: {job['drafts']:,} drafts in {job['seconds']}s ({job['draftsPerSec']:,} drafts/s)")
+            # Last: adds a draft for every pet
+            if wanted("auto-wishes"):
+                record("POST /api/agent/generate-auto-wishes", await run_route(
+                    client, lambda i: ("POST", "/api/agent/generate-auto-wishes", {}), 1, 1, args.route_budget
+                ))
+            if wanted("telegram"):
+                report["telegram"] = await run_telegram(args)
+                for name in ("handle_text", "handle_photo", "handle_voice"):
+                    result = report["telegram"][name]
+                    print(f"  telegram {name:<33} {result['throughputRps']:>8.1f} msg/s  p50 {result['p50Ms']:>8.2f}  "
+                          f"p95 {result['p95Ms']:>8.2f} ms")
+
+            report["counters"] = {
+                "geminiCalls": sum(model.calls for model in installed["gemini"].values()),
+                "kapsoRequests": installed["kapso"].sent,
+                "httpCache": (await client.get("/api/http-cache")).json(),
+                "dispatch": (await client.get("/api/dispatch/metrics")).json(),
+            }
+    return report
+
+def compare(report: dict, baseline: dict):
+    """Print p50/p95/throughput change per route against an earlier result file"""
+    print(f"\n📊 {baseline['meta']['commit']} → {report['meta']['commit']} "
+          f"({report['dataset']['pets']:,} pets; baseline {baseline['dataset']['pets']:,})")
+    change = lambda new, old: f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+    print(f"  {'route':<42} {'p50 ms':>16} {'p95 ms':>16} {'req/s':>16}")
+    for name, new in report["routes"].items():
+        old = baseline.get("routes", {}).get(name)
+        if not old:
+            continue
+        print(f"  {name:<42} {new['p50Ms']:>9.2f} {change(new['p50Ms'], old['p50Ms']):>6} "
+              f"{new['p95Ms']:>9.2f} {change(new['p95Ms'], old['p95Ms']):>6} "
+              f"{new['throughputRps']:>9.1f} {change(new['throughputRps'], old['throughputRps']):>6}")
+
+def default_out(commit: str, pets: list) -> str:
+    scales = "-".join(str(p) for p in pets)
+    return os.path.join(RESULTS_DIR, f"load_suite-{commit}-{scales}-{datetime.now():%Y%m%d%H%M%S}.json")
+
+def main(args):
+    if len(args.pets) > 1:
+        # One process per scale: the database path and module state are per process
+        runs = []
+        for pets in args.pets:
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+                child_out = tmp.name
+            command = [sys.executable, "-m", "benchmarks.load_suite", *_child_args(args, pets, child_out)]
+            subprocess.run(command, check=True)
+            with open(child_out) as f:
+                runs.extend(json.load(f)["runs"])
+            os.remove(child_out)
+    else:
+        args.pets = args.pets[0]
+        runs = [asyncio.run(run_scale(args))]
+        args.pets = [args.pets]
+
+    out = args.out or default_out(runs[0]["meta"]["commit"], args.pets)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"runs": runs}, f, indent=2)
+    print(f"\n💾 Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {run["dataset"]["pets"]: run for run in json.load(f)["runs"]}
+        for run in runs:
+            old = baseline.get(run["dataset"]["pets"])
+            if old:
+                compare(run, old)
+
+def _child_args(args, pets: int, out: str) -> list:
+    argv = ["--pets", str(pets), "--out", out]
+    for flag, value in (
+        ("--requests", args.requests), ("--concurrency", args.concurrency), ("--route-budget", args.route_budget),
+        ("--drafts-per-pet", args.drafts_per_pet), ("--import-rows", args.import_rows),
+        ("--telegram-messages", args.telegram_messages), ("--gemini-latency", args.gemini_latency),
+        ("--kapso-latency", args.kapso_latency), ("--seed", args.seed),
+    ):
+        argv += [flag, str(value)]
+    if args.only:
+        argv += ["--only", args.only]
+    return argv
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pets", type=int, nargs="+", default=[1000], help="one or more dataset sizes")
+    parser.add_argument("--drafts-per-pet", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--route-budget", type=float, default=30.0, help="seconds per route before stopping early")
+    parser.add_argument("--import-rows", type=int, default=5000)
+    parser.add_argument("--telegram-messages", type=int, default=20)
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="fake Gemini call time (s)")
+    parser.add_argument("--kapso-latency", type=float, default=0.05, help="fake Kapso call time (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", help="comma-separated substrings of the route / job names to run")
+    parser.add_argument("--out", help="result file (default: benchmarks/results/load_suite-<commit>-<pets>-<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    main(parser.parse_args())
@@ -0,0 +1,93 @@
+"""
+Local stub of the Kapso WhatsApp messages endpoint.
+
+A minimal keep-alive HTTP/1.1 server (stdlib asyncio) that answers every
+POST with a WhatsApp-style message id after ``latency`` seconds, and with
+429 + Retry-After once more than ``limit`` requests/sec arrive, so the
+dispatcher's rate limiting and backoff can be exercised offline. A share of
+requests (``error_rate``) fails with 500 to exercise outbox retries.
+
+Usage (from backend/):
+    python -m benchmarks.stub_kapso --port 8787 --limit 80
+    KAPSO_BASE_URL=http://127.0.0.1:8787 KAPSO_API_KEY=stub KAPSO_PHONE_NUMBER_ID=1 python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+class StubKapso:
+    def __init__(self, limit: float = 80, latency: float = 0.05, error_rate: float = 0.0):
+        self.limit = limit
+        self.latency = latency
+        self.error_rate = error_rate
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def _over_limit(self) -> bool:
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        return self.limit > 0 and self._window_count > self.limit
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                if self._over_limit():
+                    self.rejected += 1
+                    status, extra = "429 Too Many Requests", "Retry-After: 1\r\n"
+                    body = json.dumps({"error": {"code": 130429, "message": "Rate limit hit"}})
+                elif random.random() < self.error_rate:
+                    self.errors += 1
+                    status, extra = "500 Internal Server Error", ""
+                    body = json.dumps({"error": {"code": 1, "message": "Stub failure"}})
+                else:
+                    self.accepted += 1
+                    await asyncio.sleep(self.latency)
+                    status, extra = "200 OK", ""
+                    body = json.dumps({"messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]})
+
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{extra}"
+                    f"Content-Length: {len(body)}\r\n\r\n{body}".encode()
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, host, port)
+        return server
+
+async def _serve(args):
+    stub = StubKapso(args.limit, args.latency, args.error_rate)
+    server = await stub.start(args.host, args.port)
+    print(f"Stub Kapso listening on http://{args.host}:{args.port} (limit {args.limit}/s, latency {args.latency}s)")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--limit", type=float, default=80, help="requests/sec before 429s (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per accepted request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    asyncio.run(_serve(parser.parse_args()))
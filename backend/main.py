@@ -6,31 +6,44 @@ Enhanced Pet Profiles & AI Service
 import os
 import uuid
 import json
+import asyncio
 from datetime import datetime
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query, Request, Response, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List
-from dotenv import load_dotenv
-
-# Load environment variables from absolute path
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ENV_PATH = os.path.join(BASE_DIR, ".env")
-if not os.path.exists(ENV_PATH):
-    print(f"🚨 CRITICAL WARNING: .env file NOT FOUND at {ENV_PATH}")
-else:
-    print(f"✅ Found .env at {ENV_PATH}")
-load_dotenv(ENV_PATH, override=True)
-
-from services.sqlite_db import init_db, get_db_connection
+
+# Loads backend/.env; imported first so every module below sees it
+from services.config import get_config, load_config, save_settings
+from services.sqlite_db import init_db, close_db
+from services.async_db import run_db, fetch_all, fetch_one, execute
+from services.pagination import encode_cursor, decode_cursor
+from services.dates import normalize_date, due_window
+from services.normalize import canonical_phone
+from services.pet_store import pet_row, upsert_pets
+from services.stats import read_stats
+from services.search import DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT, MAX_LIMIT as SEARCH_MAX_LIMIT, search_pets
+from services.importer import (
+    BACKGROUND_THRESHOLD_BYTES, get_job, import_file, new_job, save_upload, start_background_import
+)
+from services.campaigns import start_fan_out, resume_pending_fan_outs
+from services.outbox import (
+    enqueue_campaign, enqueue_draft, get_metrics as get_outbox_metrics, notify as notify_outbox,
+    retry_dead, start_worker, stop_worker
+)
 from services.gemini import generate_reminder, get_analytics_summary
-from services.kapso import send_whatsapp_reminder
+from services.response_cache import response_cache
+from services.http_cache import http_cache
+from services.fast_json import FastJSONResponse, fetch_records
+from services import metrics
+from services.reminders import draft_reminders, select_pets
+from services.retention import archived_drafts_query
+from services.scheduler import JOBS as SCHEDULER_JOBS, get_status as get_scheduler_status, run_job, start_scheduler, stop_scheduler
+from services.kapso import close_client, get_config as get_kapso_config, send_whatsapp_reminder, start_client
 from services.telegram_bot import start_telegram_bot
-
-import pandas as pd
-from fastapi import FastAPI, HTTPException, Body, UploadFile, File
-import io
+from services.telegram_media import media_pipeline
 
 # --- Models ---
 class PetRequest(BaseModel):
@@ -55,22 +68,32 @@ class DraftAction(BaseModel):
     approved: bool
     message: Optional[str] = None
 
-class InsightsRequest(BaseModel):
-    stats: dict
-
+# Clinic name, booking link and tone default to Settings
 class ReminderGenerateRequest(BaseModel):
     petName: str
     ownerName: str
-    clinicName: str
+    clinicName: Optional[str] = None
     type: str 
-    bookingUrl: str
-    tone: Optional[str] = "friendly"
+    bookingUrl: Optional[str] = None
+    tone: Optional[str] = None
 
 class ReminderSendRequest(BaseModel):
     to: str
     message: str
     petId: str
 
+class ReminderBatchRequest(BaseModel):
+    clinicName: Optional[str] = None
+    type: str
+    bookingUrl: Optional[str] = None
+    tone: Optional[str] = None
+    petIds: Optional[List[str]] = None
+    dueWithin: Optional[int] = None
+    dueFrom: Optional[str] = None
+    dueTo: Optional[str] = None
+    batchSize: Optional[int] = None
+    limit: int = 1000
+
 class CampaignRequest(BaseModel):
     name: str
     message: str
@@ -79,15 +102,23 @@ class CampaignRequest(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    load_config()
+    resume_pending_fan_outs()
     
     # Check if Kapso is configured
-    kapso_key = os.getenv("KAPSO_API_KEY")
-    if not kapso_key or kapso_key == "your_kapso_api_key_here":
-        print("⚠️ KAPSO_API_KEY is not set. WhatsApp reminders will not be sent.")
+    if get_kapso_config().error:
+        print(f"⚠️ {get_kapso_config().error}. WhatsApp reminders will not be sent.")
+    start_client()
+    start_worker()
+    start_scheduler()
     
     start_telegram_bot()
     print("🐾 Kizuna AI Agent Engine is live!")
     yield
+    await stop_scheduler()
+    await stop_worker()
+    await close_client()
+    close_db()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -97,70 +128,120 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# Outermost, so request latency includes CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.post("/api/pets/import-excel")
 async def import_excel(file: UploadFile = File(...)):
-    """Import pets from an Excel file"""
+    """Import pets from an Excel or CSV file (large files run in the background)"""
+    path, size = await asyncio.to_thread(save_upload, file.file, file.filename)
+    
+    if size > BACKGROUND_THRESHOLD_BYTES:
+        job = start_background_import(path, file.filename)
+        return JSONResponse(status_code=202, content={"success": True, "background": True, "jobId": job["jobId"], "status": job["status"]})
+    
+    job = new_job(file.filename)
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        
-        # Standardize column names (basic intelligent mapping)
-        mapping = {
-            'Pet Name': 'name', 'Pet': 'name', 'Name': 'name',
-            'Owner Name': 'ownerName', 'Owner': 'ownerName',
-            'Phone': 'ownerPhone', 'Owner Phone': 'ownerPhone', 'WhatsApp': 'ownerPhone',
-            'Species': 'species', 'Type': 'species',
-            'Breed': 'breed',
-            'Age': 'age',
-            'Next Visit': 'nextVaccinationDate', 'Next Vax': 'nextVaccinationDate'
-        }
-        
-        df = df.rename(columns=lambda x: mapping.get(x, x))
-        
-        conn = get_db_connection()
-        count = 0
-        for _, row in df.iterrows():
-            new_id = str(uuid.uuid4())
-            # Basic validation/defaults
-            name = str(row.get('name', 'Unknown'))
-            owner = str(row.get('ownerName', 'Unknown'))
-            phone = str(row.get('ownerPhone', 'Unknown'))
-            
-            conn.execute(
-                """INSERT INTO pets (id, name, species, breed, age, owner_name, owner_phone, status, next_vaccination_date) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (new_id, name, row.get('species', 'Dog'), row.get('breed', 'Unknown'), str(row.get('age', 'Unknown')), owner, phone, 'Healthy', str(row.get('nextVaccinationDate', '')))
-            )
-            count += 1
-            
-        conn.commit()
-        conn.close()
-        return {"success": True, "count": count}
+        await asyncio.to_thread(import_file, path, file.filename, job)
     except Exception as e:
+        job["status"] = "failed"
         raise HTTPException(status_code=500, detail=f"Excel import failed: {str(e)}")
+    finally:
+        os.remove(path)
+    return {"success": True, "count": job["imported"], "merged": job["merged"], "failed": job["failed"], "errors": job["errors"]}
+
+@app.get("/api/pets/import-jobs/{job_id}")
+async def get_import_job(job_id: str):
+    """Progress and per-row errors of an import"""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 # --- Helper: Map DB to Frontend ---
-def map_pet(p):
-    return {
-        "id": p["id"],
-        "name": p["name"],
-        "species": p["species"],
+# Frontend field -> pets column (also the whitelist for ?fields=)
+PET_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "species": "species",
+    "breed": "breed",
+    "sex": "sex",
+    "color": "color",
+    "age": "age",
+    "weight": "weight",
+    "ownerName": "owner_name",
+    "ownerPhone": "owner_phone",
+    "status": "status",
+    "birthday": "birthday",
+    "lastVaccinationDate": "last_vaccination_date",
+    "nextVaccinationDate": "next_vaccination_date",
+    "lastDewormingDate": "last_deworming_date",
+    "lastCheckupDate": "last_checkup_date",
+    "medicalHistory": "medical_history",
+}
+DEFAULT_PET_FIELDS = [f for f in PET_FIELDS if f != "medicalHistory"]
+# created_at, id trail every build_pets_query row for the keyset cursor
+PET_CURSOR_COLUMNS = 2
+
+def map_pet(p, fields=None):
+    pet = {
+        "id": p.get("id"),
+        "name": p.get("name"),
+        "species": p.get("species"),
         "breed": p.get("breed", "Unknown"),
         "sex": p.get("sex", "Unknown"),
         "color": p.get("color", "Unknown"),
         "age": p.get("age", "Unknown"),
         "weight": p.get("weight", "Unknown"),
-        "ownerName": p["owner_name"],
-        "ownerPhone": p["owner_phone"],
+        "ownerName": p.get("owner_name"),
+        "ownerPhone": p.get("owner_phone"),
         "status": p.get("status", "Healthy"),
         "birthday": p.get("birthday"),
         "lastVaccinationDate": p.get("last_vaccination_date"),
         "nextVaccinationDate": p.get("next_vaccination_date") or datetime.now().strftime("%Y-%m-%d"),
         "lastDewormingDate": p.get("last_deworming_date"),
-        "lastCheckupDate": p.get("last_checkup_date")
+        "lastCheckupDate": p.get("last_checkup_date"),
+        "medicalHistory": p.get("medical_history"),
     }
+    return {f: pet[f] for f in (fields or DEFAULT_PET_FIELDS)}
+
+def build_pets_query(fields, limit, cursor=None, species=None, status=None, due_from=None, due_to=None):
+    """Build a keyset-paginated, projected pets query (newest first).
+
+    Columns are aliased to the frontend field names (rows serialize as-is,
+    see services.fast_json); created_at and id trail as hidden cursor columns.
+    """
+    columns = [
+        f"COALESCE(next_vaccination_date, ?) AS {f}" if f == "nextVaccinationDate" else f"{PET_FIELDS[f]} AS {f}"
+        for f in fields
+    ]
+    where, params = [], []
+    if "nextVaccinationDate" in fields:
+        params.append(datetime.now().strftime("%Y-%m-%d"))
+    if species:
+        where.append("species = ?")
+        params.append(species)
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if due_from:
+        where.append("next_vaccination_date >= ?")
+        params.append(due_from)
+    if due_to:
+        where.append("next_vaccination_date <= ?")
+        params.append(due_to)
+    if cursor:
+        where.append("(created_at, id) < (?, ?)")
+        params.extend(cursor)
+
+    query = f"SELECT {', '.join(columns)}, created_at, id FROM pets"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return query, params
 
 # ==================== ROUTES ====================
 
@@ -168,97 +249,193 @@ def map_pet(p):
 async def health_check():
     return {"status": "ok", "message": "Kizuna AI Backend is running 🐾"}
 
-@app.get("/api/pets")
-async def get_pets():
-    conn = get_db_connection()
-    pets = conn.execute("SELECT * FROM pets ORDER BY created_at DESC").fetchall()
-    conn.close()
-    return [map_pet(dict(p)) for p in pets]
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: route, SQL, Gemini, Kapso and Telegram timings, queue depths, cache hits"""
+    return PlainTextResponse(await metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/pets", response_class=FastJSONResponse)
+async def get_pets(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    species: Optional[str] = None,
+    status: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    due_within: Optional[int] = Query(None, ge=0, le=3650),
+):
+    """List pets one page at a time. The next page's cursor is in X-Next-Cursor."""
+    if due_within is not None:
+        due_from, due_to = due_window(due_within)
+    for label, value in (("due_from", due_from), ("due_to", due_to)):
+        if value and normalize_date(value) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid {label}: {value}")
+    due_from, due_to = normalize_date(due_from), normalize_date(due_to)
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else DEFAULT_PET_FIELDS
+    unknown = [f for f in selected if f not in PET_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    try:
+        after = decode_cursor(cursor, 2, (str, str)) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def build():
+        # Fetch one extra row to know whether another page exists
+        query, params = build_pets_query(selected, limit + 1, after, species, status, due_from, due_to)
+        pets, rows = await run_db(fetch_records, query, params, PET_CURSOR_COLUMNS)
+        headers = {}
+        if len(pets) > limit:
+            pets = pets[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(*rows[limit - 1][-PET_CURSOR_COLUMNS:])
+        return pets, headers
+
+    return await http_cache.respond(request, ("pets",), build)
+
+@app.get("/api/pets/search")
+async def search_patients(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+):
+    """Ranked prefix search over pet/owner name, phone, breed and medical history"""
+    columns = sorted({PET_FIELDS[f] for f in DEFAULT_PET_FIELDS})
+    pets = await run_db(search_pets, q, columns, limit)
+    return [{**map_pet(p), "score": p["score"]} for p in pets]
 
 @app.post("/api/pets")
 async def create_pet(pet: PetRequest):
-    new_id = str(uuid.uuid4())
-    conn = get_db_connection()
-    conn.execute(
-        """INSERT INTO pets (id, name, species, breed, sex, color, age, weight, owner_name, owner_phone, status, birthday, last_vaccination_date, next_vaccination_date, last_deworming_date, last_checkup_date) 
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (new_id, pet.name, pet.species, pet.breed, pet.sex, pet.color, pet.age, pet.weight, pet.ownerName, pet.ownerPhone, pet.status, pet.birthday, pet.lastVaccinationDate, pet.nextVaccinationDate, pet.lastDewormingDate, pet.lastCheckupDate)
-    )
-    conn.commit()
-    conn.close()
-    return {**pet.dict(), "id": new_id}
+    """Create a pet, or merge into the existing one with the same owner phone + name"""
+    record = pet.dict()
+    # Omitted fields arrive as their model defaults; blank them so the merge
+    # keeps the stored value, while an explicit 'Healthy' still overwrites it
+    record.update({key: None for key in record if key not in pet.model_fields_set})
+    record["ownerPhone"] = canonical_phone(pet.ownerPhone) or pet.ownerPhone
+    row = pet_row(record)
+    pet_id = (await run_db(upsert_pets, [row]))[0]
+    stored = await fetch_one("SELECT * FROM pets WHERE id = ?", (pet_id,))
+    return {**map_pet(stored), "merged": pet_id != row[0]}
+
+PET_MERGES_QUERY = (
+    "SELECT dedup_key, kept_id, merged_id, pet_name, drafts_moved, merged_at FROM pet_merges ORDER BY id DESC LIMIT ?"
+)
+DELETE_PET_SQL = "DELETE FROM pets WHERE id = ?"
+CAMPAIGNS_QUERY = "SELECT * FROM campaigns ORDER BY created_at DESC"
+
+@app.get("/api/pets/merges")
+async def list_pet_merges(limit: int = Query(100, ge=1, le=1000)):
+    """Duplicates folded together by the one-time dedup migration"""
+    return await fetch_all(PET_MERGES_QUERY, (limit,))
 
 @app.delete("/api/pets/{pet_id}")
 async def delete_pet(pet_id: str):
-    conn = get_db_connection()
-    conn.execute("DELETE FROM pets WHERE id = ?", (pet_id,))
-    conn.commit()
-    conn.close()
+    await execute(DELETE_PET_SQL, (pet_id,))
     return {"status": "success"}
 
-@app.get("/api/campaigns")
-async def list_campaigns():
-    conn = get_db_connection()
-    campaigns = conn.execute("SELECT * FROM campaigns ORDER BY created_at DESC").fetchall()
-    conn.close()
-    return [dict(c) for c in campaigns]
+@app.get("/api/campaigns", response_class=FastJSONResponse)
+async def list_campaigns(request: Request):
+    async def build():
+        campaigns, _ = await run_db(fetch_records, CAMPAIGNS_QUERY)
+        return campaigns, {}
+    return await http_cache.respond(request, ("campaigns",), build)
+
+@app.get("/api/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: str):
+    """Campaign with fan-out progress (status, drafts_created, total_recipients)"""
+    campaign = await fetch_one("SELECT * FROM campaigns WHERE id = ?", (campaign_id,))
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
 
 @app.post("/api/campaigns")
 async def create_campaign(req: CampaignRequest):
+    """Save the campaign and fan out its drafts in the background"""
     campaign_id = str(uuid.uuid4())
-    conn = get_db_connection()
-    
-    # 1. Save Campaign
-    conn.execute(
+    await execute(
         "INSERT INTO campaigns (id, name, message, target_audience, status) VALUES (?, ?, ?, ?, ?)",
-        (campaign_id, req.name, req.message, req.target, 'active')
+        (campaign_id, req.name, req.message, req.target, 'queued')
     )
-    
-    # 2. Identify Target Pets
-    query = "SELECT * FROM pets"
-    params = []
-    
-    if req.target == "Dogs Only":
-        query += " WHERE species = ?"
-        params = ["Dog"]
-    elif req.target == "Cats Only":
-        query += " WHERE species = ?"
-        params = ["Cat"]
-    elif req.target == "Overdue Patients":
-        query += " WHERE status = ?"
-        params = ["Overdue"]
-    elif req.target == "Due This Month":
-        current_month = datetime.now().strftime("%Y-%m")
-        query += " WHERE next_vaccination_date LIKE ?"
-        params = [f"{current_month}%"]
-    
-    target_pets = conn.execute(query, params).fetchall()
-    
-    # 3. Generate Drafts for each target pet
-    for pet in target_pets:
-        draft_id = str(uuid.uuid4())
-        # Personalization
-        msg = req.message.replace("{owner_name}", pet['owner_name']).replace("{pet_name}", pet['name'])
-        
-        conn.execute(
-            "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, ?, ?, ?)",
-            (draft_id, pet['id'], 'campaign', msg, 'pending_review')
-        )
-    
-    conn.commit()
-    conn.close()
-    return {"status": "success", "campaign_id": campaign_id, "drafts_created": len(target_pets)}
+    start_fan_out(campaign_id)
+    return {"status": "success", "campaign_id": campaign_id, "fan_out": "queued"}
+
+@app.post("/api/campaigns/{campaign_id}/send")
+async def send_campaign(campaign_id: str):
+    """Approve the campaign's pending drafts and queue them in the outbox"""
+    campaign = await fetch_one("SELECT status FROM campaigns WHERE id = ?", (campaign_id,))
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    if campaign["status"] in ("queued", "fanning_out"):
+        raise HTTPException(status_code=409, detail="Campaign drafts are still being created")
+    queued = await run_db(enqueue_campaign, campaign_id)
+    notify_outbox()
+    return {"status": "success", "queued": queued}
+
+@app.get("/api/dispatch/metrics")
+async def dispatch_metrics():
+    """Outbox depth by status plus dispatcher throughput (sent, failed, throttled, messagesPerSec)"""
+    return await get_outbox_metrics()
+
+@app.get("/api/telegram/media-metrics")
+async def telegram_media_metrics():
+    """Telegram media queue depth, in-flight jobs and throughput"""
+    return media_pipeline.metrics()
+
+OUTBOX_QUERY = "SELECT * FROM outbox WHERE status = ? ORDER BY next_attempt_at DESC LIMIT ?"
+
+@app.get("/api/outbox")
+async def list_outbox(status: str = "dead", limit: int = Query(100, ge=1, le=1000)):
+    """Outbox rows in one state, e.g. the dead letters"""
+    return await fetch_all(OUTBOX_QUERY, (status, limit))
+
+@app.post("/api/outbox/{outbox_id}/retry")
+async def retry_outbox(outbox_id: int):
+    """Requeue a dead-lettered message"""
+    if not await run_db(retry_dead, outbox_id):
+        raise HTTPException(status_code=404, detail="No dead-lettered message with that id")
+    notify_outbox()
+    return {"status": "success"}
 
 # ==================== REMINDERS ====================
 
 @app.post("/api/reminders/generate")
 async def generate_reminder_route(req: ReminderGenerateRequest):
     """Generate a personalized AI message using Gemini"""
+    config = get_config()
     message = await generate_reminder(
-        req.petName, req.ownerName, req.clinicName, req.type, req.bookingUrl, req.tone
+        req.petName, req.ownerName, req.clinicName or config.clinic_name, req.type,
+        req.bookingUrl or config.booking_url, req.tone or config.ai_tone
     )
     return {"message": message}
 
+@app.post("/api/reminders/generate-batch")
+async def generate_reminder_batch_route(req: ReminderBatchRequest):
+    """Draft reminders for many pets (by id or due date), many pets per Gemini call"""
+    if req.dueWithin is not None:
+        due_from, due_to = due_window(req.dueWithin)
+    else:
+        due_from, due_to = normalize_date(req.dueFrom), normalize_date(req.dueTo)
+    if not req.petIds and not (due_from and due_to):
+        raise HTTPException(status_code=400, detail="Provide petIds, dueWithin or dueFrom/dueTo")
+
+    pets = await run_db(select_pets, req.petIds, due_from, due_to, max(1, min(req.limit, 10000)))
+    config = get_config()
+    result = await draft_reminders(
+        pets, req.clinicName or config.clinic_name, req.type, req.bookingUrl or config.booking_url,
+        req.tone or config.ai_tone, req.batchSize
+    )
+    return {"status": "success", **result}
+
+@app.get("/api/http-cache")
+async def http_cache_stats():
+    """Conditional-GET cache counters (`notModified`, `hits`, `misses`, `hitRate`)"""
+    return http_cache.stats()
+
+@app.get("/api/reminders/cache")
+async def reminder_cache_stats():
+    """Gemini response cache counters (memory/disk hits, misses, hit rate)"""
+    return response_cache.stats()
+
 @app.post("/api/reminders/send")
 async def send_reminder_route(req: ReminderSendRequest):
     """Send a WhatsApp message via Kapso"""
@@ -270,80 +447,112 @@ async def send_reminder_route(req: ReminderSendRequest):
 
 # ==================== AI AGENT DRAFTS ====================
 
-@app.get("/api/agent/drafts")
-async def get_all_drafts():
-    conn = get_db_connection()
-    query = """
-    SELECT d.*, p.name as pet_name, p.owner_name, p.owner_phone 
-    FROM drafts d 
-    JOIN pets p ON d.pet_id = p.id 
+DRAFTS_QUERY = """
+    SELECT d.*, p.name as pet_name, p.owner_name, p.owner_phone
+    FROM drafts d
+    JOIN pets p ON d.pet_id = p.id
     WHERE d.status = 'pending_review'
     ORDER BY d.created_at DESC
-    """
-    drafts = conn.execute(query).fetchall()
-    conn.close()
-    return [dict(d) for d in drafts]
+"""
+
+@app.get("/api/agent/drafts", response_class=FastJSONResponse)
+async def get_all_drafts(request: Request):
+    async def build():
+        drafts, _ = await run_db(fetch_records, DRAFTS_QUERY)
+        return drafts, {}
+    return await http_cache.respond(request, ("drafts", "pets"), build)
+
+@app.get("/api/agent/drafts/archive")
+async def get_archived_drafts(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    pet_id: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """Archived (sent/rejected) drafts, newest first. The next page's cursor is in X-Next-Cursor."""
+    try:
+        after = decode_cursor(cursor, 2, (str, str)) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query, params = archived_drafts_query(limit + 1, pet_id, status, after)
+    drafts = await fetch_all(query, params)
+    if len(drafts) > limit:
+        drafts = drafts[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(drafts[-1]["created_at"], drafts[-1]["id"])
+    return drafts
 
 @app.post("/api/agent/process-draft")
 async def process_draft(action: DraftAction):
-    conn = get_db_connection()
     if action.approved:
-        draft = conn.execute(
-            "SELECT d.*, p.owner_phone FROM drafts d JOIN pets p ON d.pet_id = p.id WHERE d.id = ?", 
-            (action.draftId,)
-        ).fetchone()
-        if draft:
-            await send_whatsapp_reminder(draft['owner_phone'], action.message or draft['draft_message'])
-            conn.execute("UPDATE drafts SET status = 'sent' WHERE id = ?", (action.draftId,))
+        # Only a local write; the outbox worker sends it and records the result
+        queued = await run_db(enqueue_draft, action.draftId, action.message or None)
+        if queued:
+            notify_outbox()
+        return {"status": "success", "queued": queued}
     else:
-        conn.execute("UPDATE drafts SET status = 'rejected' WHERE id = ?", (action.draftId,))
-    conn.commit()
-    conn.close()
+        await execute("UPDATE drafts SET status = 'rejected' WHERE id = ?", (action.draftId,))
     return {"status": "success"}
 
+@app.get("/api/stats")
+async def get_stats():
+    """Dashboard stats read from the trigger-maintained counters"""
+    return await run_db(read_stats)
+
+@app.get("/api/insights")
 @app.post("/api/insights")
-async def get_insights(request: InsightsRequest):
-    summary = await get_analytics_summary(request.stats)
+async def get_insights():
+    """AI summary of /api/stats (a posted body from older frontends is ignored)"""
+    summary = await get_analytics_summary()
     return {"summary": summary}
 
+AUTO_WISHES_QUERY = "SELECT * FROM pets"
+
 @app.post("/api/agent/generate-auto-wishes")
 async def generate_auto_wishes():
     """AI Agent automatically generates wellness check drafts for all pets"""
-    conn = get_db_connection()
-    pets = conn.execute("SELECT * FROM pets").fetchall()
-    
-    count = 0
-    for pet in pets:
-        draft_id = str(uuid.uuid4())
-        message = f"🌟 Hello {pet['owner_name']}! We're thinking of {pet['name']} today. Just a quick note from Kizuna Vet Center to wish you both a healthy and happy week! 🐾✨"
-        
-        conn.execute(
-            "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, ?, ?, ?)",
-            (draft_id, pet['id'], 'wellness_wish', message, 'pending_review')
-        )
-        count += 1
+    clinic_name = get_config().clinic_name
+
+    def create_wishes(conn):
+        pets = conn.execute(AUTO_WISHES_QUERY).fetchall()
         
-    conn.commit()
-    conn.close()
+        count = 0
+        for pet in pets:
+            draft_id = str(uuid.uuid4())
+            message = f"🌟 Hello {pet['owner_name']}! We're thinking of {pet['name']} today. Just a quick note from {clinic_name} to wish you both a healthy and happy week! 🐾✨"
+            
+            conn.execute(
+                "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, ?, ?, ?)",
+                (draft_id, pet['id'], 'wellness_wish', message, 'pending_review')
+            )
+            count += 1
+        return count
+    
+    count = await run_db(create_wishes)
     return {"status": "success", "drafts_created": count}
 
+@app.get("/api/scheduler")
+async def scheduler_status():
+    """Background jobs (due reminders, draft archival): last run, result and watermarks"""
+    return await get_scheduler_status()
+
+@app.post("/api/scheduler/{job}/run")
+async def run_scheduler_job(job: str):
+    """Run a background job now instead of waiting for its interval"""
+    if job not in SCHEDULER_JOBS:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job}")
+    return await run_job(job)
+
 @app.get("/api/settings")
-async def get_settings():
-    conn = get_db_connection()
-    rows = conn.execute("SELECT * FROM settings").fetchall()
-    conn.close()
-    return {row['key']: row['value'] for row in rows}
+async def get_settings(request: Request):
+    async def build():
+        return get_config().settings, {}
+    return await http_cache.respond(request, ("settings",), build)
 
 @app.post("/api/settings")
 async def update_settings(settings: dict = Body(...)):
-    conn = get_db_connection()
-    for key, value in settings.items():
-        conn.execute(
-            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-            (key, str(value))
-        )
-    conn.commit()
-    conn.close()
+    """Save settings; Kapso, Gemini, reminders and the Telegram bot pick them up immediately"""
+    await run_db(save_settings, settings)
     return {"status": "success"}
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""
+Async Data Access Layer
+
+Runs blocking sqlite3 work on a dedicated thread pool so the FastAPI event
+loop (and /api/health) keeps serving while a heavy query is in flight.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from services.db_pool import POOL_SIZE
+from services.metrics import DB_IN_FLIGHT
+from services.sqlite_db import db_connection
+
+# One worker per pooled connection, so run_db alone never exhausts the pool.
+# Campaign fan-out, imports and config reads borrow from the same pool on their
+# own threads, so a worker can still wait (up to the pool's acquire timeout).
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="kizuna-db")
+
+def _with_connection(fn, args, kwargs):
+    with db_connection() as conn:
+        return fn(conn, *args, **kwargs)
+
+async def run_db(fn, *args, **kwargs):
+    """Run ``fn(conn, *args, **kwargs)`` in a transaction off the event loop"""
+    loop = asyncio.get_running_loop()
+    DB_IN_FLIGHT.inc()
+    try:
+        return await loop.run_in_executor(_executor, partial(_with_connection, fn, args, kwargs))
+    finally:
+        DB_IN_FLIGHT.dec()
+
+async def fetch_all(query: str, params=()) -> list:
+    """Run a SELECT and return rows as dicts"""
+    def _fetch(conn):
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+    return await run_db(_fetch)
+
+async def fetch_one(query: str, params=()):
+    """Run a SELECT and return the first row as a dict (or None)"""
+    def _fetch(conn):
+        row = conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+    return await run_db(_fetch)
+
+async def execute(query: str, params=()) -> int:
+    """Run a single write statement and return the affected row count"""
+    def _execute(conn):
+        return conn.execute(query, params).rowcount
+    return await run_db(_execute)
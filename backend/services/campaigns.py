@@ -0,0 +1,116 @@
+"""
+Campaign Fan-out
+
+Drafts for a campaign are created set-based with INSERT ... SELECT, with
+{owner_name}/{pet_name} templating done by SQLite. Work is split into
+windows of FAN_OUT_BATCH pets in (created_at, id) order (walked on
+idx_pets_created, so each costs O(window)), each committed together with
+the campaign's progress cursor, so a fan-out runs in the background, keeps
+write locks short and resumes after a restart. The cursor is the last
+window's (created_at, id), not a rowid: pets has no INTEGER PRIMARY KEY, so
+VACUUM may renumber its rowids.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from services.sqlite_db import db_connection
+from services.dates import due_window, month_window
+
+FAN_OUT_BATCH = int(os.getenv("CAMPAIGN_FAN_OUT_BATCH", "5000"))
+
+# Random RFC 4122 v4 UUID, matching the str(uuid.uuid4()) ids used elsewhere
+SQL_UUID4 = (
+    "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2) || '-' || "
+    "substr('89ab', 1 + (abs(random()) % 4), 1) || substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kizuna-campaign")
+
+def target_filter(target: str):
+    """WHERE clause (or "1") and params for the pets a campaign audience targets"""
+    if target == "Dogs Only":
+        return "species = ?", ["Dog"]
+    if target == "Cats Only":
+        return "species = ?", ["Cat"]
+    if target == "Overdue Patients":
+        return "status = ?", ["Overdue"]
+    if target == "Due This Month":
+        return "next_vaccination_date BETWEEN ? AND ?", list(month_window())
+    if target == "Due in 14 Days":
+        return "next_vaccination_date BETWEEN ? AND ?", list(due_window(14))
+    return "1", []
+
+# Window bounds: the FAN_OUT_BATCH-th pet after the cursor, and the newest pet
+WINDOW_END_SQL = "SELECT created_at, id FROM pets WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT 1 OFFSET ?"
+LAST_PET_SQL = "SELECT created_at, id FROM pets ORDER BY created_at DESC, id DESC LIMIT 1"
+START = ["", ""]
+
+def recipients_sql(where: str) -> str:
+    return f"SELECT COUNT(*) FROM pets WHERE {where}"
+
+def fan_out_batch_sql(where: str) -> str:
+    """Drafts for the pets matching ``where`` in a ((created_at, id), (created_at, id)] window"""
+    return f"""
+    INSERT INTO drafts (id, pet_id, type, draft_message, status, campaign_id)
+    SELECT {SQL_UUID4}, id, 'campaign',
+           replace(replace(?, '{{owner_name}}', owner_name), '{{pet_name}}', name),
+           'pending_review', ?
+    FROM pets INDEXED BY idx_pets_created
+    WHERE (created_at, id) > (?, ?) AND (created_at, id) <= (?, ?) AND ({where})
+    """
+
+def fan_out_campaign(campaign_id: str):
+    """Create the campaign's drafts window by window, resuming from fanout_cursor"""
+    with db_connection() as conn:
+        campaign = conn.execute(
+            "SELECT message, target_audience, fanout_cursor FROM campaigns WHERE id = ?", (campaign_id,)
+        ).fetchone()
+        if not campaign:
+            return
+        where, params = target_filter(campaign["target_audience"])
+        total = conn.execute(recipients_sql(where), params).fetchone()[0]
+        last = conn.execute(LAST_PET_SQL).fetchone()
+        conn.execute(
+            "UPDATE campaigns SET status = 'fanning_out', total_recipients = ? WHERE id = ?",
+            (total, campaign_id)
+        )
+
+    # fanout_cursor is 0 until the first window commits
+    cursor = json.loads(campaign["fanout_cursor"]) if campaign["fanout_cursor"] else START
+    last = list(last) if last else START
+    insert_sql = fan_out_batch_sql(where)
+    try:
+        while cursor < last:
+            with db_connection() as conn:
+                end = conn.execute(WINDOW_END_SQL, (*cursor, FAN_OUT_BATCH - 1)).fetchone()
+                upper = list(end) if end else last
+                created = conn.execute(
+                    insert_sql, [campaign["message"], campaign_id, *cursor, *upper, *params]
+                ).rowcount
+                conn.execute(
+                    "UPDATE campaigns SET drafts_created = drafts_created + ?, fanout_cursor = ? WHERE id = ?",
+                    (created, json.dumps(upper), campaign_id)
+                )
+            cursor = upper
+
+        with db_connection() as conn:
+            conn.execute("UPDATE campaigns SET status = 'active' WHERE id = ?", (campaign_id,))
+    except Exception as e:
+        print(f"Campaign fan-out failed for {campaign_id}: {e}")
+        with db_connection() as conn:
+            conn.execute("UPDATE campaigns SET status = 'failed' WHERE id = ?", (campaign_id,))
+
+def start_fan_out(campaign_id: str):
+    _executor.submit(fan_out_campaign, campaign_id)
+
+def resume_pending_fan_outs() -> int:
+    """Restart fan-outs interrupted by a shutdown"""
+    with db_connection() as conn:
+        rows = conn.execute(
+            "SELECT id FROM campaigns WHERE status IN ('queued', 'fanning_out')"
+        ).fetchall()
+    for row in rows:
+        start_fan_out(row["id"])
+    return len(rows)
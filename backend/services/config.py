@@ -0,0 +1,125 @@
+"""
+Clinic Configuration
+
+The one place that loads backend/.env, and one in-memory snapshot of the
+settings table with environment overrides, as a frozen ClinicConfig.
+Services read it with get_config() instead of calling os.getenv or
+querying settings per request. Saving settings writes the table and
+swaps in a fresh snapshot in the same transaction; readers see either
+the old snapshot or the new one, never a mix. Services that cache
+derived state (the Gemini SDK key, the Kapso config, the Telegram bot)
+register an on_change callback.
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables from absolute path, before anything reads them
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_PATH = os.path.join(BASE_DIR, ".env")
+if not os.path.exists(ENV_PATH):
+    print(f"🚨 CRITICAL WARNING: .env file NOT FOUND at {ENV_PATH}")
+else:
+    print(f"✅ Found .env at {ENV_PATH}")
+load_dotenv(ENV_PATH, override=True)
+
+from services.sqlite_db import db_connection
+
+# settings key -> environment variable that overrides it when set
+ENV_OVERRIDES = {
+    "clinic_name": "CLINIC_NAME",
+    "booking_url": "BOOKING_URL",
+    "ai_tone": "AI_TONE",
+    "kapso_api_key": "KAPSO_API_KEY",
+    "kapso_phone_id": "KAPSO_PHONE_NUMBER_ID",
+    "telegram_token": "TELEGRAM_BOT_TOKEN",
+    "gemini_api_key": "GEMINI_API_KEY",
+}
+
+DEFAULTS = {
+    "clinic_name": "Kizuna Vet Center",
+    "booking_url": "https://book.vet/kizuna",
+    "ai_tone": "friendly",
+}
+
+def _is_placeholder(value: str) -> bool:
+    """Blank, or the template text from .env.example"""
+    return not value or "your_" in value or "id_here" in value
+
+@dataclass(frozen=True)
+class ClinicConfig:
+    clinic_name: str
+    booking_url: str
+    ai_tone: str
+    kapso_api_key: str
+    kapso_phone_id: str
+    telegram_token: str
+    gemini_api_key: str
+    # The settings table as stored (what the settings page edits)
+    settings: dict = field(default_factory=dict)
+
+def build_config(settings: dict) -> ClinicConfig:
+    """Stored settings, overridden by non-placeholder env vars, then defaults"""
+    values = {}
+    for key, env_name in ENV_OVERRIDES.items():
+        env_value = os.getenv(env_name, "").strip()
+        stored = (settings.get(key) or "").strip()
+        values[key] = env_value if not _is_placeholder(env_value) else stored or DEFAULTS.get(key, "")
+    return ClinicConfig(**values, settings=dict(settings))
+
+SETTINGS_SQL = "SELECT key, value FROM settings"
+
+def _read_settings(conn) -> dict:
+    try:
+        return {row[0]: row[1] for row in conn.execute(SETTINGS_SQL)}
+    except sqlite3.OperationalError:  # Not migrated yet (scripts, benchmarks): env only
+        return {}
+
+_config: Optional[ClinicConfig] = None
+_lock = threading.Lock()
+_listeners = []
+
+def on_change(callback):
+    """Call ``callback(old, new)`` whenever a new snapshot replaces an existing one"""
+    _listeners.append(callback)
+    return callback
+
+def _swap(config: ClinicConfig) -> ClinicConfig:
+    global _config
+    with _lock:
+        old, _config = _config, config
+    if old is not None and old != config:
+        for callback in _listeners:
+            try:
+                callback(old, config)
+            except Exception as e:
+                print(f"Config listener error: {e!r}")
+    return config
+
+def load_config(conn=None) -> ClinicConfig:
+    """(Re)load the snapshot from the settings table"""
+    if conn is not None:
+        return _swap(build_config(_read_settings(conn)))
+    with db_connection() as conn:
+        return _swap(build_config(_read_settings(conn)))
+
+def get_config() -> ClinicConfig:
+    """The current snapshot, loaded on first use"""
+    return _config or load_config()
+
+def save_settings(conn, settings: dict) -> ClinicConfig:
+    """Upsert settings and publish the new snapshot (run via run_db).
+
+    The swap happens while this transaction holds SQLite's write lock, so
+    concurrent saves publish in the order they were written.
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+        [(key, str(value)) for key, value in settings.items()]
+    )
+    return _swap(build_config(_read_settings(conn)))
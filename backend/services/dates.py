@@ -0,0 +1,75 @@
+"""
+Date Normalization Helpers
+
+All pet date columns are stored as ISO ``YYYY-MM-DD`` text (or NULL), which
+sorts chronologically and lets due-date filters run as index range scans.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+DATE_COLUMNS = (
+    "birthday",
+    "last_vaccination_date",
+    "next_vaccination_date",
+    "last_deworming_date",
+    "last_checkup_date",
+)
+
+# Tried in order; day-first before month-first to match clinic paperwork
+_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+)
+
+_EMPTY = {"", "nan", "nat", "none", "null", "unknown", "n/a", "-"}
+
+def normalize_date(value) -> Optional[str]:
+    """Coerce a date-ish value to ``YYYY-MM-DD``; None if empty or unparseable"""
+    # NaN and pandas NaT are the only values not equal to themselves
+    if value is None or value != value:
+        return None
+    if isinstance(value, datetime):
+        # Covers pandas.Timestamp too
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+
+    text = str(value).strip()
+    if text.lower() in _EMPTY:
+        return None
+    for fmt in _FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def today_iso() -> str:
+    return date.today().isoformat()
+
+def due_window(days: int, start: Optional[date] = None) -> Tuple[str, str]:
+    """Inclusive ISO bounds for 'due in the next N days'"""
+    start = start or date.today()
+    return start.isoformat(), (start + timedelta(days=days)).isoformat()
+
+def month_window(day: Optional[date] = None) -> Tuple[str, str]:
+    """Inclusive ISO bounds for the calendar month containing ``day``"""
+    day = day or date.today()
+    first = day.replace(day=1)
+    next_first = (first + timedelta(days=32)).replace(day=1)
+    return first.isoformat(), (next_first - timedelta(days=1)).isoformat()
@@ -0,0 +1,141 @@
+"""
+Due-Date Reminder Drafting
+
+Each run drafts reminders for pets that came due since the previous run:
+vaccinations by next_vaccination_date and checkups CHECKUP_INTERVAL_DAYS
+after last_checkup_date, both REMINDER_LEAD_DAYS ahead of the due day.
+
+Per reminder type, scheduler_state keeps a (date, id) watermark of how far
+that date index has been walked, so a run only range-scans the newly due
+slice, plus the (created_at, id) of the newest pet already seen, so pets
+added since then are checked against the slice walked before they existed.
+Both are keys rather than rowids, which VACUUM may renumber. Pets with a
+pending or queued draft of the same type are skipped. Every batch's drafts
+and its watermark commit in one transaction.
+
+Editing an existing pet's date into an already-walked range is not picked
+up; dates already past when first walked are left to campaigns.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+
+from services.async_db import fetch_all, fetch_one, run_db
+from services.config import get_config
+from services.reminders import BATCH_SIZE, PET_COLUMNS, compose_drafts
+
+LEAD_DAYS = int(os.getenv("REMINDER_LEAD_DAYS", "14"))
+CHECKUP_INTERVAL_DAYS = int(os.getenv("CHECKUP_INTERVAL_DAYS", "365"))
+MAX_DRAFTS_PER_RUN = int(os.getenv("SCHEDULER_MAX_DRAFTS_PER_RUN", "1000"))
+
+# reminder type -> (pets column, days from that date to the due day)
+KINDS = {
+    "vaccination": ("next_vaccination_date", 0),
+    "checkup": ("last_checkup_date", CHECKUP_INTERVAL_DAYS),
+}
+
+# Watermark id meaning "all of that date" (sorts after every pet id)
+END_OF_DAY = "\U0010ffff"
+
+# Newest pet created before the current second: pets still being added in
+# this second (created_at has second resolution) are left to the next run
+NEWEST_PET_SQL = """SELECT created_at, id FROM pets WHERE created_at < datetime('now')
+    ORDER BY created_at DESC, id DESC LIMIT 1"""
+
+_NO_OPEN_DRAFT = """NOT EXISTS (
+    SELECT 1 FROM drafts d WHERE d.pet_id = {pet} AND d.type = ? AND d.status IN ('pending_review', 'queued'))"""
+
+def window_sql(column: str) -> str:
+    """Pets after the (date, id) watermark, up to the horizon, in index order"""
+    return f"""SELECT {column} AS due_column, {PET_COLUMNS} FROM pets
+        WHERE ({column}, id) > (?, ?) AND {column} <= ? AND {_NO_OPEN_DRAFT.format(pet="pets.id")}
+        ORDER BY {column}, id LIMIT ?"""
+
+def new_pets_sql(column: str) -> str:
+    """Pets added in a (created_at, id) range whose date falls in the already-walked slice"""
+    return f"""SELECT created_at, {PET_COLUMNS} FROM pets INDEXED BY idx_pets_created
+        WHERE (created_at, id) > (?, ?) AND (created_at, id) <= (?, ?) AND {column} BETWEEN ? AND ?
+          AND {_NO_OPEN_DRAFT.format(pet="pets.id")}
+        ORDER BY created_at, id LIMIT ?"""
+
+INSERT_SQL = f"""
+    INSERT INTO drafts (id, pet_id, type, draft_message, status)
+    SELECT ?, ?, ?, ?, 'pending_review' WHERE {_NO_OPEN_DRAFT.format(pet="?")}"""
+
+def get_state(conn, key: str):
+    row = conn.execute("SELECT value FROM scheduler_state WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def set_state(conn, key: str, value):
+    conn.execute(
+        """INSERT INTO scheduler_state (key, value) VALUES (?, ?)
+           ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP""",
+        (key, json.dumps(value))
+    )
+
+def save_batch(conn, rows: list, key: str, state: dict) -> int:
+    """Insert the batch's drafts (re-checking for an open one) and advance the watermark together"""
+    created = conn.executemany(
+        INSERT_SQL, [(draft_id, pet_id, kind, message, pet_id, kind) for draft_id, pet_id, kind, message in rows]
+    ).rowcount if rows else 0
+    set_state(conn, key, state)
+    return created
+
+async def run_due_reminders(today: date = None) -> dict:
+    """Draft reminders for newly due pets, at most SCHEDULER_MAX_DRAFTS_PER_RUN; returns counts"""
+    today = today or date.today()
+    config = get_config()
+    clinic_name, booking_url, tone = config.clinic_name, config.booking_url, config.ai_tone
+    newest = await fetch_one(NEWEST_PET_SQL)
+    top = [newest["created_at"], newest["id"]] if newest else ["", ""]
+
+    report = {"pets": 0, "drafts_created": 0, "llm_calls": 0, "fallbacks": 0, "byType": {}}
+    budget = MAX_DRAFTS_PER_RUN
+
+    async def draft(pets: list, kind: str, key: str, state: dict):
+        nonlocal budget
+        rows, fallbacks = [], 0
+        if pets:
+            rows, fallbacks = await compose_drafts(pets, clinic_name, kind, booking_url, tone)
+            report["llm_calls"] += 1
+        created = await run_db(save_batch, rows, key, state)
+        budget -= len(pets)
+        report["pets"] += len(pets)
+        report["drafts_created"] += created
+        report["fallbacks"] += fallbacks
+        report["byType"][kind] = report["byType"].get(kind, 0) + created
+
+    for kind, (column, offset) in KINDS.items():
+        key = f"due:{kind}"
+        first = (today - timedelta(days=offset)).isoformat()
+        horizon = (today + timedelta(days=LEAD_DAYS - offset)).isoformat()
+        state = await run_db(get_state, key) or {"after": [first, ""], "created": top}
+        # Walking resumes at today's slice even if the last run was long ago
+        state["after"] = max(state["after"], [first, ""])
+
+        # Pets added since the last run, due within what was already walked
+        while budget > 0 and state["created"] < top:
+            limit = min(BATCH_SIZE, budget)
+            pets = await fetch_all(
+                new_pets_sql(column), (*state["created"], *top, first, state["after"][0], kind, limit)
+            )
+            created = [pets[-1]["created_at"], pets[-1]["id"]] if len(pets) == limit else top
+            await draft(pets, kind, key, {**state, "created": created})
+            state["created"] = created
+
+        # Newly due pets: walk the date index from the watermark to the horizon
+        while budget > 0:
+            limit = min(BATCH_SIZE, budget)
+            pets = await fetch_all(
+                window_sql(column), (*state["after"], horizon, kind, limit)
+            )
+            after = [pets[-1]["due_column"], pets[-1]["id"]] if len(pets) == limit else [horizon, END_OF_DAY]
+            await draft(pets, kind, key, {**state, "after": after})
+            state["after"] = after
+            if len(pets) < limit:
+                break
+
+    if report["drafts_created"]:
+        print(f"⏰ Drafted {report['drafts_created']} due reminders ({report['byType']})")
+    return report
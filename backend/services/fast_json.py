@@ -0,0 +1,46 @@
+"""
+Fast JSON Responses
+
+List endpoints select their columns under the names the frontend uses and
+turn raw row tuples straight into dicts (no sqlite3.Row, no per-row
+mapping function), then encode with orjson, which writes UTF-8 bytes in
+one C pass instead of FastAPI's jsonable_encoder walk plus stdlib json.
+orjson is in requirements; the stdlib encoder is only a fallback for an
+install without it.
+"""
+
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # In requirements; a broken install falls back to the stdlib encoder
+    orjson = None
+    print("⚠️ orjson is not installed; list endpoints will use the slower stdlib JSON encoder.")
+
+def dumps(content) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by ``dumps`` (route handlers' return values skip jsonable_encoder)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def fetch_records(conn, query: str, params=(), hidden: int = 0) -> tuple:
+    """(dicts keyed by column alias, raw row tuples) for ``query``.
+
+    The last ``hidden`` columns are left out of the dicts; callers read them
+    from the raw rows (e.g. keyset cursor values).
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(query, params).fetchall()
+    names = [column[0] for column in cursor.description]
+    keys = names[:len(names) - hidden]
+    # zip() stops at the shorter side, so hidden trailing columns drop out
+    return [dict(zip(keys, row)) for row in rows], rows
@@ -1,28 +1,111 @@
 """
 Google Gemini AI Service
+
+The SDK is configured once and GenerativeModel instances are cached. Calls
+run the blocking generate_content on a dedicated executor, so neither the
+FastAPI loop nor the Telegram bot's loop stalls for the LLM round trip. The
+executor's size is the concurrency cap; it is shared by both loops, which an
+asyncio.Semaphore (bound to one loop) could not be.
 """
 
+import asyncio
 import os
 import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
 import google.generativeai as genai
-from dotenv import load_dotenv
+from google.api_core.retry import Retry
+from typing_extensions import TypedDict  # typing.TypedDict is rejected by pydantic before 3.12
 
-# Load environment variables from absolute path
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-load_dotenv(os.path.join(BASE_DIR, ".env"))
+from services import config as clinic_config
+from services import metrics
+from services.async_db import run_db
+from services.response_cache import cache_key, response_cache
+from services.stats import read_stats
 
-async def generate_reminder(pet_name: str, owner_name: str, clinic_name: str, reminder_type: str, booking_url: str, tone: str = "friendly") -> str:
-    """Generate a friendly WhatsApp reminder message"""
-    # Force re-configuration to ensure the latest key is used
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    genai.configure(api_key=api_key)
-    
-    # Standard model selection with fallback
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+TIMEOUT_SEC = float(os.getenv("GEMINI_TIMEOUT_SEC", "30"))
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="kizuna-gemini")
+_lock = threading.Lock()
+_configured = False
+_models = {}
+
+def get_model(name: str = GEMINI_MODEL, generation_config: dict = None) -> genai.GenerativeModel:
+    """Cached model per (name, generation config); configures the SDK on first use"""
+    global _configured
+    key = (name, json.dumps(generation_config, sort_keys=True, default=str))
+    with _lock:
+        if not _configured:
+            genai.configure(api_key=clinic_config.get_config().gemini_api_key)
+            _configured = True
+        if key not in _models:
+            _models[key] = genai.GenerativeModel(name, generation_config=generation_config)
+        return _models[key]
+
+def reset_client():
+    """Drop the configured SDK state and cached models (e.g. after a key change)"""
+    global _configured
+    with _lock:
+        _configured = False
+        _models.clear()
+
+@clinic_config.on_change
+def _key_changed(old, new):
+    if old.gemini_api_key != new.gemini_api_key:
+        reset_client()
+
+async def generate(contents, model_name: str = GEMINI_MODEL, generation_config: dict = None,
+                   timeout: float = TIMEOUT_SEC) -> str:
+    """Response text for ``contents``; raises on API errors and timeouts"""
+    model = get_model(model_name, generation_config)
+    # The SDK's default retry policy keeps retrying for up to 10 minutes; cap it at ``timeout``
+    options = {"timeout": timeout, "retry": Retry(timeout=timeout)}
+    call = partial(model.generate_content, contents, request_options=options)
+    loop = asyncio.get_running_loop()
+    started, outcome = time.perf_counter(), "error"
+    metrics.GEMINI_IN_FLIGHT.inc()
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-    except:
-        model = genai.GenerativeModel("gemini-pro")
+        # Also bounds the time spent queued for a worker
+        response = await asyncio.wait_for(loop.run_in_executor(_executor, call), timeout * 2)
+        text = response.text
+        outcome = "ok"
+        return text
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        metrics.GEMINI_ERRORS.inc(model_name, "TimeoutError")
+        raise
+    except Exception as e:
+        metrics.GEMINI_ERRORS.inc(model_name, type(e).__name__)
+        raise
+    finally:
+        metrics.GEMINI_IN_FLIGHT.dec()
+        metrics.GEMINI_REQUESTS.observe(time.perf_counter() - started, model_name, outcome)
+
+def extract_json(text: str, pattern: str = r"\{[\s\S]*\}"):
+    """First JSON object (or, with pattern r"\[[\s\S]*\]", list) embedded in a reply"""
+    match = re.search(pattern, text)
+    return json.loads(match.group()) if match else None
+
+PET_PLACEHOLDER = "{pet_name}"
+OWNER_PLACEHOLDER = "{owner_name}"
+ANALYTICS_TTL_SEC = float(os.getenv("GEMINI_CACHE_ANALYTICS_TTL_SEC", "3600"))
+
+def personalize(template: str, pet_name: str, owner_name: str) -> str:
+    # str.replace, not format: the model may emit other braces
+    return template.replace(PET_PLACEHOLDER, pet_name).replace(OWNER_PLACEHOLDER, owner_name)
 
+def fallback_reminder(pet_name: str, owner_name: str, clinic_name: str, reminder_type: str, booking_url: str) -> str:
+    return f"Hi {owner_name}, this is a friendly reminder that {pet_name} is due for a {reminder_type} at {clinic_name}. Book here: {booking_url} 🐾"
+
+def _reminder_prompt(clinic_name: str, reminder_type: str, booking_url: str, tone: str,
+                     owner_name: str = OWNER_PLACEHOLDER, pet_name: str = PET_PLACEHOLDER) -> str:
     prompt = f"""
     You are an AI assistant for a veterinary clinic called {clinic_name}.
     Draft a {tone}, professional, and concise WhatsApp reminder for {owner_name}, the owner of {pet_name}.
@@ -35,19 +118,100 @@ async def generate_reminder(pet_name: str, owner_name: str, clinic_name: str, re
     - Sound {tone} and caring.
     - Mention the pet's name.
     """
-    
+    if pet_name == PET_PLACEHOLDER:
+        prompt += f"- Write {OWNER_PLACEHOLDER} and {PET_PLACEHOLDER} literally where the names go.\n"
+    return prompt
+
+async def generate_reminder(pet_name: str, owner_name: str, clinic_name: str, reminder_type: str, booking_url: str, tone: str = "friendly") -> str:
+    """Generate a friendly WhatsApp reminder message
+
+    The model writes a template with name placeholders, cached per clinic,
+    reminder type, link and tone; names are filled in after retrieval.
+    """
+    key = cache_key("reminder", GEMINI_MODEL, clinic_name, reminder_type, booking_url, tone)
+    template = await response_cache.get(key)
+    if template is not None:
+        return personalize(template, pet_name, owner_name)
+
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        template = (await generate(_reminder_prompt(clinic_name, reminder_type, booking_url, tone))).strip()
+        if PET_PLACEHOLDER in template:
+            await response_cache.put("reminder", key, template)
+            return personalize(template, pet_name, owner_name)
+        # Placeholders ignored; ask again with the real names and don't cache
+        return (await generate(
+            _reminder_prompt(clinic_name, reminder_type, booking_url, tone, owner_name, pet_name)
+        )).strip()
     except Exception as e:
-        print(f"Error generating reminder: {e}")
-        return f"Hi {owner_name}, this is a friendly reminder that {pet_name} is due for a {reminder_type} at {clinic_name}. Book here: {booking_url} 🐾"
+        print(f"Error generating reminder: {e!r}")
+        return fallback_reminder(pet_name, owner_name, clinic_name, reminder_type, booking_url)
 
-async def get_analytics_summary(stats: dict) -> str:
-    """Generate AI-powered analytics summary"""
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+class BatchReminder(TypedDict):
+    ref: int
+    message: str
+
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": list[BatchReminder]}
+MAX_MESSAGE_CHARS = 600
+
+async def generate_reminder_batch(pets: list, clinic_name: str, reminder_type: str, booking_url: str,
+                                  tone: str = "friendly") -> Optional[dict]:
+    """One structured-output call for many pets ({"name", "owner_name", "species"} dicts).
+
+    Returns {index in pets: message} for entries that validate, or None when
+    the call itself failed (the model is unreachable, so per-pet retries
+    would fail too).
+    """
+    listing = "\n".join(
+        f"    {ref}. pet: {p['name']} ({p.get('species') or 'pet'}), owner: {p['owner_name']}"
+        for ref, p in enumerate(pets, 1)
+    )
+    prompt = f"""
+    You are an AI assistant for a veterinary clinic called {clinic_name}.
+    Draft one {tone}, professional, and concise WhatsApp reminder per pet below.
+    The reminders are for: {reminder_type}.
+    Include this booking link in each: {booking_url}
+
+    Pets:
+{listing}
+
+    Guidelines:
+    - Keep each under 200 characters.
+    - Use emojis to make it relevant to the tone.
+    - Address the owner by name and mention the pet's name.
+    - Return one object per pet with its number as "ref".
+    """
+
+    try:
+        text = await generate(prompt, generation_config=BATCH_GENERATION_CONFIG)
+    except Exception as e:
+        print(f"Error generating reminder batch: {e!r}")
+        return None
+    try:
+        entries = json.loads(text)
+    except ValueError as e:
+        print(f"Malformed reminder batch: {e!r}")
+        return {}
+
+    messages = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        ref, message = entry.get("ref"), entry.get("message")
+        if not isinstance(ref, int) or not 1 <= ref <= len(pets) or not isinstance(message, str):
+            continue
+        message = message.strip()
+        mentions_pet = re.search(rf"(?<!\w){re.escape(pets[ref - 1]['name'])}(?!\w)", message, re.IGNORECASE)
+        if message and len(message) <= MAX_MESSAGE_CHARS and mentions_pet:
+            messages.setdefault(ref - 1, message)
+    return messages
+
+async def get_analytics_summary() -> str:
+    """AI summary of the clinic's stats counters (cached per identical stats for an hour)"""
+    stats = await run_db(read_stats)
+    key = cache_key("analytics", GEMINI_MODEL, stats)
+    summary = await response_cache.get(key)
+    if summary is not None:
+        return summary
 
     prompt = f"""
     Summarize these veterinary clinic performance stats and provide one actionable tip to improve revenue or retention:
@@ -57,54 +221,47 @@ async def get_analytics_summary(stats: dict) -> str:
     """
     
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        summary = (await generate(prompt)).strip()
+        await response_cache.put("analytics", key, summary, ttl=ANALYTICS_TTL_SEC)
+        return summary
     except Exception as e:
-        print(f"Error generating analytics: {e}")
+        print(f"Error generating analytics: {e!r}")
         return "Your clinic is performing well! Consider sending more reminders to increase bookings."
 
-async def extract_data_from_image(image_data: bytes, mime_type: str) -> dict:
-    """Extract pet data from a photo of a vaccination card"""
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+async def extract_data_from_images(images: list) -> list:
+    """Extract pet data from photos of vaccination cards in one multimodal request.
 
+    ``images`` is a list of (data, mime_type); returns one dict per card found.
+    """
     prompt = """
-    Look at this veterinary record/vaccination card and extract the following information in JSON format:
-    {
+    Look at these veterinary records/vaccination cards (one or more images; an album
+    may show several cards, or one card across several photos) and extract a JSON list
+    with one object per distinct pet:
+    [{
         "pet_name": string,
         "species": string,
         "breed": string,
         "owner_name": string,
+        "owner_phone": string,
         "last_vaccination": date (YYYY-MM-DD),
         "next_vaccination": date (YYYY-MM-DD),
         "notes": string
-    }
+    }]
     If any field is missing, use null. Re-check the dates carefully.
     """
     
     try:
-        response = model.generate_content([
-            prompt,
-            {"mime_type": mime_type, "data": image_data}
-        ])
-        
-        text = response.text
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', text)
-        if json_match:
-            return json.loads(json_match.group())
-        return None
+        parts = [prompt] + [{"mime_type": mime_type, "data": data} for data, mime_type in images]
+        found = extract_json(await generate(parts), r"[\[{][\s\S]*[\]}]")
+        if isinstance(found, dict):
+            found = [found]
+        return [card for card in found or [] if isinstance(card, dict)]
     except Exception as e:
-        print(f"Error extracting data from image: {e}")
-        return None
+        print(f"Error extracting data from images: {e!r}")
+        return []
 
 async def process_voice_note(audio_data: bytes, mime_type: str) -> dict:
     """Transcribe a voice note and extract pet information"""
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
     prompt = """
     Listen to this voice note from a veterinarian or clinic staff and extract pet information in JSON format:
     {
@@ -118,27 +275,14 @@ async def process_voice_note(audio_data: bytes, mime_type: str) -> dict:
     """
     
     try:
-        response = model.generate_content([
-            prompt,
-            {"mime_type": mime_type, "data": audio_data}
-        ])
-        
-        text = response.text
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', text)
-        if json_match:
-            return json.loads(json_match.group())
-        return None
+        text = await generate([prompt, {"mime_type": mime_type, "data": audio_data}])
+        return extract_json(text)
     except Exception as e:
-        print(f"Error processing voice note: {e}")
+        print(f"Error processing voice note: {e!r}")
         return None
 
 async def process_batch_text(text: str) -> list:
     """Extract multiple pet entries from a single text block"""
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
     prompt = """
     You are a veterinary assistant. Extract all pet and owner information from the following text and return it as a JSON list of objects.
     
@@ -163,8 +307,8 @@ async def process_batch_text(text: str) -> list:
     """
     
     try:
-        response = model.generate_content(prompt.format(text=text))
-        content = response.text.strip()
+        # Not str.format: the schema's braces would be read as fields
+        content = (await generate(prompt.replace("{text}", text))).strip()
         
         if content.startswith("```json"):
             content = content[7:-3].strip()
@@ -173,5 +317,5 @@ async def process_batch_text(text: str) -> list:
             
         return json.loads(content)
     except Exception as e:
-        print(f"Error in batch processing: {e}")
+        print(f"Error in batch processing: {e!r}")
         return []
@@ -0,0 +1,93 @@
+"""
+Conditional-GET Response Cache
+
+Triggers bump a per-table counter in ``table_versions`` on every insert,
+update and delete of pets, drafts, campaigns and settings, whatever the
+write path (API, import, Telegram, outbox worker, scheduler). A cached GET
+reads the versions of the tables it depends on (one primary-key lookup);
+its ETag is a hash of the URL, those versions and today's date. A matching
+If-None-Match gets a bodyless 304, and an unchanged URL is served from an
+in-process LRU of rendered bodies without querying or re-serializing.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from fastapi import Request, Response
+
+from services.async_db import run_db
+from services.fast_json import dumps
+
+MAX_ENTRIES = int(os.getenv("HTTP_CACHE_ENTRIES", "256"))
+# Browsers keep the body but revalidate every time, so polling stays fresh
+CACHE_CONTROL = "no-cache"
+
+def versions_sql(count: int) -> str:
+    return f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' for _ in range(count))})"
+
+def read_versions(conn, tables: tuple) -> tuple:
+    rows = dict(conn.execute(versions_sql(len(tables)), tables).fetchall())
+    return tuple(rows.get(table) for table in tables)
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, '*' matches anything)"""
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+class HttpCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"notModified": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    async def respond(self, request: Request, tables: tuple, build) -> Response:
+        """JSON response for ``request``; ``build()`` returns (content, headers) and only runs on a miss"""
+        # Versions are read before the data, so a body is never older than its ETag
+        versions = await run_db(read_versions, tables)
+        key = f"{request.url.path}?{request.url.query}"
+        etag = '"%s"' % hashlib.blake2b(
+            repr((key, versions, date.today().isoformat())).encode(), digest_size=12
+        ).hexdigest()
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.counters["notModified"] += 1
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == etag:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+        if entry and entry[0] == etag:
+            _, body, headers = entry
+        else:
+            self.counters["misses"] += 1
+            content, headers = await build()
+            body = dumps(content)
+            with self._lock:
+                self._entries[key] = (etag, body, headers)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.counters["evictions"] += 1
+
+        return Response(
+            body, media_type="application/json",
+            headers={**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    def stats(self) -> dict:
+        served = self.counters["notModified"] + self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "hitRate": round((self.counters["notModified"] + self.counters["hits"]) / served, 3) if served else 0.0,
+        }
+
+http_cache = HttpCache()
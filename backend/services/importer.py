@@ -0,0 +1,174 @@
+"""
+Streaming Pet Import (Excel / CSV)
+
+Reads uploads in fixed-size chunks (openpyxl read-only mode for .xlsx,
+pandas chunked reader for .csv), runs each chunk through the columnar
+normalization stage and upserts it in its own transaction (rows matching
+an existing pet's dedup key are merged into it, see services.pet_store).
+Large files run as background jobs whose progress is polled through the
+job registry.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from services.sqlite_db import db_connection
+from services.pet_store import count_merged, frame_rows, upsert_pets
+from services.normalize import normalize_frame, summarize_rejections
+
+CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "2000"))
+# Uploads larger than this are imported in the background
+BACKGROUND_THRESHOLD_BYTES = int(os.getenv("IMPORT_BACKGROUND_BYTES", str(2 * 1024 * 1024)))
+MAX_REPORTED_ERRORS = 200
+MAX_TRACKED_JOBS = 50
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kizuna-import")
+
+def is_csv(filename: str) -> bool:
+    return (filename or "").lower().endswith(".csv")
+
+def save_upload(fileobj, filename: str):
+    """Spool an upload to a temp file; returns (path, size in bytes)"""
+    suffix = os.path.splitext(filename or "")[1].lower() or ".xlsx"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="kizuna-import-") as tmp:
+        shutil.copyfileobj(fileobj, tmp, length=1024 * 1024)
+        return tmp.name, tmp.tell()
+
+def drop_blank_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows with at least one non-empty cell; the index (sheet row number) is kept"""
+    cells = df.astype("string").apply(lambda column: column.str.strip())
+    return df[cells.fillna("").ne("").any(axis=1)]
+
+def iter_chunks(path: str, filename: str, chunk_size: int = CHUNK_SIZE):
+    """Yield (DataFrame chunk, total_rows or None) without loading the whole file.
+
+    Chunks are indexed by spreadsheet row number (the header is row 1), and
+    blank rows are dropped, so rejections can point at the row in the file.
+    """
+    if is_csv(filename):
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, skip_blank_lines=False):
+            chunk.index += 2
+            yield drop_blank_rows(chunk), None
+        return
+
+    if (filename or "").lower().endswith(".xls"):
+        # Legacy binary format (read by xlrd) has no streaming reader
+        df = pd.read_excel(path, dtype=str, engine="xlrd")
+        df.index += 2
+        for start in range(0, len(df), chunk_size):
+            yield drop_blank_rows(df.iloc[start:start + chunk_size]), len(df)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        total = max((sheet.max_row or 1) - 1, 0) or None
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h).strip() if h is not None else f"column_{i}" for i, h in enumerate(header)]
+
+        batch, numbers = [], []
+        for number, row in enumerate(rows, start=2):
+            if not any(cell is not None for cell in row):
+                continue
+            batch.append(row[:len(columns)])
+            numbers.append(number)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=columns, index=numbers), total
+                batch, numbers = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, index=numbers), total
+    finally:
+        workbook.close()
+
+def import_file(path: str, filename: str, job: dict) -> dict:
+    """Stream a saved upload into the pets table, updating ``job`` as it goes"""
+    job["status"] = "running"
+    job["startedAt"] = time.time()
+    offset = 0
+    rejected = []
+    for chunk, total in iter_chunks(path, filename):
+        job["totalRows"] = total
+        clean, chunk_rejected = normalize_frame(chunk)
+        rejected += [(int(chunk.index[position]), reason) for position, reason in chunk_rejected]
+
+        rows = frame_rows(clean)
+        with db_connection() as conn:
+            merged = count_merged(rows, upsert_pets(conn, rows))
+        job["imported"] += len(rows) - merged
+        job["merged"] += merged
+        offset += len(chunk)
+        job["processed"] = offset
+        job["failed"] = len(rejected)
+
+    summary = summarize_rejections(rejected, limit=MAX_REPORTED_ERRORS)
+    job["errors"] = summary["rows"]
+    job["rejectedReasons"] = summary["reasons"]
+    job["status"] = "completed"
+    job["finishedAt"] = time.time()
+    return job
+
+def new_job(filename: str) -> dict:
+    job = {
+        "jobId": str(uuid.uuid4()),
+        "filename": filename,
+        "status": "queued",
+        "processed": 0,
+        "imported": 0,
+        "merged": 0,
+        "failed": 0,
+        "totalRows": None,
+        "errors": [],
+        "rejectedReasons": {},
+        "createdAt": time.time(),
+    }
+    with _jobs_lock:
+        _jobs[job["jobId"]] = job
+        # Forget the oldest finished jobs
+        finished = [j for j in _jobs.values() if j["status"] in ("completed", "failed")]
+        for old in sorted(finished, key=lambda j: j["createdAt"])[:max(0, len(_jobs) - MAX_TRACKED_JOBS)]:
+            _jobs.pop(old["jobId"], None)
+    return job
+
+def job_counts() -> dict:
+    """Tracked jobs by status"""
+    with _jobs_lock:
+        counts = {}
+        for job in _jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+def get_job(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job, errors=list(job["errors"])) if job else None
+
+def _run_job(path: str, filename: str, job: dict):
+    try:
+        import_file(path, filename, job)
+    except Exception as e:
+        print(f"Import job {job['jobId']} failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+        job["finishedAt"] = time.time()
+    finally:
+        os.remove(path)
+
+def start_background_import(path: str, filename: str) -> dict:
+    """Queue an import of a saved upload; the temp file is removed afterwards"""
+    job = new_job(filename)
+    _executor.submit(_run_job, path, filename, job)
+    return job
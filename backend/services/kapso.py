@@ -1,44 +1,133 @@
 """
 Kapso WhatsApp Service
+
+Credentials come from the clinic config (settings page or env), transport
+tuning from the environment; both are read once and the credentials are
+re-read when settings change. Messages go out over one keep-alive httpx
+client opened and closed by the FastAPI lifespan.
 """
 
 import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
 import httpx
-from dotenv import load_dotenv
-
-# Load environment variables from absolute path
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-load_dotenv(os.path.join(BASE_DIR, ".env"), override=True)
-
-async def send_whatsapp_reminder(to: str, message: str) -> dict:
-    """Send a WhatsApp message via Kapso API"""
-    
-    # Refresh environment to ensure latest keys are used
-    api_key = os.getenv("KAPSO_API_KEY", "").strip()
-    phone_id = os.getenv("KAPSO_PHONE_NUMBER_ID", "").strip()
-    version = os.getenv("KAPSO_VERSION", "v21.0").strip()
-    
-    # Secure logging
-    print(f"[DEBUG] Kapso Sending: PhoneID={phone_id}, Version={version}")
-    print(f"[DEBUG] Auth Header: Bearer {api_key[:4]}***")
-
-    is_placeholder = lambda x: not x or "your_" in x or "id_here" in x
-    
-    if is_placeholder(api_key):
-        return {"success": False, "error": "KAPSO_API_KEY is missing or contains placeholder text in .env"}
-    if is_placeholder(phone_id):
-        return {"success": False, "error": "KAPSO_PHONE_NUMBER_ID is missing or contains placeholder text in .env"}
-    
+
+from services import config as clinic_config
+from services import metrics
+
+@dataclass(frozen=True)
+class KapsoConfig:
+    api_key: str
+    phone_id: str
+    version: str
+    base_url: str
+    http2: bool
+    connect_timeout: float
+    read_timeout: float
+    max_connections: int
+
+    @property
+    def messages_url(self) -> str:
+        return f"{self.base_url}/meta/whatsapp/{self.version}/{self.phone_id}/messages"
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    @property
+    def error(self) -> Optional[str]:
+        is_placeholder = lambda x: not x or "your_" in x or "id_here" in x
+        if is_placeholder(self.api_key):
+            return "Kapso API key is missing (set it in Settings or KAPSO_API_KEY)"
+        if is_placeholder(self.phone_id):
+            return "Kapso phone number ID is missing (set it in Settings or KAPSO_PHONE_NUMBER_ID)"
+        return None
+
+def load_config() -> KapsoConfig:
+    clinic = clinic_config.get_config()
+    return KapsoConfig(
+        api_key=clinic.kapso_api_key,
+        phone_id=clinic.kapso_phone_id,
+        version=os.getenv("KAPSO_VERSION", "v21.0").strip(),
+        base_url=os.getenv("KAPSO_BASE_URL", "https://api.kapso.ai").rstrip("/"),
+        http2=os.getenv("KAPSO_HTTP2", "false").lower() in ("1", "true", "yes"),
+        connect_timeout=float(os.getenv("KAPSO_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("KAPSO_READ_TIMEOUT", "15")),
+        max_connections=int(os.getenv("KAPSO_MAX_CONNECTIONS", "32")),
+    )
+
+_config: Optional[KapsoConfig] = None
+_client: Optional[httpx.AsyncClient] = None
+
+def get_config() -> KapsoConfig:
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+@clinic_config.on_change
+def _reset_config(old, new):
+    """New credentials apply to the next send; the pooled client carries no credentials"""
+    global _config
+    if (old.kapso_api_key, old.kapso_phone_id) != (new.kapso_api_key, new.kapso_phone_id):
+        _config = None
+
+def build_client(config: KapsoConfig = None) -> httpx.AsyncClient:
+    """Keep-alive pooled client with explicit timeouts; HTTP/2 when enabled and h2 is installed"""
+    config = config or get_config()
+    http2 = config.http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ KAPSO_HTTP2 is set but the h2 package is missing; using HTTP/1.1.")
+            http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_connections,
+            keepalive_expiry=60.0,
+        ),
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; created lazily if the lifespan has not opened it"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+def start_client() -> httpx.AsyncClient:
+    return get_client()
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)"""
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+async def send_whatsapp_reminder(to: str, message: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """Send a WhatsApp message via Kapso API over the shared (or given) client"""
+    config = get_config()
+    if config.error:
+        metrics.KAPSO_ERRORS.inc("not_configured")
+        # Not an attempt: the same send succeeds once credentials are set
+        return {"success": False, "error": config.error, "not_configured": True}
+
     # Clean recipient number
     clean_to = to.replace("+", "").replace("whatsapp:", "").strip()
-    
-    url = f"https://api.kapso.ai/meta/whatsapp/{version}/{phone_id}/messages"
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
+
     payload = {
         "messaging_product": "whatsapp",
         "recipient_type": "individual",
@@ -46,17 +135,28 @@ async def send_whatsapp_reminder(to: str, message: str) -> dict:
         "type": "text",
         "text": {"body": message}
     }
-    
+
+    started = time.perf_counter()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {"success": True, "sid": data.get("messages", [{}])[0].get("id")}
-            else:
-                print(f"Kapso API Error ({response.status_code}): {response.text}")
-                return {"success": False, "error": response.text}
+        response = await (client or get_client()).post(config.messages_url, json=payload, headers=config.headers)
+        metrics.KAPSO_REQUESTS.observe(time.perf_counter() - started, response.status_code)
+        if response.status_code != 200:
+            metrics.KAPSO_ERRORS.inc("rate_limited" if response.status_code == 429 else f"http_{response.status_code // 100}xx")
+
+        if response.status_code == 200:
+            data = response.json()
+            return {"success": True, "sid": data.get("messages", [{}])[0].get("id")}
+        if response.status_code == 429:
+            return {
+                "success": False,
+                "error": response.text,
+                "status_code": 429,
+                "retry_after": _retry_after(response),
+            }
+        print(f"Kapso API Error ({response.status_code}): {response.text}")
+        return {"success": False, "error": response.text, "status_code": response.status_code}
     except Exception as e:
+        metrics.KAPSO_REQUESTS.observe(time.perf_counter() - started, "error")
+        metrics.KAPSO_ERRORS.inc(type(e).__name__)
         print(f"Kapso Connection Error: {e}")
         return {"success": False, "error": str(e)}
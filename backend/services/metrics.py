@@ -0,0 +1,328 @@
+"""
+Prometheus Metrics
+
+Histograms and counters kept in process and rendered in the Prometheus text
+format by GET /metrics. Hot paths only bump a few integers under a lock:
+
+- every HTTP request, by method, route template and status (ASGI middleware)
+- every SQL statement, by operation and table (a sqlite3 connection factory
+  used by the pool), plus the time spent fetching its rows
+- Gemini and Kapso calls (latency by outcome, errors by type), Telegram
+  handlers and media jobs
+
+Queue depths and cache counters (outbox, dispatcher, media pipeline, DB
+executor, import jobs, scheduler, HTTP and Gemini response caches) are read
+from their owners at scrape time, so they cost nothing between scrapes.
+METRICS_ENABLED=0 turns off the request and SQL instrumentation.
+"""
+
+import bisect
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labels
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def lines(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total!r}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+_registry = []
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+HTTP_REQUESTS = _register(Histogram(
+    "kizuna_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+))
+SQL_STATEMENTS = _register(Histogram(
+    "kizuna_sql_statement_duration_seconds", "SQL execute() time by operation and main table",
+    ("operation", "table"), SQL_BUCKETS
+))
+SQL_FETCH = _register(Counter(
+    "kizuna_sql_fetch_seconds_total", "Time spent in fetchone/fetchmany/fetchall by operation and table",
+    ("operation", "table")
+))
+SQL_ERRORS = _register(Counter("kizuna_sql_errors_total", "Failed SQL statements", ("operation", "table", "error")))
+GEMINI_REQUESTS = _register(Histogram(
+    "kizuna_gemini_request_duration_seconds", "Gemini call latency (ok, error, timeout)", ("model", "outcome"),
+    UPSTREAM_BUCKETS
+))
+GEMINI_ERRORS = _register(Counter("kizuna_gemini_errors_total", "Failed Gemini calls by exception type", ("model", "error")))
+GEMINI_IN_FLIGHT = _register(Gauge("kizuna_gemini_in_flight", "Gemini calls queued or running"))
+KAPSO_REQUESTS = _register(Histogram(
+    "kizuna_kapso_request_duration_seconds", "Kapso send latency by HTTP status (or 'error')", ("status",),
+    UPSTREAM_BUCKETS
+))
+KAPSO_ERRORS = _register(Counter("kizuna_kapso_errors_total", "Failed Kapso sends by reason", ("reason",)))
+TELEGRAM_HANDLERS = _register(Histogram(
+    "kizuna_telegram_handler_duration_seconds", "Telegram update handler time", ("handler", "outcome")
+))
+TELEGRAM_MEDIA_JOBS = _register(Histogram(
+    "kizuna_telegram_media_job_duration_seconds", "Media pipeline job time (download, Gemini, save)",
+    ("kind", "outcome"), UPSTREAM_BUCKETS
+))
+DB_IN_FLIGHT = _register(Gauge("kizuna_db_calls_in_flight", "run_db calls queued for or running on the DB executor"))
+
+# --- HTTP ---
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request; routes are labelled by template (/api/pets/{pet_id})"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUESTS.observe(
+                time.perf_counter() - started, scope["method"], getattr(route, "path", "unmatched"), status[0]
+            )
+
+# --- SQL ---
+
+_TABLE_PATTERNS = {
+    "SELECT": re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE),
+    "WITH": re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE),
+    "DELETE": re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE),
+    "INSERT": re.compile(r"\bINTO\s+([\w.]+)", re.IGNORECASE),
+    "REPLACE": re.compile(r"\bINTO\s+([\w.]+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+(?:OR\s+\w+\s+)?([\w.]+)", re.IGNORECASE),
+}
+# Migrations and per-connection setup: one series each, whatever the object or pragma
+_FOLDED = {"CREATE": "ddl", "ALTER": "ddl", "DROP": "ddl", "PRAGMA": "pragma"}
+
+@functools.lru_cache(maxsize=2048)
+def statement_labels(sql: str) -> tuple:
+    """(operation, table) for a statement, e.g. ("select", "pets"); bounded label values"""
+    words = sql.split(None, 1)
+    operation = words[0].upper() if words else ""
+    if operation in _FOLDED:
+        return _FOLDED[operation], ""
+    pattern = _TABLE_PATTERNS.get(operation)
+    match = pattern.search(sql) if pattern else None
+    return operation.lower() or "empty", match.group(1).lower() if match else ""
+
+class TimedCursor(sqlite3.Cursor):
+    _labels = ("", "")
+
+    def _run(self, method, sql, params):
+        self._labels = statement_labels(sql)
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        except sqlite3.Error as e:
+            SQL_ERRORS.inc(*self._labels, type(e).__name__)
+            raise
+        finally:
+            SQL_STATEMENTS.observe(time.perf_counter() - started, *self._labels)
+
+    def execute(self, sql, params=()):
+        return self._run(super().execute, sql, params)
+
+    def executemany(self, sql, params):
+        return self._run(super().executemany, sql, params)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            SQL_FETCH.inc(*self._labels, amount=time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3.connect(factory=...) for pooled connections; statements run on TimedCursors"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute() makes its cursor in C, bypassing cursor(); route it through ours
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, params):
+        return self.cursor().executemany(sql, params)
+
+def connection_factory():
+    return TimedConnection if ENABLED else sqlite3.Connection
+
+# --- Upstreams ---
+
+def observe_handler(name: str):
+    """Decorator timing an async Telegram handler"""
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def timed(*args, **kwargs):
+            started, outcome = time.perf_counter(), "error"
+            try:
+                result = await handler(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                TELEGRAM_HANDLERS.observe(time.perf_counter() - started, name, outcome)
+        return timed
+    return decorate
+
+# --- Scrape ---
+
+def _family(name: str, kind: str, help: str, samples) -> list:
+    """Exposition lines for a metric read at scrape time; samples are (labels dict, value)"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+async def _collected() -> list:
+    # Imported here: these services import this module
+    from services.async_db import fetch_all
+    from services.http_cache import http_cache
+    from services.importer import job_counts
+    from services.outbox import dispatcher
+    from services.response_cache import response_cache
+    from services.scheduler import get_job_status
+    from services.telegram_media import media_pipeline
+
+    outbox = await fetch_all("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status")
+    dispatch = dispatcher.metrics
+    media = media_pipeline.metrics()
+    http = http_cache.stats()
+    llm = response_cache.stats()
+    jobs = get_job_status()
+
+    lines = []
+    lines += _family("kizuna_outbox_messages", "gauge", "Outbox rows by status (pending is the send queue)",
+                     [({"status": row["status"]}, row["n"]) for row in outbox])
+    lines += _family("kizuna_dispatch_messages_total", "counter", "Messages the dispatcher finished, by result",
+                     [({"result": "sent"}, dispatch.sent), ({"result": "failed"}, dispatch.failed)])
+    lines += _family("kizuna_dispatch_throttled_total", "counter", "Kapso 429 responses retried", [({}, dispatch.throttled)])
+    lines += _family("kizuna_dispatch_in_flight", "gauge", "Messages being sent now", [({}, dispatch.in_flight)])
+    lines += _family("kizuna_telegram_media_queue_depth", "gauge", "Media jobs waiting for a worker", [({}, media["queueDepth"])])
+    lines += _family("kizuna_telegram_media_in_progress", "gauge", "Media jobs being processed", [({}, media["inProgress"])])
+    lines += _family("kizuna_telegram_media_jobs_total", "counter", "Media jobs by result", [
+        ({"result": "processed"}, media["processed"]), ({"result": "failed"}, media["failed"]),
+        ({"result": "rejected_full"}, media["rejectedFull"]),
+    ])
+    lines += _family("kizuna_import_jobs", "gauge", "Tracked import jobs by status",
+                     [({"status": status}, n) for status, n in job_counts().items()])
+    lines += _family("kizuna_http_cache_requests_total", "counter", "Conditional-GET cache lookups by result", [
+        ({"result": "not_modified"}, http["notModified"]), ({"result": "hit"}, http["hits"]),
+        ({"result": "miss"}, http["misses"]),
+    ])
+    lines += _family("kizuna_http_cache_entries", "gauge", "Rendered bodies held", [({}, http["entries"])])
+    lines += _family("kizuna_gemini_cache_lookups_total", "counter", "Gemini response cache lookups by result", [
+        ({"result": "memory_hit"}, llm["memoryHits"]), ({"result": "disk_hit"}, llm["diskHits"]),
+        ({"result": "miss"}, llm["misses"]),
+    ])
+    lines += _family("kizuna_scheduler_job_runs_total", "counter", "Scheduler job runs",
+                     [({"job": name}, status["runs"]) for name, status in jobs.items()])
+    lines += _family("kizuna_scheduler_job_last_duration_seconds", "gauge", "Duration of each job's last run",
+                     [({"job": name}, status["lastDurationSec"] or 0) for name, status in jobs.items()])
+    lines += _family("kizuna_scheduler_job_failing", "gauge", "1 when the job's last run raised",
+                     [({"job": name}, int(bool(status["lastError"]))) for name, status in jobs.items()])
+    return lines
+
+async def render() -> str:
+    """The Prometheus text exposition of every metric"""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines())
+    lines += await _collected()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,467 @@
+"""
+Versioned Schema Migrations
+
+Each migration runs once, in order, inside its own transaction and is
+recorded in the ``schema_version`` table. Append new steps to MIGRATIONS;
+never edit one that has already shipped.
+"""
+
+from services.dates import DATE_COLUMNS, normalize_date
+
+def _base_schema(conn):
+    """Core tables (IF NOT EXISTS so pre-migration databases are adopted as-is)"""
+    # Enhanced Pets Table with age and more details
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS pets (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        species TEXT,
+        breed TEXT,
+        sex TEXT,
+        color TEXT,
+        age TEXT,
+        weight TEXT,
+        owner_name TEXT NOT NULL,
+        owner_phone TEXT NOT NULL,
+        status TEXT DEFAULT 'Healthy',
+        birthday TEXT, -- YYYY-MM-DD
+        last_vaccination_date TEXT,
+        next_vaccination_date TEXT,
+        last_deworming_date TEXT,
+        last_checkup_date TEXT,
+        medical_history TEXT DEFAULT '[]',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Campaigns Table
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS campaigns (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        message TEXT NOT NULL,
+        target_audience TEXT,
+        status TEXT DEFAULT 'draft',
+        sent_count INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Drafts Table
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS drafts (
+        id TEXT PRIMARY KEY,
+        pet_id TEXT,
+        type TEXT,
+        draft_message TEXT,
+        status TEXT DEFAULT 'pending_review',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (pet_id) REFERENCES pets (id)
+    )
+    ''')
+
+    # Settings Table
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    ''')
+
+def _legacy_pet_columns(conn):
+    """Add columns that older databases created before they existed"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(pets)").fetchall()]
+
+    missing_columns = {
+        "sex": "TEXT",
+        "color": "TEXT",
+        "age": "TEXT",
+        "weight": "TEXT",
+        "last_deworming_date": "TEXT",
+        "last_checkup_date": "TEXT",
+        "medical_history": "TEXT DEFAULT '[]'"
+    }
+
+    for col, col_type in missing_columns.items():
+        if col not in columns:
+            print(f"📦 Migrating: Adding missing column '{col}' to 'pets' table.")
+            conn.execute(f"ALTER TABLE pets ADD COLUMN {col} {col_type}")
+
+def _default_settings(conn):
+    default_settings = [
+        ('clinic_name', 'Kizuna Vet Center'),
+        ('booking_url', 'https://book.vet/kizuna'),
+        ('kapso_api_key', ''),
+        ('kapso_phone_id', ''),
+        ('telegram_token', ''),
+        ('ai_tone', 'friendly')
+    ]
+    conn.executemany("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", default_settings)
+
+def _hot_column_indexes(conn):
+    """Secondary indexes for the columns the API filters and sorts on"""
+    for statement in (
+        # Paginated /api/pets listing and its filters
+        "CREATE INDEX IF NOT EXISTS idx_pets_created ON pets (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_pets_species_created ON pets (species, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_pets_status_created ON pets (status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_pets_next_vaccination ON pets (next_vaccination_date)",
+        # Draft review queue and per-pet lookups
+        "CREATE INDEX IF NOT EXISTS idx_drafts_status_created ON drafts (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_drafts_pet ON drafts (pet_id)",
+        # Campaign listing
+        "CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns (created_at)",
+    ):
+        conn.execute(statement)
+
+def _canonical_dates(conn):
+    """Rewrite free-form pet dates (incl. 'NaT'/'nan' from old imports) as YYYY-MM-DD"""
+    not_canonical = " OR ".join(
+        f"({col} IS NOT NULL AND NOT (length({col}) = 10 AND {col} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'))"
+        for col in DATE_COLUMNS
+    )
+    rows = conn.execute(f"SELECT id, {', '.join(DATE_COLUMNS)} FROM pets WHERE {not_canonical}").fetchall()
+
+    updates, dropped = [], 0
+    for pet_id, *raw in rows:
+        values = [normalize_date(v) for v in raw]
+        dropped += sum(1 for old, new in zip(raw, values) if new is None and old not in (None, ""))
+        updates.append((*values, pet_id))
+
+    conn.executemany(
+        f"UPDATE pets SET {', '.join(f'{col} = ?' for col in DATE_COLUMNS)} WHERE id = ?",
+        updates
+    )
+    if updates:
+        print(f"📦 Normalized dates on {len(updates)} pets ({dropped} unparseable values cleared).")
+
+def _campaign_fan_out(conn):
+    """Track set-based campaign fan-out progress and link drafts to campaigns"""
+    conn.execute("ALTER TABLE drafts ADD COLUMN campaign_id TEXT")
+    conn.execute("ALTER TABLE campaigns ADD COLUMN drafts_created INTEGER DEFAULT 0")
+    conn.execute("ALTER TABLE campaigns ADD COLUMN total_recipients INTEGER")
+    conn.execute("ALTER TABLE campaigns ADD COLUMN fanout_cursor INTEGER DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_campaign ON drafts (campaign_id)")
+
+def _outbox(conn):
+    """Durable queue of outbound WhatsApp messages (see services.outbox)"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        draft_id TEXT,
+        campaign_id TEXT,
+        to_phone TEXT NOT NULL,
+        message TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS REAL)),
+        claimed_at REAL,
+        message_id TEXT,
+        last_error TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        sent_at DATETIME
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+    # A draft is enqueued at most once
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_outbox_draft ON outbox (draft_id) WHERE draft_id IS NOT NULL")
+    # Drafts approved for the in-memory dispatcher move to the outbox
+    conn.execute('''
+    INSERT INTO outbox (draft_id, campaign_id, to_phone, message)
+    SELECT d.id, d.campaign_id, p.owner_phone, d.draft_message
+    FROM drafts d JOIN pets p ON d.pet_id = p.id
+    WHERE d.status IN ('approved', 'sending')
+    ''')
+    conn.execute("UPDATE drafts SET status = 'queued' WHERE status IN ('approved', 'sending')")
+
+def _llm_cache(conn):
+    """Persistent tier of the Gemini response cache (see services.response_cache)"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        namespace TEXT NOT NULL,
+        value TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at)")
+
+def _pet_dedup_key(conn):
+    """Normalized owner/pet identity; existing duplicates are merged before the unique index"""
+    # Imported here: pet_store -> sqlite_db -> this module
+    from services.pet_store import merge_duplicates
+
+    conn.execute("ALTER TABLE pets ADD COLUMN dedup_key TEXT")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS pet_merges (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dedup_key TEXT NOT NULL,
+        kept_id TEXT NOT NULL,
+        merged_id TEXT NOT NULL,
+        pet_name TEXT,
+        drafts_moved INTEGER DEFAULT 0,
+        merged_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    # Also creates the unique idx_pets_dedup_key once keys are assigned
+    report = merge_duplicates(conn)
+    if report["merged"]:
+        print(f"📦 Merged {report['merged']} duplicate pets into {report['groups']} records "
+              f"({report['draftsMoved']} drafts repointed); see GET /api/pets/merges.")
+
+# Leaf values of the medical_history JSON (not its keys); raw text if it isn't JSON
+_HISTORY_TEXT = """CASE WHEN json_valid({row}.medical_history)
+    THEN (SELECT group_concat(value, ' ') FROM json_tree({row}.medical_history) WHERE atom IS NOT NULL)
+    ELSE {row}.medical_history END"""
+
+def _pet_search(conn):
+    """FTS5 patient search index kept in sync by triggers (see services.search)"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS pet_search_ids (
+        rowid INTEGER PRIMARY KEY,
+        pet_id TEXT NOT NULL UNIQUE
+    )
+    ''')
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS pets_fts USING fts5(
+        name, owner_name, owner_phone, breed, medical_history,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4 5 6'
+    )
+    ''')
+    index_row = f"""
+        INSERT INTO pets_fts (rowid, name, owner_name, owner_phone, breed, medical_history)
+        SELECT rowid, new.name, new.owner_name, new.owner_phone, new.breed, {_HISTORY_TEXT.format(row="new")}
+        FROM pet_search_ids WHERE pet_id = new.id;"""
+    unindex_row = """
+        DELETE FROM pets_fts WHERE rowid = (SELECT rowid FROM pet_search_ids WHERE pet_id = old.id);"""
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS pets_search_insert AFTER INSERT ON pets BEGIN
+        INSERT INTO pet_search_ids (pet_id) VALUES (new.id);{index_row}
+    END""")
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS pets_search_update
+    AFTER UPDATE OF name, owner_name, owner_phone, breed, medical_history ON pets BEGIN{unindex_row}{index_row}
+    END""")
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS pets_search_delete AFTER DELETE ON pets BEGIN{unindex_row}
+        DELETE FROM pet_search_ids WHERE pet_id = old.id;
+    END""")
+
+    conn.execute("INSERT INTO pet_search_ids (pet_id) SELECT id FROM pets")
+    conn.execute(f"""
+    INSERT INTO pets_fts (rowid, name, owner_name, owner_phone, breed, medical_history)
+    SELECT s.rowid, p.name, p.owner_name, p.owner_phone, p.breed, {_HISTORY_TEXT.format(row="p")}
+    FROM pets p JOIN pet_search_ids s ON s.pet_id = p.id
+    """)
+
+def _bump(metric: str, bucket: str, delta: str, when: str = "") -> str:
+    """Trigger statement adding ``delta`` to one stats_counts row"""
+    return f"""
+        INSERT INTO stats_counts (metric, bucket, value) SELECT '{metric}', {bucket}, {delta} WHERE {when or 'true'}
+        ON CONFLICT (metric, bucket) DO UPDATE SET value = value + excluded.value;"""
+
+def _pet_counters(row: str, sign: str) -> str:
+    return (
+        _bump("pets", "'total'", sign)
+        + _bump("pets_species", f"COALESCE({row}.species, 'Unknown')", sign)
+        + _bump("pets_due", f"{row}.next_vaccination_date", sign, f"{row}.next_vaccination_date IS NOT NULL")
+    )
+
+def _draft_counters(row: str, sign: str) -> str:
+    return (
+        _bump("drafts_status", f"COALESCE({row}.status, 'unknown')", sign)
+        + _bump("drafts_type", f"COALESCE({row}.type, 'unknown')", sign)
+        + _bump("conversions", f"COALESCE({row}.type, 'unknown')", sign, f"{row}.converted_at IS NOT NULL")
+    )
+
+def _campaign_counters(row: str, sign: str) -> str:
+    return (
+        _bump("campaigns_status", f"COALESCE({row}.status, 'unknown')", sign)
+        + _bump("campaign_reach", "'recipients'", f"{sign} * COALESCE({row}.total_recipients, 0)")
+        + _bump("campaign_reach", "'sent'", f"{sign} * COALESCE({row}.sent_count, 0)")
+    )
+
+def _stats_counters(conn):
+    """Summary counters maintained by triggers (see services.stats)"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS stats_counts (
+        metric TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (metric, bucket)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("ALTER TABLE drafts ADD COLUMN converted_at DATETIME")
+
+    for table, counters, columns in (
+        ("pets", _pet_counters, "species, next_vaccination_date"),
+        ("drafts", _draft_counters, "status, type, converted_at"),
+        ("campaigns", _campaign_counters, "status, total_recipients, sent_count"),
+    ):
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} BEGIN{counters('new', '1')}\nEND")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} BEGIN{counters('old', '-1')}\nEND")
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_update AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN{counters('old', '-1')}{counters('new', '1')}\nEND"
+        )
+
+    # A visit recorded after a reminder went out counts as that reminder's conversion
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS pets_conversion AFTER UPDATE OF last_vaccination_date, last_checkup_date ON pets
+    WHEN new.last_vaccination_date > COALESCE(old.last_vaccination_date, '')
+      OR new.last_checkup_date > COALESCE(old.last_checkup_date, '')
+    BEGIN
+        UPDATE drafts SET converted_at = CURRENT_TIMESTAMP
+        WHERE pet_id = new.id AND status = 'sent' AND converted_at IS NULL
+          AND date(created_at) <= MAX(COALESCE(new.last_vaccination_date, ''), COALESCE(new.last_checkup_date, ''));
+    END""")
+
+    for metric, bucket, table, where in (
+        ("pets", "'total'", "pets", ""),
+        ("pets_species", "COALESCE(species, 'Unknown')", "pets", ""),
+        ("pets_due", "next_vaccination_date", "pets", "WHERE next_vaccination_date IS NOT NULL"),
+        ("drafts_status", "COALESCE(status, 'unknown')", "drafts", ""),
+        ("drafts_type", "COALESCE(type, 'unknown')", "drafts", ""),
+        ("campaigns_status", "COALESCE(status, 'unknown')", "campaigns", ""),
+    ):
+        conn.execute(
+            f"INSERT INTO stats_counts (metric, bucket, value) SELECT '{metric}', {bucket}, COUNT(*) FROM {table} {where} GROUP BY 2"
+        )
+    conn.execute("""
+    INSERT INTO stats_counts (metric, bucket, value)
+    SELECT 'campaign_reach', 'recipients', COALESCE(SUM(total_recipients), 0) FROM campaigns
+    UNION ALL
+    SELECT 'campaign_reach', 'sent', COALESCE(SUM(sent_count), 0) FROM campaigns
+    """)
+
+def _draft_archive(conn):
+    """Cold storage for finalized drafts, and the background scheduler's watermarks"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS drafts_archive (
+        id TEXT PRIMARY KEY,
+        pet_id TEXT,
+        type TEXT,
+        draft_message TEXT,
+        status TEXT,
+        created_at DATETIME,
+        campaign_id TEXT,
+        converted_at DATETIME,
+        archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_archive_created ON drafts_archive (created_at, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_archive_pet ON drafts_archive (pet_id, created_at, id)")
+
+    # Archived drafts stay in the stats: archiving one is -1 on drafts and +1 here
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS drafts_archive_stats_insert AFTER INSERT ON drafts_archive BEGIN{_draft_counters('new', '1')}\nEND")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS drafts_archive_stats_delete AFTER DELETE ON drafts_archive BEGIN{_draft_counters('old', '-1')}\nEND")
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS drafts_archive_stats_update AFTER UPDATE OF status, type, converted_at ON drafts_archive "
+        f"BEGIN{_draft_counters('old', '-1')}{_draft_counters('new', '1')}\nEND"
+    )
+
+    # ...and can still convert
+    conversions = "".join(f"\n        {CONVERSION_SQL.format(table=table)};" for table in ("drafts", "drafts_archive"))
+    conn.execute("DROP TRIGGER IF EXISTS pets_conversion")
+    conn.execute(f"""
+    CREATE TRIGGER pets_conversion AFTER UPDATE OF last_vaccination_date, last_checkup_date ON pets
+    WHEN new.last_vaccination_date > COALESCE(old.last_vaccination_date, '')
+      OR new.last_checkup_date > COALESCE(old.last_checkup_date, '')
+    BEGIN{conversions}
+    END""")
+
+    # The due-reminder scheduler range-scans last_checkup_date like next_vaccination_date
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pets_last_checkup ON pets (last_checkup_date)")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS scheduler_state (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+# Body of the pets_conversion trigger, once per drafts table
+CONVERSION_SQL = """UPDATE {table} SET converted_at = CURRENT_TIMESTAMP
+        WHERE pet_id = new.id AND status = 'sent' AND converted_at IS NULL
+          AND date(created_at) <= MAX(COALESCE(new.last_vaccination_date, ''), COALESCE(new.last_checkup_date, ''))"""
+
+def _table_versions(conn):
+    """Per-table write counters behind the conditional-GET cache (see services.http_cache)"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    for table in ("pets", "drafts", "campaigns", "settings"):
+        # Random starting point, so a recreated database never reuses a client's ETag
+        conn.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, abs(random() % 1000000000))", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+            END""")
+
+def _due_date_key_indexes(conn):
+    """(date, id) indexes for the due-reminder watermarks, which no longer use rowids"""
+    for name, column in (("idx_pets_next_vaccination", "next_vaccination_date"), ("idx_pets_last_checkup", "last_checkup_date")):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(f"CREATE INDEX {name} ON pets ({column}, id)")
+
+# (version, description, step) -- append only
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "legacy pets columns", _legacy_pet_columns),
+    (3, "default settings", _default_settings),
+    (4, "indexes on hot query columns", _hot_column_indexes),
+    (5, "canonical ISO pet dates", _canonical_dates),
+    (6, "campaign fan-out tracking", _campaign_fan_out),
+    (7, "outbound message outbox", _outbox),
+    (8, "gemini response cache", _llm_cache),
+    (9, "pet dedup key and duplicate merge", _pet_dedup_key),
+    (10, "full-text pet search", _pet_search),
+    (11, "trigger-maintained stats counters", _stats_counters),
+    (12, "draft archive and scheduler state", _draft_archive),
+    (13, "per-table write versions", _table_versions),
+    (14, "due-date key indexes", _due_date_key_indexes),
+]
+
+def current_version(conn) -> int:
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def run_migrations(conn) -> int:
+    """Apply pending migrations in order; returns the resulting schema version"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, description, step in MIGRATIONS:
+        # IMMEDIATE takes the write lock up front, so concurrent starters serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+            print(f"📦 Applied migration {version}: {description}")
+        except Exception:
+            conn.rollback()
+            raise
+
+    return current_version(conn)
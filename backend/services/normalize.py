@@ -0,0 +1,189 @@
+"""
+Columnar Normalization Stage for Pet Imports
+
+Works on whole DataFrame columns at once: fuzzy header matching, E.164
+phone canonicalization, species canonicalization, age cleanup and date
+parsing. Used by the Excel/CSV importer and the Telegram batch path.
+"""
+
+import difflib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from services.dates import normalize_date
+
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "234").lstrip("+")
+
+# Canonical record key -> header spellings seen in clinic exports
+HEADER_ALIASES = {
+    "name": ["name", "pet name", "pet", "patient", "patient name", "animal name"],
+    "ownerName": ["owner name", "owner", "client", "client name", "customer", "parent"],
+    "ownerPhone": ["owner phone", "phone", "phone number", "whatsapp", "mobile", "telephone", "contact", "tel"],
+    "species": ["species", "type", "animal", "animal type", "kind"],
+    "breed": ["breed"],
+    "sex": ["sex", "gender"],
+    "color": ["color", "colour", "coat"],
+    "age": ["age"],
+    "weight": ["weight", "weight kg"],
+    "status": ["status"],
+    "birthday": ["birthday", "dob", "date of birth", "birth date"],
+    "lastVaccinationDate": ["last vaccination", "last vax", "last vaccination date", "vaccinated on"],
+    "nextVaccinationDate": ["next vaccination", "next vax", "next visit", "next vaccination date", "due date", "vaccination due"],
+    "lastDewormingDate": ["last deworming", "last deworming date", "dewormed on"],
+    "lastCheckupDate": ["last checkup", "last check up", "last checkup date", "last visit"],
+}
+
+SPECIES_SYNONYMS = {
+    "dog": "Dog", "dogs": "Dog", "canine": "Dog", "puppy": "Dog", "pup": "Dog", "k9": "Dog",
+    "cat": "Cat", "cats": "Cat", "feline": "Cat", "kitten": "Cat", "kitty": "Cat",
+    "bird": "Bird", "parrot": "Bird", "avian": "Bird",
+    "rabbit": "Rabbit", "bunny": "Rabbit",
+}
+
+DATE_FIELDS = ("birthday", "lastVaccinationDate", "nextVaccinationDate", "lastDewormingDate", "lastCheckupDate")
+# Vectorized formats tried before the per-value fallback
+_VECTOR_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+_ALIAS_TO_FIELD = {alias: field for field, aliases in HEADER_ALIASES.items() for alias in aliases}
+_ALIAS_TO_FIELD.update({field.lower(): field for field in HEADER_ALIASES})
+
+def _header_key(header) -> str:
+    text = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", str(header))  # camelCase -> camel Case
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return text.strip()
+
+def match_headers(columns) -> dict:
+    """Map raw headers to canonical keys (exact alias first, then fuzzy)"""
+    mapping, taken = {}, set()
+    pending = []
+    for column in columns:
+        field = _ALIAS_TO_FIELD.get(_header_key(column))
+        if field and field not in taken:
+            mapping[column] = field
+            taken.add(field)
+        else:
+            pending.append(column)
+    for column in pending:
+        match = difflib.get_close_matches(_header_key(column), _ALIAS_TO_FIELD.keys(), n=1, cutoff=0.8)
+        if match and _ALIAS_TO_FIELD[match[0]] not in taken:
+            mapping[column] = _ALIAS_TO_FIELD[match[0]]
+            taken.add(mapping[column])
+    return mapping
+
+_BLANKS = ["", "nan", "none", "null", "nat", "unknown", "n/a"]
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """Strings with blanks/NaN as <NA>; integral floats lose their '.0'"""
+    if series.isna().all():
+        return pd.Series(pd.NA, index=series.index, dtype="string")
+    if pd.api.types.is_float_dtype(series):
+        integral = series.notna() & (series % 1 == 0)
+        series = series.astype(object).where(~integral, series.fillna(0).astype("int64"))
+    text = series.astype("string").str.strip()
+    if pd.api.types.is_object_dtype(series) and text.str.endswith(".0").any():
+        text = text.str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    return text.mask(text.str.lower().isin(_BLANKS))
+
+def canonical_phones(series: pd.Series, country_code: str = DEFAULT_COUNTRY_CODE) -> pd.Series:
+    """E.164-style '+<country><number>'; <NA> where the number is unusable"""
+    text = _as_text(series)
+    has_plus = text.str.startswith("+").fillna(False)
+    digits = text.str.replace(r"\D", "", regex=True)
+    international = has_plus | digits.str.startswith("00").fillna(False)
+    digits = digits.where(~digits.str.startswith("00").fillna(False), digits.str[2:])
+    trunk = ~international & digits.str.startswith("0").fillna(False)
+    digits = digits.where(~trunk, country_code + digits.str[1:])
+    # Spreadsheets drop the trunk zero (8012345678); assume a national number
+    bare = ~international & ~trunk & ~digits.str.startswith(country_code).fillna(False)
+    digits = digits.where(~bare, country_code + digits)
+    valid = digits.str.len().between(8, 15).fillna(False)
+    return ("+" + digits).where(valid)
+
+def canonical_phone(value, country_code: str = DEFAULT_COUNTRY_CODE):
+    """canonical_phones for a single value; None where unusable"""
+    phone = canonical_phones(pd.Series([value], dtype=object), country_code).iloc[0]
+    return None if pd.isna(phone) else phone
+
+def canonical_species(series: pd.Series) -> pd.Series:
+    text = _as_text(series).str.lower()
+    return text.map(SPECIES_SYNONYMS, na_action="ignore").fillna(text.str.title())
+
+def canonical_ages(series: pd.Series) -> pd.Series:
+    """'2', '2y', '2 yrs' -> '2 years'; '6m', '6 mos' -> '6 months'; other text kept"""
+    text = _as_text(series)
+    parts = text.str.extract(r"^(\d+(?:\.\d+)?)\s*(y|yr|yrs|year|years|m|mo|mos|month|months|w|wk|wks|week|weeks)?$", flags=re.I)
+    unit = parts[1].str.lower().str[0].map({"y": "years", "m": "months", "w": "weeks"}).fillna("years")
+    formatted = parts[0] + " " + unit
+    return formatted.where(parts[0].notna(), text)
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """ISO 'YYYY-MM-DD' strings; <NA> where unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    else:
+        # Native datetime cells stringify as 'YYYY-MM-DD HH:MM:SS' and match below
+        text = _as_text(series)
+        parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+        for fmt in _VECTOR_DATE_FORMATS:
+            todo = parsed.isna() & text.notna()
+            if not todo.any():
+                break
+            parsed[todo] = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+        leftovers = parsed.isna() & text.notna()
+        if leftovers.any():
+            # Rare spellings ('Dec 15 2026') fall back to the scalar parser
+            parsed[leftovers] = pd.to_datetime(text[leftovers].map(normalize_date), errors="coerce")
+    return parsed.dt.strftime("%Y-%m-%d").astype("string")
+
+def normalize_frame(df: pd.DataFrame):
+    """Return (clean frame keyed by canonical fields, [(position, reason), ...] rejected)"""
+    mapping = match_headers(df.columns)
+    df = df[list(mapping)].rename(columns=mapping).reset_index(drop=True)
+
+    for field in HEADER_ALIASES:
+        if field not in df.columns:
+            df[field] = pd.Series(pd.NA, index=df.index, dtype="string")
+
+    raw_phone = _as_text(df["ownerPhone"])
+    df["ownerPhone"] = canonical_phones(df["ownerPhone"])
+    df["species"] = canonical_species(df["species"])
+    df["age"] = canonical_ages(df["age"])
+    for field in DATE_FIELDS:
+        df[field] = parse_dates(df[field])
+    for field in ("name", "ownerName", "breed", "sex", "color", "weight", "status"):
+        df[field] = _as_text(df[field])
+
+    # Vectorized rejection rules, first matching reason wins
+    reasons = pd.Series(pd.NA, index=df.index, dtype="string")
+    rules = (
+        (df["name"].isna(), "missing pet name"),
+        (df["ownerName"].isna() & raw_phone.isna(), "missing owner name and phone"),
+        (raw_phone.notna() & df["ownerPhone"].isna(), "invalid phone number"),
+    )
+    for mask, reason in rules:
+        reasons = reasons.mask(reasons.isna() & mask, reason)
+
+    rejected_mask = reasons.notna().to_numpy()
+    rejected = list(zip(np.flatnonzero(rejected_mask).tolist(), reasons[rejected_mask].tolist()))
+    return df[~rejected_mask], rejected
+
+def normalize_records(records: list):
+    """normalize_frame for a list of dicts (e.g. Gemini batch output)"""
+    if not records:
+        return [], []
+    clean, rejected = normalize_frame(pd.DataFrame.from_records(records))
+    return clean.astype(object).where(clean.notna(), None).to_dict("records"), rejected
+
+def summarize_rejections(rejected: list, row_offset: int = 0, limit: int = 200) -> dict:
+    """Counts per reason plus the first ``limit`` rejected rows"""
+    counts = {}
+    for _, reason in rejected:
+        counts[reason] = counts.get(reason, 0) + 1
+    return {
+        "rejected": len(rejected),
+        "reasons": counts,
+        "rows": [{"row": position + row_offset, "error": reason} for position, reason in rejected[:limit]],
+    }
@@ -0,0 +1,220 @@
+"""
+Outbound Message Outbox
+
+Approving a draft only writes an outbox row, in the same transaction as the
+draft's status change. A worker started by the lifespan claims due rows in
+batches, sends them through the dispatcher and records the message id or
+error. Failures retry with exponential backoff; after OUTBOX_MAX_ATTEMPTS
+(or a permanent 4xx) a row is dead-lettered. Claims are leases, so rows
+held by a process that died mid-send are picked up again. While Kapso has
+no credentials the worker claims nothing, so queued rows keep their
+attempts until it is configured.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+from services.async_db import fetch_all, run_db
+from services.dispatcher import Dispatcher
+from services.kapso import get_config as get_kapso_config
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+RETRY_BASE_SEC = float(os.getenv("OUTBOX_RETRY_BASE_SEC", "30"))
+RETRY_MAX_SEC = float(os.getenv("OUTBOX_RETRY_MAX_SEC", "3600"))
+LEASE_SEC = float(os.getenv("OUTBOX_LEASE_SEC", "300"))
+POLL_SEC = float(os.getenv("OUTBOX_POLL_SEC", "2"))
+SHUTDOWN_GRACE_SEC = 10.0
+
+ENQUEUE_SQL = """
+INSERT OR IGNORE INTO outbox (draft_id, campaign_id, to_phone, message)
+SELECT d.id, d.campaign_id, p.owner_phone, d.draft_message
+FROM drafts d JOIN pets p ON d.pet_id = p.id
+WHERE {where}
+"""
+
+# A draft that can still be approved
+OPEN_DRAFT = "d.id = ? AND d.status NOT IN ('queued', 'sent')"
+
+REQUEUE_DRAFT_SQL = f"""
+UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ?, last_error = NULL
+WHERE draft_id = ? AND status = 'dead'
+  AND EXISTS (SELECT 1 FROM drafts d JOIN pets p ON d.pet_id = p.id WHERE {OPEN_DRAFT})
+"""
+
+EXPIRE_LEASES_SQL = "UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND claimed_at < ?"
+
+CLAIM_SQL = """
+UPDATE outbox SET status = 'sending', claimed_at = ?, attempts = attempts + 1
+WHERE id IN (
+    SELECT id FROM outbox
+    WHERE status = 'pending' AND next_attempt_at <= ?
+    ORDER BY next_attempt_at LIMIT ?
+)
+RETURNING id, draft_id, campaign_id, to_phone, message, attempts
+"""
+
+dispatcher = Dispatcher()
+
+# --- Enqueue (runs inside the caller's transaction) ---
+
+def enqueue_draft(conn, draft_id: str, message: str = None) -> bool:
+    """Queue one draft (optionally with an edited message); False if missing, already queued or sent, or its pet is gone.
+
+    A draft that failed before keeps its dead-lettered outbox row (one per
+    draft), so re-approving it puts that row back in the queue.
+    """
+    queued = (
+        conn.execute(REQUEUE_DRAFT_SQL, (time.time(), draft_id, draft_id)).rowcount
+        or conn.execute(ENQUEUE_SQL.format(where=OPEN_DRAFT), (draft_id,)).rowcount
+    )
+    if not queued:
+        return False
+    conn.execute(
+        "UPDATE drafts SET status = 'queued', draft_message = COALESCE(?, draft_message) WHERE id = ?",
+        (message, draft_id)
+    )
+    if message is not None:
+        conn.execute("UPDATE outbox SET message = ? WHERE draft_id = ?", (message, draft_id))
+    return True
+
+def enqueue_campaign(conn, campaign_id: str) -> int:
+    """Queue every draft of a campaign still awaiting review"""
+    queued = conn.execute(
+        ENQUEUE_SQL.format(where="d.campaign_id = ? AND d.status = 'pending_review'"), (campaign_id,)
+    ).rowcount
+    conn.execute(
+        "UPDATE drafts SET status = 'queued' WHERE campaign_id = ? AND status = 'pending_review'",
+        (campaign_id,)
+    )
+    return queued
+
+# --- Worker side ---
+
+def claim_batch(conn, limit: int, now: float) -> list:
+    """Lease up to ``limit`` due rows; expired leases become claimable again"""
+    conn.execute(EXPIRE_LEASES_SQL, (now - LEASE_SEC,))
+    rows = conn.execute(CLAIM_SQL, (now, now, limit)).fetchall()
+    return [dict(r) for r in rows]
+
+def _is_permanent(result: dict) -> bool:
+    """4xx other than 408/429 will fail the same way on retry"""
+    code = result.get("status_code") or 0
+    return 400 <= code < 500 and code not in (408, 429)
+
+def retry_delay(attempts: int) -> float:
+    return min(RETRY_MAX_SEC, RETRY_BASE_SEC * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+def record_results(conn, rows: list, results: list, now: float):
+    sent, retry, dead, released = [], [], [], []
+    per_campaign = {}
+    for row, result in zip(rows, results):
+        if result.get("success"):
+            sent.append((result.get("sid"), row["id"]))
+            if row["campaign_id"]:
+                per_campaign[row["campaign_id"]] = per_campaign.get(row["campaign_id"], 0) + 1
+        elif result.get("not_configured"):
+            # Credentials were removed mid-batch: back in the queue, attempt not spent
+            released.append((str(result.get("error"))[:500], row["id"]))
+        elif row["attempts"] >= MAX_ATTEMPTS or _is_permanent(result):
+            dead.append((str(result.get("error"))[:500], row["id"]))
+        else:
+            retry.append((now + retry_delay(row["attempts"]), str(result.get("error"))[:500], row["id"]))
+
+    conn.executemany(
+        "UPDATE outbox SET status = 'sent', message_id = ?, last_error = NULL, sent_at = CURRENT_TIMESTAMP WHERE id = ?",
+        sent
+    )
+    conn.executemany(
+        "UPDATE outbox SET status = 'pending', next_attempt_at = ?, last_error = ? WHERE id = ?", retry
+    )
+    conn.executemany("UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?", dead)
+    conn.executemany(
+        "UPDATE outbox SET status = 'pending', attempts = attempts - 1, last_error = ? WHERE id = ?", released
+    )
+
+    drafts = {row["id"]: row["draft_id"] for row in rows if row["draft_id"]}
+    conn.executemany(
+        "UPDATE drafts SET status = 'sent' WHERE id = ?", [(drafts[i],) for _, i in sent if i in drafts]
+    )
+    conn.executemany(
+        "UPDATE drafts SET status = 'failed' WHERE id = ?", [(drafts[i],) for _, i in dead if i in drafts]
+    )
+    conn.executemany(
+        "UPDATE campaigns SET sent_count = sent_count + ? WHERE id = ?",
+        [(count, campaign_id) for campaign_id, count in per_campaign.items()]
+    )
+
+def retry_dead(conn, outbox_id: int) -> bool:
+    """Put a dead-lettered row back in the queue"""
+    row = conn.execute("SELECT draft_id FROM outbox WHERE id = ? AND status = 'dead'", (outbox_id,)).fetchone()
+    if not row:
+        return False
+    conn.execute(
+        "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE id = ?",
+        (time.time(), outbox_id)
+    )
+    if row["draft_id"]:
+        conn.execute("UPDATE drafts SET status = 'queued' WHERE id = ?", (row["draft_id"],))
+    return True
+
+_worker_task = None
+_wake = None
+_stopping = None
+
+def notify():
+    """Wake the worker now instead of at the next poll (call on the app loop)"""
+    if _wake is not None:
+        _wake.set()
+
+async def _run_worker():
+    while not _stopping.is_set():
+        try:
+            _wake.clear()
+            # Unconfigured Kapso fails every send the same way; leave rows queued
+            rows = [] if get_kapso_config().error else await run_db(claim_batch, BATCH_SIZE, time.time())
+            if not rows:
+                try:
+                    await asyncio.wait_for(_wake.wait(), POLL_SEC)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            results = await dispatcher.dispatch([(r["to_phone"], r["message"]) for r in rows])
+            await run_db(record_results, rows, results, time.time())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Outbox worker error: {e}")
+            await asyncio.sleep(POLL_SEC)
+
+def start_worker():
+    global _worker_task, _wake, _stopping
+    if _worker_task is not None and not _worker_task.done():
+        return
+    _wake, _stopping = asyncio.Event(), asyncio.Event()
+    _worker_task = asyncio.get_running_loop().create_task(_run_worker())
+    print("📤 Outbox worker started")
+
+async def stop_worker():
+    """Let the in-flight batch finish (up to a grace period), then cancel"""
+    global _worker_task
+    if _worker_task is None:
+        return
+    _stopping.set()
+    _wake.set()
+    try:
+        await asyncio.wait_for(_worker_task, SHUTDOWN_GRACE_SEC)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        pass
+    _worker_task = None
+
+async def get_metrics() -> dict:
+    counts = await fetch_all("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status")
+    return {
+        "worker": _worker_task is not None and not _worker_task.done(),
+        "paused": get_kapso_config().error,
+        "outbox": {row["status"]: row["n"] for row in counts},
+        "dispatch": dispatcher.metrics.snapshot(),
+    }
@@ -0,0 +1,31 @@
+"""
+Keyset Pagination Helpers
+"""
+
+import base64
+import json
+
+SCALARS = (str, int, float)
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row into an opaque cursor"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int, types: tuple = None) -> list:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed.
+
+    Values end up as SQL parameters, so each must be a string or number
+    (``types`` narrows that per position, e.g. (str, str)).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    for value, expected in zip(values, types or (SCALARS,) * size):
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError("Invalid cursor")
+    return values
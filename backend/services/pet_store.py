@@ -0,0 +1,256 @@
+"""
+Pet Persistence Helpers
+
+Shared by every ingest path (API, Excel/CSV import, Telegram) so rows are
+validated, defaulted and written the same way everywhere. Rows are upserted
+on a normalized dedup key (canonical owner phone + casefolded pet name), so
+re-importing a sheet or re-sending a Telegram batch updates the existing
+pets instead of duplicating them.
+"""
+
+import json
+import uuid
+from typing import Optional
+
+import pandas as pd
+
+from services.dates import normalize_date
+from services.normalize import canonical_phones, normalize_records
+from services.sqlite_db import db_connection
+
+# Record key (frontend/LLM naming) -> pets column
+RECORD_COLUMNS = {
+    "name": "name",
+    "species": "species",
+    "breed": "breed",
+    "sex": "sex",
+    "color": "color",
+    "age": "age",
+    "weight": "weight",
+    "ownerName": "owner_name",
+    "ownerPhone": "owner_phone",
+    "status": "status",
+    "birthday": "birthday",
+    "lastVaccinationDate": "last_vaccination_date",
+    "nextVaccinationDate": "next_vaccination_date",
+    "lastDewormingDate": "last_deworming_date",
+    "lastCheckupDate": "last_checkup_date",
+}
+
+DEFAULTS = {
+    "species": "Dog",
+    "breed": "Unknown",
+    "sex": "Unknown",
+    "color": "Unknown",
+    "age": "Unknown",
+    "weight": "Unknown",
+    "ownerName": "Unknown",
+    "ownerPhone": "Unknown",
+    "status": "Healthy",
+}
+
+DATE_KEYS = ("birthday", "lastVaccinationDate", "nextVaccinationDate", "lastDewormingDate", "lastCheckupDate")
+
+# Parameter number of each record key in UPSERT_SQL (?1 is the id)
+_PARAMS = {key: n for n, key in enumerate(RECORD_COLUMNS, start=2)}
+
+def _insert_value(key: str) -> str:
+    # Rows carry None for a missing defaulted field; the default is filled in here
+    if key in DEFAULTS:
+        return f"COALESCE(?{_PARAMS[key]}, '{DEFAULTS[key]}')"
+    return f"?{_PARAMS[key]}"
+
+def _merge_rule(key: str, column: str) -> str:
+    """How an incoming value merges into the stored pet with the same dedup key"""
+    if key in DATE_KEYS and key != "birthday":
+        # Visit/due dates only move forward: a stale sheet never rolls them back
+        return f"MAX(COALESCE(excluded.{column}, pets.{column}), COALESCE(pets.{column}, excluded.{column}))"
+    if key in DEFAULTS:
+        # excluded.{column} already holds the filled-in default; read the raw
+        # parameter so only a missing value keeps the stored one, while an
+        # explicit 'Healthy' or 'Dog' still overwrites it
+        return f"COALESCE(?{_PARAMS[key]}, pets.{column})"
+    return f"COALESCE(excluded.{column}, pets.{column})"
+
+# name is part of the key, so the stored spelling is kept; id and created_at are never touched
+UPSERT_SQL = (
+    f"INSERT INTO pets (id, {', '.join(RECORD_COLUMNS.values())}, dedup_key) "
+    f"VALUES (?1, {', '.join(map(_insert_value, RECORD_COLUMNS))}, ?{len(RECORD_COLUMNS) + 2}) "
+    f"ON CONFLICT(dedup_key) DO UPDATE SET "
+    + ", ".join(f"{column} = {_merge_rule(key, column)}" for key, column in RECORD_COLUMNS.items() if key != "name")
+    + " RETURNING id"
+)
+
+# Scanned per chunk by the one-time merge of pre-existing duplicates
+MERGE_SCAN_CHUNK = 5000
+MAX_REPORTED_MERGES = 200
+
+def clean_value(value) -> Optional[str]:
+    """Stringify a cell/JSON value; None for blanks and NaN"""
+    if value is None or value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheet phone numbers arrive as 8012345678.0
+        value = int(value)
+    text = str(value).strip()
+    return text if text and text.lower() not in ("nan", "none", "null") else None
+
+def dedup_key(name, owner_phone, owner_name=None) -> Optional[str]:
+    """Normalized pet identity: '<canonical phone>|<pet name>'.
+
+    ``owner_phone`` must already be canonical ('+<country><number>'); without
+    one the owner's name stands in. None (never merged) when there is no pet
+    name or no owner detail at all.
+    """
+    pet = " ".join(str(name or "").split()).casefold()
+    if not pet:
+        return None
+    phone = clean_value(owner_phone)
+    if phone and phone.startswith("+"):
+        return f"{phone}|{pet}"
+    owner = " ".join(str(owner_name or "").split()).casefold()
+    if owner and owner != DEFAULTS["ownerName"].casefold():
+        return f"owner:{owner}|{pet}"
+    return None
+
+def pet_row(record: dict) -> tuple:
+    """Build an UPSERT_SQL parameter tuple (with a fresh id) from a record.
+
+    Missing or blank fields stay None; UPSERT_SQL fills in DEFAULTS on insert
+    and keeps the stored value on a merge.
+    """
+    values = []
+    for key in RECORD_COLUMNS:
+        if key in DATE_KEYS:
+            values.append(normalize_date(record.get(key)))
+        else:
+            values.append(clean_value(record.get(key)))
+    return (str(uuid.uuid4()), *values, dedup_key(record.get("name"), record.get("ownerPhone"), record.get("ownerName")))
+
+def frame_rows(df) -> list:
+    """UPSERT_SQL tuples for a normalized DataFrame (see services.normalize)"""
+    columns = []
+    for key in RECORD_COLUMNS:
+        column = df[key] if key in df.columns else None
+        if column is None:
+            columns.append([None] * len(df))
+        else:
+            column = column.astype(object)
+            columns.append(column.where(column.notna(), None).tolist())
+    ids = [str(uuid.uuid4()) for _ in range(len(df))]
+    keys = list(RECORD_COLUMNS)
+    name, phone, owner = (columns[keys.index(k)] for k in ("name", "ownerPhone", "ownerName"))
+    return list(zip(ids, *columns, map(dedup_key, name, phone, owner)))
+
+def upsert_pets(conn, rows: list) -> list:
+    """Upsert pet_row() tuples; the caller owns the transaction.
+
+    Returns the stored id per row: the row's own id when inserted, the
+    existing pet's id when it was merged (also for repeats within ``rows``).
+    """
+    # One execute per row: executemany can't return the RETURNING ids
+    return [conn.execute(UPSERT_SQL, row).fetchone()[0] for row in rows]
+
+def count_merged(rows: list, ids: list) -> int:
+    return sum(1 for row, pet_id in zip(rows, ids) if row[0] != pet_id)
+
+def merge_duplicates(conn) -> dict:
+    """One-time merge of pets that share a dedup key (runs in the dedup migration).
+
+    The oldest pet of each group is kept; the others are folded into it in
+    creation order with the UPSERT_SQL rules, their drafts repointed and
+    medical histories appended. Every merge is recorded in pet_merges, and
+    dedup_key ends up filled and uniquely indexed.
+    """
+    keepers, duplicates, scanned = {}, [], 0
+    cursor = conn.execute("SELECT id, name, owner_phone, owner_name FROM pets ORDER BY created_at, id")
+    while True:
+        chunk = cursor.fetchmany(MERGE_SCAN_CHUNK)
+        if not chunk:
+            break
+        scanned += len(chunk)
+        # Older rows may hold '0801...' style numbers; key on the canonical form
+        phones = canonical_phones(pd.Series([row[2] for row in chunk], dtype=object))
+        for (pet_id, name, raw_phone, owner_name), phone in zip(chunk, phones.tolist()):
+            phone = None if pd.isna(phone) else phone
+            key = dedup_key(name, phone, owner_name)
+            if key is None:
+                continue
+            if key in keepers:
+                duplicates.append((pet_id, key, phone or raw_phone))
+            else:
+                keepers[key] = pet_id
+
+    conn.executemany("UPDATE pets SET dedup_key = ? WHERE id = ?", [(key, pet_id) for key, pet_id in keepers.items()])
+    # Keepers are unique by construction; the duplicates below merge through it
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_pets_dedup_key ON pets (dedup_key)")
+
+    columns = ", ".join(RECORD_COLUMNS.values())
+    merges, drafts_moved = [], 0
+    phone_index = 1 + list(RECORD_COLUMNS).index("ownerPhone")
+    for pet_id, key, phone in duplicates:
+        kept_id = keepers[key]
+        row = conn.execute(f"SELECT id, {columns}, medical_history FROM pets WHERE id = ?", (pet_id,)).fetchone()
+        moved = conn.execute("UPDATE drafts SET pet_id = ? WHERE pet_id = ?", (kept_id, pet_id)).rowcount
+        conn.execute("DELETE FROM pets WHERE id = ?", (pet_id,))
+        values = list(row)[:-1]
+        values[phone_index] = phone
+        # Stored rows can't tell a typed 'Unknown' from a filled-in one; treat
+        # defaults as missing so they never overwrite the kept pet's values
+        for position, field in enumerate(RECORD_COLUMNS, start=1):
+            if field in DEFAULTS and values[position] == DEFAULTS[field]:
+                values[position] = None
+        conn.execute(UPSERT_SQL, (*values, key)).fetchone()
+        history = json.loads(row["medical_history"] or "[]")
+        if history:
+            kept = conn.execute("SELECT medical_history FROM pets WHERE id = ?", (kept_id,)).fetchone()[0]
+            conn.execute(
+                "UPDATE pets SET medical_history = ? WHERE id = ?",
+                (json.dumps(json.loads(kept or "[]") + history), kept_id)
+            )
+        drafts_moved += moved
+        merges.append((key, kept_id, pet_id, row["name"], moved))
+
+    conn.executemany(
+        "INSERT INTO pet_merges (dedup_key, kept_id, merged_id, pet_name, drafts_moved) VALUES (?, ?, ?, ?, ?)",
+        merges
+    )
+    return {
+        "scanned": scanned,
+        "merged": len(merges),
+        "groups": len({key for key, *_ in merges}),
+        "draftsMoved": drafts_moved,
+        "merges": [
+            {"dedupKey": key, "keptId": kept_id, "mergedId": pet_id, "name": name, "draftsMoved": moved}
+            for key, kept_id, pet_id, name, moved in merges[:MAX_REPORTED_MERGES]
+        ],
+    }
+
+def save_records(records: list) -> list:
+    """Validate and insert a batch of record dicts in one transaction.
+
+    Returns one outcome per input, in order: {"row", "status": "saved" |
+    "rejected" | "failed", "id" and "merged" or "error", "record"}. Blocking;
+    async callers run it in a thread.
+    """
+    outcomes = [{"row": i, "status": "rejected", "error": "not a record"} for i in range(len(records))]
+    positions = [i for i, record in enumerate(records) if isinstance(record, dict)]
+    clean, rejected = normalize_records([records[i] for i in positions])
+    for position, reason in rejected:
+        outcomes[positions[position]]["error"] = reason
+    dropped = {position for position, _ in rejected}
+    accepted = [positions[i] for i in range(len(positions)) if i not in dropped]
+
+    rows = [pet_row(record) for record in clean]
+    try:
+        with db_connection() as conn:
+            ids = upsert_pets(conn, rows)
+    except Exception as e:
+        print(f"DB Error: {e}")
+        for row in accepted:
+            outcomes[row] = {"row": row, "status": "failed", "error": str(e)}
+        return outcomes
+
+    for row, record, values, pet_id in zip(accepted, clean, rows, ids):
+        outcomes[row] = {"row": row, "status": "saved", "id": pet_id, "merged": pet_id != values[0], "record": record}
+    return outcomes
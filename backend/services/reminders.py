@@ -0,0 +1,94 @@
+"""
+Batched Reminder Drafting
+
+Packs REMINDER_BATCH_SIZE pets into each structured-output Gemini call
+(see gemini.generate_reminder_batch), falls back to a per-pet call (or the
+template message when Gemini is unreachable) for any pet whose entry fails
+validation and writes each batch straight into drafts as it completes.
+"""
+
+import asyncio
+import os
+import uuid
+
+from services.async_db import run_db
+from services.gemini import MAX_CONCURRENCY, fallback_reminder, generate_reminder, generate_reminder_batch
+
+BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "25"))
+MAX_BATCH_SIZE = 100
+# SQLite's default host-parameter limit is well above this
+ID_CHUNK = 500
+
+PET_COLUMNS = "id, name, species, owner_name, owner_phone, next_vaccination_date"
+
+DUE_PETS_SQL = f"""SELECT {PET_COLUMNS} FROM pets
+    WHERE next_vaccination_date BETWEEN ? AND ?
+    ORDER BY next_vaccination_date LIMIT ?"""
+
+def pets_by_id_sql(count: int) -> str:
+    return f"SELECT {PET_COLUMNS} FROM pets WHERE id IN ({', '.join('?' for _ in range(count))})"
+
+def select_pets(conn, pet_ids: list = None, due_from: str = None, due_to: str = None, limit: int = 1000) -> list:
+    if pet_ids:
+        pets = []
+        for start in range(0, min(len(pet_ids), limit), ID_CHUNK):
+            chunk = pet_ids[start:min(start + ID_CHUNK, limit)]
+            pets += conn.execute(pets_by_id_sql(len(chunk)), chunk).fetchall()
+    else:
+        pets = conn.execute(DUE_PETS_SQL, (due_from, due_to, limit)).fetchall()
+    return [dict(p) for p in pets]
+
+def insert_drafts(conn, rows: list) -> int:
+    conn.executemany(
+        "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, ?, ?, 'pending_review')",
+        rows
+    )
+    return len(rows)
+
+async def compose_drafts(batch: list, clinic_name: str, reminder_type: str, booking_url: str,
+                         tone: str = "friendly") -> tuple:
+    """One Gemini call for ``batch``: ([(draft id, pet id, type, message)], fallbacks used).
+
+    Pets the batch answer leaves out (malformed JSON, invalid entries) go
+    through generate_reminder one at a time; its template is cached, so that
+    costs at most one more call. If the batch call failed outright, they get
+    the template message.
+    """
+    messages = await generate_reminder_batch(batch, clinic_name, reminder_type, booking_url, tone)
+    fallbacks = len(batch) - len(messages or {})
+    if messages is not None:
+        for i, pet in enumerate(batch):
+            if i not in messages:
+                messages[i] = await generate_reminder(pet["name"], pet["owner_name"], clinic_name, reminder_type,
+                                                      booking_url, tone)
+    rows = [
+        (
+            str(uuid.uuid4()), pet["id"], reminder_type,
+            (messages or {}).get(i)
+            or fallback_reminder(pet["name"], pet["owner_name"], clinic_name, reminder_type, booking_url),
+        )
+        for i, pet in enumerate(batch)
+    ]
+    return rows, fallbacks
+
+async def draft_reminders(pets: list, clinic_name: str, reminder_type: str, booking_url: str,
+                          tone: str = "friendly", batch_size: int = BATCH_SIZE) -> dict:
+    """Generate and store one pending_review draft per pet; returns counts"""
+    batch_size = max(1, min(batch_size or BATCH_SIZE, MAX_BATCH_SIZE))
+    batches = [pets[start:start + batch_size] for start in range(0, len(pets), batch_size)]
+    # Don't queue more calls than the Gemini executor runs, so none time out waiting
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def run(batch):
+        async with semaphore:
+            rows, fallbacks = await compose_drafts(batch, clinic_name, reminder_type, booking_url, tone)
+        await run_db(insert_drafts, rows)
+        return len(rows), fallbacks
+
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    return {
+        "pets": len(pets),
+        "drafts_created": sum(created for created, _ in results),
+        "llm_calls": len(batches),
+        "fallbacks": sum(fallbacks for _, fallbacks in results),
+    }
@@ -0,0 +1,115 @@
+"""
+Two-Tier Cache for Gemini Responses
+
+Keys are SHA-256 hashes of the model and prompt inputs. Lookups try an
+in-process LRU first, then the llm_cache table (so entries survive
+restarts); disk hits are promoted to memory. Entries expire after a TTL,
+the LRU is capped by entry count and the table by row count, evicting the
+least recently used rows.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from services.async_db import run_db
+
+MEMORY_ENTRIES = int(os.getenv("GEMINI_CACHE_MEMORY_ENTRIES", "1024"))
+MAX_ROWS = int(os.getenv("GEMINI_CACHE_MAX_ROWS", "10000"))
+DEFAULT_TTL_SEC = float(os.getenv("GEMINI_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+# Expired/overflow rows are pruned once per this many writes
+PRUNE_EVERY = 100
+
+def cache_key(*parts) -> str:
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def _load(conn, key: str, now: float):
+    row = conn.execute(
+        "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+    ).fetchone()
+    if row:
+        conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        return row["value"], row["expires_at"]
+    return None
+
+def _store(conn, key: str, namespace: str, value: str, now: float, expires_at: float, prune: bool) -> int:
+    conn.execute(
+        """INSERT INTO llm_cache (key, namespace, value, created_at, last_used_at, expires_at)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(key) DO UPDATE SET
+               value = excluded.value, last_used_at = excluded.last_used_at, expires_at = excluded.expires_at""",
+        (key, namespace, value, now, now, expires_at)
+    )
+    if not prune:
+        return 0
+    evicted = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+    overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - MAX_ROWS
+    if overflow > 0:
+        evicted += conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used_at LIMIT ?)",
+            (overflow,)
+        ).rowcount
+    return evicted
+
+class ResponseCache:
+    def __init__(self, memory_entries: int = MEMORY_ENTRIES):
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.counters = {"memoryHits": 0, "diskHits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.counters["memoryHits"] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+
+        found = await run_db(_load, key, now)
+        if found is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["diskHits"] += 1
+        self._remember(key, *found)
+        return found[0]
+
+    async def put(self, namespace: str, key: str, value: str, ttl: float = DEFAULT_TTL_SEC):
+        now = time.time()
+        self._remember(key, value, now + ttl)
+        self._writes += 1
+        evicted = await run_db(_store, key, namespace, value, now, now + ttl, self._writes % PRUNE_EVERY == 0)
+        self.counters["stores"] += 1
+        self.counters["evictions"] += evicted
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> dict:
+        lookups = self.counters["memoryHits"] + self.counters["diskHits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "memoryEntries": len(self._memory),
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+response_cache = ResponseCache()
@@ -0,0 +1,72 @@
+"""
+Draft Retention
+
+Finalized drafts (sent or rejected) older than DRAFT_ARCHIVE_AFTER_DAYS move
+from ``drafts`` to ``drafts_archive``, DRAFT_ARCHIVE_BATCH_SIZE at a time
+and one transaction per batch, so the review queue only ever holds live
+work. The stats triggers count the archive too (and archived sent drafts
+can still convert), so archiving leaves /api/stats unchanged.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from services.async_db import run_db
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("DRAFT_ARCHIVE_AFTER_DAYS", "30"))
+BATCH_SIZE = int(os.getenv("DRAFT_ARCHIVE_BATCH_SIZE", "1000"))
+
+# Failed drafts stay live: their dead-lettered message can still be retried
+FINAL_STATUSES = ("sent", "rejected")
+COLUMNS = "id, pet_id, type, draft_message, status, created_at, campaign_id, converted_at"
+FINALIZED_BATCH_SQL = (
+    f"SELECT id FROM drafts WHERE status IN ({', '.join('?' for _ in FINAL_STATUSES)}) AND created_at < ? LIMIT ?"
+)
+
+def archive_cutoff(now: datetime = None) -> str:
+    """drafts.created_at (UTC CURRENT_TIMESTAMP text) before which finalized drafts are archived"""
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=ARCHIVE_AFTER_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+
+def archive_batch(conn, cutoff: str, limit: int = BATCH_SIZE) -> int:
+    """Move up to ``limit`` finalized drafts created before ``cutoff``; returns how many moved"""
+    ids = [row[0] for row in conn.execute(FINALIZED_BATCH_SQL, (*FINAL_STATUSES, cutoff, limit))]
+    if not ids:
+        return 0
+    marks = ", ".join("?" for _ in ids)
+    conn.execute(f"INSERT INTO drafts_archive ({COLUMNS}) SELECT {COLUMNS} FROM drafts WHERE id IN ({marks})", ids)
+    conn.execute(f"DELETE FROM drafts WHERE id IN ({marks})", ids)
+    return len(ids)
+
+async def archive_finalized() -> dict:
+    """Archive everything past the cutoff, one batch (transaction) at a time"""
+    cutoff, archived = archive_cutoff(), 0
+    while True:
+        moved = await run_db(archive_batch, cutoff)
+        archived += moved
+        if moved < BATCH_SIZE:
+            break
+    if archived:
+        print(f"🗄️ Archived {archived} finalized drafts")
+    return {"archived": archived, "cutoff": cutoff}
+
+def archived_drafts_query(limit: int, pet_id: str = None, status: str = None, cursor: list = None):
+    """Keyset-paginated archive history (newest first), with the pet's current name/owner if it still exists"""
+    where, params = [], []
+    if pet_id:
+        where.append("a.pet_id = ?")
+        params.append(pet_id)
+    if status:
+        where.append("a.status = ?")
+        params.append(status)
+    if cursor:
+        where.append("(a.created_at, a.id) < (?, ?)")
+        params.extend(cursor)
+
+    query = """SELECT a.*, p.name AS pet_name, p.owner_name, p.owner_phone
+               FROM drafts_archive a LEFT JOIN pets p ON p.id = a.pet_id"""
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY a.created_at DESC, a.id DESC LIMIT ?"
+    params.append(limit)
+    return query, params
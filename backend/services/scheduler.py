@@ -0,0 +1,85 @@
+"""
+Background Scheduler
+
+Periodic jobs started by the lifespan, each on its own interval: drafting
+reminders for newly due pets (services.due_reminders) and archiving
+finalized drafts (services.retention). A job never overlaps itself, and
+its last result or error is kept for /api/scheduler.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from services.async_db import fetch_all
+from services.due_reminders import run_due_reminders
+from services.retention import archive_finalized
+
+ENABLED = os.getenv("SCHEDULER_ENABLED", "1") != "0"
+# Let startup (migrations, bot, outbox) settle before the first run
+STARTUP_DELAY_SEC = 10.0
+
+# name -> (interval seconds, coroutine function)
+JOBS = {
+    "due_reminders": (float(os.getenv("SCHEDULER_INTERVAL_SEC", "900")), run_due_reminders),
+    "archive_drafts": (float(os.getenv("DRAFT_ARCHIVE_INTERVAL_SEC", "3600")), archive_finalized),
+}
+
+_tasks = []
+_locks = {}
+_status = {name: {"runs": 0, "lastRunAt": None, "lastDurationSec": None, "lastResult": None, "lastError": None} for name in JOBS}
+
+async def run_job(name: str) -> dict:
+    """Run one job now (waiting for an in-flight run of it first); returns its status"""
+    lock = _locks.setdefault(name, asyncio.Lock())
+    status = _status[name]
+    async with lock:
+        started = time.monotonic()
+        status["lastRunAt"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        try:
+            status["lastResult"] = await JOBS[name][1]()
+            status["lastError"] = None
+        except Exception as e:
+            print(f"Scheduler job {name} error: {e!r}")
+            status["lastError"] = repr(e)
+        finally:
+            status["runs"] += 1
+            status["lastDurationSec"] = round(time.monotonic() - started, 3)
+    return status
+
+async def _every(name: str, interval: float):
+    await asyncio.sleep(STARTUP_DELAY_SEC)
+    while True:
+        await run_job(name)
+        await asyncio.sleep(interval)
+
+def start_scheduler():
+    if not ENABLED:
+        print("⏰ Scheduler disabled (SCHEDULER_ENABLED=0)")
+        return
+    if _tasks:
+        return
+    loop = asyncio.get_running_loop()
+    _tasks.extend(loop.create_task(_every(name, interval)) for name, (interval, _) in JOBS.items())
+    print(f"⏰ Scheduler started ({', '.join(JOBS)})")
+
+async def stop_scheduler():
+    """Cancel the loops; a batch already handed to the DB thread still commits"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+def get_job_status() -> dict:
+    """Per-job run counters (no database access)"""
+    return {name: dict(status) for name, status in _status.items()}
+
+async def get_status() -> dict:
+    watermarks = await fetch_all("SELECT key, value, updated_at FROM scheduler_state ORDER BY key")
+    return {
+        "enabled": ENABLED,
+        "running": bool(_tasks),
+        "jobs": {name: {"intervalSec": JOBS[name][0], **status} for name, status in _status.items()},
+        "watermarks": watermarks,
+    }
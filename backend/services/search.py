@@ -0,0 +1,116 @@
+"""
+Full-Text Patient Search
+
+pets_fts is an FTS5 index over pet name, owner name, phone, breed and the
+leaf values of medical_history, kept in sync by triggers on pets (see the
+pet search migration). Its rowids come from pet_search_ids, an INTEGER
+PRIMARY KEY map to pets.id, because pets' implicit rowids may change on
+VACUUM.
+
+Query terms are prefix-matched. FTS5's bm25() reads every match of every
+term to compute idf (tens of milliseconds for a common name at 1M pets),
+so candidates are instead the SEARCH_CANDIDATES newest matches, scored
+here by column weight, whole-word hits and field length.
+"""
+
+import os
+import re
+import unicodedata
+from typing import Optional
+
+from services.normalize import DEFAULT_COUNTRY_CODE
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_TERMS = 8
+# Shorter terms only match whole words ('b' alone would match half the table)
+MIN_PREFIX_CHARS = 2
+# Phone prefixes need the country code plus 6 national digits ('0801234'); shorter
+# ones match a large share of all numbers, and expanding those is slow in FTS5
+MIN_PHONE_PREFIX_DIGITS = len(DEFAULT_COUNTRY_CODE) + 6
+CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "200"))
+
+# pets_fts columns and their weight in the score
+WEIGHTS = {"name": 10.0, "owner_name": 5.0, "owner_phone": 5.0, "breed": 2.0, "medical_history": 1.0}
+WHOLE_WORD_BONUS = 2.0
+
+# Same token boundaries as the unicode61 tokenizer: anything but letters and digits
+_TERM = re.compile(r"[^\W_]+")
+
+CANDIDATES_SQL = f"""
+    SELECT rowid, {', '.join(WEIGHTS)} FROM pets_fts
+    WHERE pets_fts MATCH ? ORDER BY rowid DESC LIMIT ?"""
+
+def pets_by_search_rowid_sql(columns: list, count: int) -> str:
+    """The ranked pets' columns, by pet_search_ids rowid"""
+    projection = ", ".join(f"p.{column}" for column in columns)
+    return f"""SELECT s.rowid AS search_rowid, {projection}
+        FROM pet_search_ids s JOIN pets p ON p.id = s.pet_id
+        WHERE s.rowid IN ({', '.join('?' for _ in range(count))})"""
+
+def _fold(text: str) -> str:
+    """Casefold and strip diacritics, like unicode61 with remove_diacritics"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def query_terms(query: str) -> list:
+    terms = _TERM.findall(_fold(query or ""))[:MAX_TERMS]
+    # Phones are indexed in canonical form (+234801...); match national spellings too
+    return [
+        DEFAULT_COUNTRY_CODE + term[1:] if term.isdigit() and term.startswith("0") and len(term) > 1 else term
+        for term in terms
+    ]
+
+def match_expression(terms: list, prefix: bool = True) -> Optional[str]:
+    """FTS5 MATCH expression requiring every term ('"ada"* "rex"*'); None without terms"""
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' if prefix and _prefixable(term) else f'"{term}"' for term in terms)
+
+def _prefixable(term: str) -> bool:
+    return len(term) >= (MIN_PHONE_PREFIX_DIGITS if term.isdigit() else MIN_PREFIX_CHARS)
+
+def score(row, terms: list) -> float:
+    """Sum over terms of the best column hit: weight, doubled for a whole word, damped by field length"""
+    total = 0.0
+    columns = [(weight, row[column]) for column, weight in WEIGHTS.items() if row[column]]
+    for term in terms:
+        best = 0.0
+        for weight, text in columns:
+            tokens = _TERM.findall(_fold(text))
+            for token in tokens:
+                if token.startswith(term):
+                    best = max(best, weight * (WHOLE_WORD_BONUS if token == term else 1.0) / (1 + 0.1 * len(tokens)))
+        total += best
+    return total
+
+def search_pets(conn, query: str, columns: list, limit: int = DEFAULT_LIMIT) -> list:
+    """Best-matching pets as dicts of ``columns`` plus their ``score`` (higher is better)"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    # Whole-word matches first, so a flood of longer words can't crowd them out. Prefix
+    # matches are only added when that didn't fill the candidates: a complete common
+    # word is what was meant, and expanding it is the expensive case for FTS5.
+    candidates = {}
+    for expression in dict.fromkeys((match_expression(terms, prefix=False), match_expression(terms))):
+        if len(candidates) >= CANDIDATES:
+            break
+        for row in conn.execute(CANDIDATES_SQL, (expression, CANDIDATES)):
+            candidates[row["rowid"]] = row
+
+    # Ties go to the newest pet
+    ranked = sorted(((score(row, terms), rowid) for rowid, row in candidates.items()), reverse=True)
+    ranked = ranked[:max(1, min(limit, MAX_LIMIT))]
+    if not ranked:
+        return []
+    rows = conn.execute(
+        pets_by_search_rowid_sql(columns, len(ranked)), [rowid for _, rowid in ranked]
+    ).fetchall()
+    by_rowid = {row["search_rowid"]: row for row in rows}
+    return [
+        {**{column: by_rowid[rowid][column] for column in columns}, "score": round(points, 3)}
+        for points, rowid in ranked if rowid in by_rowid
+    ]
@@ -0,0 +1,77 @@
+"""
+Clinic Stats from Trigger-Maintained Counters
+
+stats_counts holds (metric, bucket) -> value rows that triggers on pets,
+drafts and campaigns keep current on every write (see the stats counters
+migration), so reading the dashboard numbers never recounts a table.
+Due/overdue counts come from the per-date pets_due histogram, which is
+bounded by the number of distinct due dates rather than by pets.
+"""
+
+from datetime import date
+from typing import Optional
+
+from services.dates import due_window
+
+# Everything but the pets_due histogram, which is summed per window instead
+COUNTERS = ("pets", "pets_species", "drafts_status", "drafts_type", "conversions", "campaigns_status", "campaign_reach")
+
+# Draft statuses that mean the reminder reached the owner
+SENT_STATUSES = ("sent",)
+
+COUNTERS_SQL = (
+    f"SELECT metric, bucket, value FROM stats_counts WHERE metric IN ({', '.join('?' for _ in COUNTERS)}) AND value != 0"
+)
+# pets_due buckets (due dates) before a day, or within an inclusive window
+OVERDUE = "bucket < ?"
+DUE_BETWEEN = "bucket BETWEEN ? AND ?"
+
+def due_count_sql(condition: str) -> str:
+    return f"SELECT COALESCE(SUM(value), 0) FROM stats_counts WHERE metric = 'pets_due' AND {condition}"
+
+def _due_count(conn, condition: str, params: tuple) -> int:
+    """Sum of the pets_due histogram over the due dates matching ``condition``"""
+    return conn.execute(due_count_sql(condition), params).fetchone()[0]
+
+def read_stats(conn, today: Optional[date] = None) -> dict:
+    """Dashboard stats: pets and due dates, drafts, reminder conversions, campaign reach"""
+    counts = {}
+    for metric, bucket, value in conn.execute(COUNTERS_SQL, COUNTERS):
+        counts.setdefault(metric, {})[bucket] = value
+
+    today_iso, in_7 = due_window(7, today)
+    _, in_30 = due_window(30, today)
+    drafts_by_status = counts.get("drafts_status", {})
+    sent = sum(drafts_by_status.get(status, 0) for status in SENT_STATUSES)
+    conversions = sum(counts.get("conversions", {}).values())
+    reach = counts.get("campaign_reach", {})
+    recipients = reach.get("recipients", 0)
+
+    return {
+        "pets": {
+            "total": counts.get("pets", {}).get("total", 0),
+            "bySpecies": counts.get("pets_species", {}),
+            "overdue": _due_count(conn, OVERDUE, (today_iso,)),
+            # Same inclusive windows as /api/pets?due_within=
+            "dueIn7Days": _due_count(conn, DUE_BETWEEN, (today_iso, in_7)),
+            "dueIn30Days": _due_count(conn, DUE_BETWEEN, (today_iso, in_30)),
+        },
+        "drafts": {
+            "total": sum(drafts_by_status.values()),
+            "byStatus": drafts_by_status,
+            "byType": counts.get("drafts_type", {}),
+        },
+        "reminders": {
+            "sent": sent,
+            "conversions": conversions,
+            "conversionsByType": counts.get("conversions", {}),
+            "conversionRate": round(100 * conversions / sent, 1) if sent else 0.0,
+        },
+        "campaigns": {
+            "total": sum(counts.get("campaigns_status", {}).values()),
+            "byStatus": counts.get("campaigns_status", {}),
+            "recipients": recipients,
+            "messagesSent": reach.get("sent", 0),
+            "reachRate": round(100 * reach.get("sent", 0) / recipients, 1) if recipients else 0.0,
+        },
+    }
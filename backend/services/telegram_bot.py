@@ -1,20 +1,19 @@
-import os
 import asyncio
 import threading
-import uuid
 import json
 from datetime import datetime
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-from dotenv import load_dotenv
 
-load_dotenv()
+from services import config as clinic_config
+from services.metrics import observe_handler
+from services.pet_store import save_records
+from services.gemini import process_batch_text
+from services.telegram_media import MediaJob, media_pipeline
 
-from services.sqlite_db import get_db_connection
-from services.gemini import extract_data_from_image, process_voice_note, process_batch_text
-
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+_bot_thread = None
 
+@observe_handler("start")
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
     welcome_text = """
@@ -23,7 +22,7 @@ _Your Premium Veterinary Companion_
 
 I'm ready to help you digitize your clinic! You can use me for:
 
-📸 *Photo Entry*: Snap a picture of medical records.
+📸 *Photo Entry*: Snap a picture of medical records (send a whole stack as an album).
 🎙️ *Voice Notes*: Say "Add a dog named Max, owner is Sarah..."
 ✍️ *Text Entry*: Paste or type multiple pet records (e.g., "1. Max, Golden, Sarah, 0801... 2. Bella, Cat, John...")
 
@@ -31,6 +30,7 @@ I will process your records and they will appear on your dashboard instantly! 
     """
     await update.message.reply_text(welcome_text, parse_mode="Markdown")
 
+@observe_handler("help")
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /help command"""
     help_text = """
@@ -41,37 +41,26 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
 *Voice*: Send a voice note describing the patients.
     
-*Photo*: Send a photo of a vaccination card.
+*Photo*: Send a photo of a vaccination card, or several as one album.
+
+*Queue*: /queue shows how many records are waiting to be processed.
     """
     await update.message.reply_text(help_text, parse_mode="Markdown")
 
-def save_pet_to_db(pet_data):
-    """Save a single pet record to SQLite"""
-    try:
-        new_id = str(uuid.uuid4())
-        conn = get_db_connection()
-        conn.execute(
-            """INSERT INTO pets (id, name, species, breed, age, owner_name, owner_phone, status, next_vaccination_date) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                new_id, 
-                pet_data.get('name', 'Unknown'), 
-                pet_data.get('species', 'Dog'), 
-                pet_data.get('breed', 'Unknown'), 
-                pet_data.get('age', 'Unknown'), 
-                pet_data.get('ownerName', 'Unknown'), 
-                pet_data.get('ownerPhone', 'Unknown'), 
-                pet_data.get('status', 'Healthy'), 
-                pet_data.get('nextVaccinationDate')
-            )
-        )
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        print(f"DB Error: {e}")
-        return False
+async def save_pets(records: list) -> list:
+    """Bulk-save records in one transaction, off the bot's event loop; per-row outcomes"""
+    return await asyncio.to_thread(save_records, records)
 
+def skipped_summary(outcomes: list) -> str:
+    counts = {}
+    for outcome in outcomes:
+        if outcome["status"] != "saved":
+            counts[outcome["error"]] = counts.get(outcome["error"], 0) + 1
+    if not counts:
+        return ""
+    return "\n⚠️ Skipped " + ", ".join(f"{n} ({reason})" for reason, n in counts.items())
+
+@observe_handler("text")
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle text messages for batch entry"""
     text = update.message.text
@@ -82,99 +71,47 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     pets = await process_batch_text(text)
     
     if pets and isinstance(pets, list):
-        count = 0
-        for pet in pets:
-            if save_pet_to_db(pet):
-                count += 1
+        outcomes = await save_pets(pets)
+        count = sum(1 for outcome in outcomes if outcome["status"] == "saved")
+        merged = sum(1 for outcome in outcomes if outcome.get("merged"))
+        skipped = skipped_summary(outcomes)
+        updated = f" ({merged} already on file, updated)" if merged else ""
         
         if count > 0:
-            await update.message.reply_text(f"✅ Successfully added {count} patients to your dashboard!")
+            await update.message.reply_text(f"✅ Successfully added {count} patients to your dashboard!{updated}{skipped}")
         else:
-            await update.message.reply_text("❌ Failed to save entries. Please check the format.")
+            await update.message.reply_text(f"❌ Failed to save entries. Please check the format.{skipped}")
     else:
         await update.message.reply_text("🤔 I couldn't extract patient data from that. Try being more specific with names and details.")
 
+@observe_handler("photo")
 async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle photo messages (OCR)"""
-    await update.message.reply_text("Analyzing the image... one moment please 🔍")
-    
-    try:
-        photo = update.message.photo[-1]
-        file = await context.bot.get_file(photo.file_id)
-        photo_bytes = await file.download_as_bytearray()
-        
-        extracted_data = await extract_data_from_image(bytes(photo_bytes), "image/jpeg")
-        
-        if extracted_data:
-            # Map extraction to DB format
-            pet_record = {
-                "name": extracted_data.get("pet_name"),
-                "ownerName": extracted_data.get("owner_name"),
-                "ownerPhone": extracted_data.get("owner_phone", "Unknown"),
-                "species": extracted_data.get("species", "Dog"),
-                "breed": extracted_data.get("breed", "Unknown"),
-                "nextVaccinationDate": extracted_data.get("next_vaccination")
-            }
-            
-            if save_pet_to_db(pet_record):
-                response_text = "✅ Record saved to dashboard!\n\n"
-                response_text += f"Pet: {pet_record['name']}\n"
-                response_text += f"Owner: {pet_record['ownerName']}\n"
-                response_text += f"Next Due: {pet_record['nextVaccinationDate'] or '?'}"
-                await update.message.reply_text(response_text)
-            else:
-                await update.message.reply_text("Failed to save the extracted data.")
-        else:
-            await update.message.reply_text("I couldn't read much from that photo. Try taking a clearer one! 📸")
-    except Exception as e:
-        print(f"Photo error: {e}")
-        await update.message.reply_text("Sorry, something went wrong while processing the image.")
+    """Queue photos (OCR); album photos are coalesced into one request"""
+    await media_pipeline.add_photo(update.message, context.bot)
 
+@observe_handler("voice")
 async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle voice messages"""
-    await update.message.reply_text("Listening to your voice note... 👂")
-    
-    try:
-        voice = update.message.voice
-        file = await context.bot.get_file(voice.file_id)
-        voice_bytes = await file.download_as_bytearray()
-        
-        extracted_data = await process_voice_note(bytes(voice_bytes), "audio/ogg")
-        
-        if extracted_data:
-            # For voice notes, if it's a list, process each. Gemini might return a list or single.
-            # Here we assume process_voice_note might return data that needs mapping.
-            pet_record = {
-                "name": extracted_data.get("pet_name"),
-                "ownerName": extracted_data.get("owner_name"),
-                "ownerPhone": extracted_data.get("owner_phone"),
-                "status": "Healthy"
-            }
-            
-            if save_pet_to_db(pet_record):
-                await update.message.reply_text(
-                    f"✅ Added {pet_record['name']} (Owner: {pet_record['ownerName']}) to your dashboard!"
-                )
-            else:
-                 await update.message.reply_text("Extracted info but failed to save.")
-        else:
-            await update.message.reply_text("I couldn't understand that voice note. Can you try again? 🎙️")
-    except Exception as e:
-        print(f"Voice error: {e}")
-        await update.message.reply_text("Sorry, problem hearing that voice note.")
+    """Queue voice messages"""
+    await media_pipeline.submit(MediaJob("voice", update.message, context.bot, [update.message.voice.file_id]))
+
+@observe_handler("queue")
+async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /queue command: media pipeline depth and throughput"""
+    m = media_pipeline.metrics()
+    await update.message.reply_text(
+        f"📊 Queue: {m['queueDepth']} waiting, {m['inProgress']} in progress ({m['workers']} workers)\n"
+        f"Done: {m['processed']} ({m['failed']} failed), avg {m['avgJobSec']}s per job"
+    )
 
-def run_bot():
+def run_bot(token: str):
     """Run the bot in a separate thread"""
-    if not TELEGRAM_BOT_TOKEN:
-        print("⚠️ TELEGRAM_BOT_TOKEN missing. Telegram bot disabled.")
-        return
-    
     async def main():
-        app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        app = Application.builder().token(token).build()
         
         # Add handlers
         app.add_handler(CommandHandler("start", start_command))
         app.add_handler(CommandHandler("help", help_command))
+        app.add_handler(CommandHandler("queue", queue_command))
         app.add_handler(MessageHandler(filters.PHOTO, handle_photo))
         app.add_handler(MessageHandler(filters.VOICE, handle_voice))
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
@@ -182,6 +119,7 @@ def run_bot():
         print("🤖 Telegram bot started...")
         # Polling is blocking and won't return until stopped
         await app.initialize()
+        media_pipeline.start()
         await app.start()
         await app.updater.start_polling(allowed_updates=Update.ALL_TYPES)
         
@@ -199,9 +137,23 @@ def run_bot():
 
 def start_telegram_bot():
     """Start the Telegram bot in a background thread"""
-    if TELEGRAM_BOT_TOKEN:
-        bot_thread = threading.Thread(target=run_bot, daemon=True)
-        bot_thread.start()
+    global _bot_thread
+    token = clinic_config.get_config().telegram_token
+    if _bot_thread is not None:
+        return
+    if token:
+        _bot_thread = threading.Thread(target=run_bot, args=(token,), daemon=True)
+        _bot_thread.start()
         print("🤖 Telegram bot thread started")
     else:
-        print("⚠️ TELEGRAM_BOT_TOKEN missing. Telegram bot disabled.")
+        print("⚠️ Telegram token missing (set it in Settings or TELEGRAM_BOT_TOKEN). Telegram bot disabled.")
+
+@clinic_config.on_change
+def _token_changed(old, new):
+    """A token saved in Settings starts the bot; replacing a running bot's token needs a restart"""
+    if new.telegram_token == old.telegram_token:
+        return
+    if _bot_thread is None and new.telegram_token:
+        start_telegram_bot()
+    elif _bot_thread is not None:
+        print("⚠️ Telegram token changed; restart the backend to use the new one.")
@@ -0,0 +1,209 @@
+"""
+Telegram Media Pipeline
+
+Photo and voice handlers only enqueue a job and reply with the queue
+position; TELEGRAM_MEDIA_WORKERS workers on the bot's loop download the
+media, downscale photos (when Pillow is installed), call Gemini and save
+the records. Photos from one album (media group) are coalesced into a
+single multimodal request.
+"""
+
+import asyncio
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from services import metrics
+from services.gemini import extract_data_from_images, process_voice_note
+from services.pet_store import save_records
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # In requirements; a broken install still uploads photos as-is
+    Image = None
+    print("⚠️ Pillow is not installed; Telegram photos will be sent to Gemini full size.")
+
+WORKERS = int(os.getenv("TELEGRAM_MEDIA_WORKERS", "4"))
+QUEUE_MAX = int(os.getenv("TELEGRAM_MEDIA_QUEUE_MAX", "100"))
+ALBUM_WAIT_SEC = float(os.getenv("TELEGRAM_ALBUM_WAIT_SEC", "1.5"))
+IMAGE_MAX_SIDE = int(os.getenv("TELEGRAM_IMAGE_MAX_SIDE", "1600"))
+IMAGE_QUALITY = int(os.getenv("TELEGRAM_IMAGE_QUALITY", "85"))
+
+def prepare_image(data: bytes, mime_type: str = "image/jpeg"):
+    """(bytes, mime) downscaled to IMAGE_MAX_SIDE and re-encoded as JPEG; unchanged without Pillow"""
+    if Image is None:
+        return data, mime_type
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEGs decode straight at a reduced scale (DCT scaling), much cheaper than a full decode.
+            # draft() only scales while both sides stay >= the request, so ask for the target box.
+            scale = IMAGE_MAX_SIDE / max(image.size)
+            if scale < 1:
+                image.draft("RGB", (int(image.width * scale), int(image.height * scale)))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+            out = io.BytesIO()
+            image.convert("RGB").save(out, format="JPEG", quality=IMAGE_QUALITY, optimize=True)
+        return out.getvalue(), "image/jpeg"
+    except Exception as e:
+        print(f"Image re-encode failed, sending original: {e}")
+        return data, mime_type
+
+def card_record(card: dict) -> dict:
+    """Gemini card extraction -> pet record keys"""
+    return {
+        "name": card.get("pet_name"),
+        "ownerName": card.get("owner_name"),
+        "ownerPhone": card.get("owner_phone"),
+        "species": card.get("species"),
+        "breed": card.get("breed"),
+        "lastVaccinationDate": card.get("last_vaccination"),
+        "nextVaccinationDate": card.get("next_vaccination"),
+    }
+
+@dataclass
+class MediaJob:
+    kind: str  # "photos" or "voice"
+    message: object  # telegram.Message to reply to
+    bot: object
+    file_ids: list
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+async def _download(bot, file_id: str) -> bytes:
+    buffer = io.BytesIO()
+    file = await bot.get_file(file_id)
+    await file.download_to_memory(buffer)
+    return buffer.getvalue()
+
+class MediaPipeline:
+    def __init__(self, workers: int = WORKERS, queue_max: int = QUEUE_MAX):
+        self.workers = workers
+        self.queue_max = queue_max
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._albums = {}
+        self.counters = {
+            "submitted": 0, "processed": 0, "failed": 0, "rejectedFull": 0,
+            "photos": 0, "voiceNotes": 0, "albumsCoalesced": 0, "inProgress": 0, "maxDepth": 0,
+        }
+        self._busy_time = 0.0
+        self._wait_time = 0.0
+
+    def start(self):
+        """Create the queue and workers on the running (bot) loop"""
+        self.queue = asyncio.Queue(maxsize=self.queue_max)
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.workers)]
+        print(f"🖼️ Telegram media pipeline started ({self.workers} workers)")
+
+    async def submit(self, job: MediaJob):
+        """Queue a job and tell the sender where it stands"""
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejectedFull"] += 1
+            await job.message.reply_text("⏳ I'm busy with a stack of records right now. Please resend in a minute.")
+            return
+        self.counters["submitted"] += 1
+        self.counters["maxDepth"] = max(self.counters["maxDepth"], self.queue.qsize())
+        ahead = self.queue.qsize() - 1 + self.counters["inProgress"]
+        what = f"{len(job.file_ids)} photos" if len(job.file_ids) > 1 else ("voice note" if job.kind == "voice" else "photo")
+        await job.message.reply_text(
+            f"📥 Got your {what}" + (f" — {ahead} ahead of it in the queue." if ahead else ". Working on it now 🔍")
+        )
+
+    async def add_photo(self, message, bot):
+        """Queue a photo; album photos wait ALBUM_WAIT_SEC for their siblings"""
+        file_id = message.photo[-1].file_id
+        if not message.media_group_id:
+            await self.submit(MediaJob("photos", message, bot, [file_id]))
+            return
+        album = self._albums.get(message.media_group_id)
+        if album is None:
+            album = self._albums[message.media_group_id] = {"message": message, "file_ids": [], "timer": None}
+        album["file_ids"].append(file_id)
+        if album["timer"]:
+            album["timer"].cancel()
+        album["timer"] = asyncio.get_running_loop().create_task(self._flush_album(message.media_group_id, bot))
+
+    async def _flush_album(self, group_id: str, bot):
+        await asyncio.sleep(ALBUM_WAIT_SEC)
+        album = self._albums.pop(group_id)
+        self.counters["albumsCoalesced"] += 1
+        await self.submit(MediaJob("photos", album["message"], bot, album["file_ids"]))
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            self.counters["inProgress"] += 1
+            started = time.monotonic()
+            self._wait_time += started - job.enqueued_at
+            outcome = "error"
+            try:
+                await (self._process_photos(job) if job.kind == "photos" else self._process_voice(job))
+                self.counters["processed"] += 1
+                outcome = "ok"
+            except Exception as e:
+                self.counters["failed"] += 1
+                print(f"Media job error: {e!r}")
+                await job.message.reply_text("Sorry, something went wrong while processing that. Please try again.")
+            finally:
+                self.counters["inProgress"] -= 1
+                self._busy_time += time.monotonic() - started
+                metrics.TELEGRAM_MEDIA_JOBS.observe(time.monotonic() - started, job.kind, outcome)
+                self.queue.task_done()
+
+    async def _process_photos(self, job: MediaJob):
+        self.counters["photos"] += len(job.file_ids)
+        raw = await asyncio.gather(*(_download(job.bot, file_id) for file_id in job.file_ids))
+        images = await asyncio.gather(*(asyncio.to_thread(prepare_image, data) for data in raw))
+        cards = await extract_data_from_images(images)
+        if not cards:
+            await job.message.reply_text("I couldn't read much from that photo. Try taking a clearer one! 📸")
+            return
+
+        outcomes = await asyncio.to_thread(save_records, [card_record(card) for card in cards])
+        lines = []
+        for outcome in outcomes:
+            if outcome["status"] == "saved":
+                saved = outcome["record"]
+                lines.append(f"{'🔁' if outcome['merged'] else '✅'} {saved['name']} (Owner: {saved['ownerName'] or '?'}, Next Due: {saved['nextVaccinationDate'] or '?'})")
+            else:
+                lines.append(f"⚠️ Skipped a card ({outcome['error']})")
+        await job.message.reply_text("Records processed:\n\n" + "\n".join(lines))
+
+    async def _process_voice(self, job: MediaJob):
+        self.counters["voiceNotes"] += 1
+        audio = await _download(job.bot, job.file_ids[0])
+        extracted = await process_voice_note(audio, "audio/ogg")
+        if not extracted:
+            await job.message.reply_text("I couldn't understand that voice note. Can you try again? 🎙️")
+            return
+
+        record = {
+            "name": extracted.get("pet_name"),
+            "ownerName": extracted.get("owner_name"),
+            "ownerPhone": extracted.get("owner_phone"),
+        }
+        outcome = (await asyncio.to_thread(save_records, [record]))[0]
+        if outcome["status"] == "saved":
+            verb = "Updated" if outcome["merged"] else "Added"
+            await job.message.reply_text(f"✅ {verb} {record['name']} (Owner: {record['ownerName']}) on your dashboard!")
+        else:
+            await job.message.reply_text(f"Extracted info but failed to save ({outcome['error']}).")
+
+    def metrics(self) -> dict:
+        done = self.counters["processed"] + self.counters["failed"]
+        return {
+            **self.counters,
+            "running": bool(self._tasks),
+            "workers": self.workers,
+            "queueDepth": self.queue.qsize() if self.queue else 0,
+            "pendingAlbums": len(self._albums),
+            "avgJobSec": round(self._busy_time / done, 3) if done else 0.0,
+            "avgWaitSec": round(self._wait_time / done, 3) if done else 0.0,
+            "pillow": Image is not None,
+        }
+
+media_pipeline = MediaPipeline()
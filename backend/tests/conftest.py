@@ -0,0 +1,21 @@
+"""Every test gets a freshly migrated SQLite database in a temp directory."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import config, sqlite_db  # noqa: E402
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point the pool at a new database; yields db_connection"""
+    sqlite_db.close_db()
+    monkeypatch.setattr(sqlite_db, "DB_PATH", str(tmp_path / "kizuna.db"))
+    sqlite_db.init_db()
+    # The settings snapshot is process-wide; start from this database's settings
+    config.load_config()
+    yield sqlite_db.db_connection
+    sqlite_db.close_db()
@@ -0,0 +1,40 @@
+import json
+
+from services import campaigns
+from services.campaigns import fan_out_campaign
+
+def seed(conn, count):
+    conn.executemany(
+        "INSERT INTO pets (id, name, owner_name, owner_phone, species, created_at) VALUES (?, ?, 'Ada', ?, 'Dog', ?)",
+        [(f"pet-{i:03d}", f"Rex {i}", f"+234801{i:07d}", f"2026-01-01 00:00:{i % 60:02d}") for i in range(count)]
+    )
+
+def add_campaign(conn, campaign_id):
+    conn.execute(
+        "INSERT INTO campaigns (id, name, message, target_audience, status) VALUES (?, 'C', 'Hi {pet_name}', 'All Patients', 'queued')",
+        (campaign_id,)
+    )
+
+def drafted(conn, campaign_id):
+    rows = conn.execute("SELECT pet_id FROM drafts WHERE campaign_id = ?", (campaign_id,)).fetchall()
+    return sorted(row[0] for row in rows)
+
+def test_fan_out_resumes_after_vacuum(db, monkeypatch):
+    monkeypatch.setattr(campaigns, "FAN_OUT_BATCH", 7)
+    with db() as conn:
+        seed(conn, 50)
+        add_campaign(conn, "c1")
+        # Stop partway through: two windows done
+        cursor = list(conn.execute(campaigns.WINDOW_END_SQL, ("", "", 13)).fetchone())
+        conn.execute(campaigns.fan_out_batch_sql("1"), ["Hi", "c1", "", "", *cursor])
+        conn.execute("UPDATE campaigns SET fanout_cursor = ?, status = 'fanning_out' WHERE id = 'c1'", (json.dumps(cursor),))
+        conn.execute("DELETE FROM pets WHERE id IN ('pet-002', 'pet-040')")
+    with db() as conn:
+        conn.execute("VACUUM")
+
+    fan_out_campaign("c1")
+    with db() as conn:
+        pets = sorted(row[0] for row in conn.execute("SELECT id FROM pets"))
+        # pet-002 was drafted before it was deleted; every remaining pet exactly once
+        assert drafted(conn, "c1") == sorted(pets + ["pet-002"])
+        assert conn.execute("SELECT status FROM campaigns WHERE id = 'c1'").fetchone()[0] == "active"
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+import main
+from services import config
+from services.config import DEFAULTS, get_config, load_config
+
+def test_saving_settings_swaps_the_snapshot(db, monkeypatch):
+    for env_name in config.ENV_OVERRIDES.values():
+        monkeypatch.delenv(env_name, raising=False)
+    before = load_config()
+    assert before.clinic_name == DEFAULTS["clinic_name"]
+    changes = []
+    monkeypatch.setattr(config, "_listeners", [lambda old, new: changes.append((old, new))])
+
+    client = TestClient(main.app)
+    assert client.post("/api/settings", json={"clinic_name": "Paws & Co", "ai_tone": "warm"}).status_code == 200
+
+    after = get_config()
+    assert (after.clinic_name, after.ai_tone, after.booking_url) == ("Paws & Co", "warm", DEFAULTS["booking_url"])
+    assert before.clinic_name == DEFAULTS["clinic_name"]  # snapshots are immutable; readers keep theirs
+    assert changes == [(before, after)]
+    stored = client.get("/api/settings").json()
+    assert (stored["clinic_name"], stored["ai_tone"]) == ("Paws & Co", "warm")
+
+def test_env_vars_win_over_stored_values(db, monkeypatch):
+    monkeypatch.setenv("CLINIC_NAME", "From Env")
+    monkeypatch.setenv("BOOKING_URL", "https://your_booking_link")  # .env.example placeholder: ignored
+    monkeypatch.delenv("AI_TONE", raising=False)
+    with db() as conn:
+        config.save_settings(conn, {"clinic_name": "Stored", "booking_url": "https://book.example", "ai_tone": "calm"})
+
+    current = get_config()
+    assert (current.clinic_name, current.booking_url, current.ai_tone) == ("From Env", "https://book.example", "calm")
+    # The settings page still shows what is stored
+    assert current.settings["clinic_name"] == "Stored"
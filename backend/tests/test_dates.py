@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from services.dates import due_window, month_window, normalize_date
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-03-05", "2026-03-05"),
+    ("2026-03-05 14:30:00", "2026-03-05"),
+    ("2026-03-05T14:30:00", "2026-03-05"),
+    ("2026-03-05T14:30:00.250000", "2026-03-05"),
+    ("2026/03/05", "2026-03-05"),
+    ("05/03/2026", "2026-03-05"),  # day first, as on clinic paperwork
+    ("05-03-2026", "2026-03-05"),
+    ("05.03.2026", "2026-03-05"),
+    ("12/25/2026", "2026-12-25"),  # month first only when day first can't parse
+    ("5 Mar 2026", "2026-03-05"),
+    ("5 March 2026", "2026-03-05"),
+    ("Mar 5 2026", "2026-03-05"),
+    ("March 5, 2026", "2026-03-05"),
+    ("  2026-03-05  ", "2026-03-05"),
+    (date(2026, 3, 5), "2026-03-05"),
+    (datetime(2026, 3, 5, 9, 15), "2026-03-05"),
+    (pd.Timestamp("2026-03-05 09:15"), "2026-03-05"),
+])
+def test_accepted_formats(value, expected):
+    assert normalize_date(value) == expected
+
+@pytest.mark.parametrize("value", [
+    None, float("nan"), pd.NaT, "", "  ", "N/A", "unknown", "-", "null",
+    "2026-02-30", "31/04/2026", "13/13/2026", "next week", "2026-3", 20260305,
+])
+def test_invalid_or_empty_dates_are_none(value):
+    assert normalize_date(value) is None
+
+def test_windows_are_inclusive_iso_bounds():
+    assert due_window(14, date(2026, 12, 25)) == ("2026-12-25", "2027-01-08")
+    assert month_window(date(2028, 2, 10)) == ("2028-02-01", "2028-02-29")
@@ -0,0 +1,12 @@
+from services.db_pool import ConnectionPool
+
+def test_connection_borrowed_across_close_frees_its_slot(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, acquire_timeout=0.1)
+    borrowed = pool.acquire()
+    pool.close()
+    pool.release(borrowed)
+
+    pool.open()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+    pool.close()
@@ -0,0 +1,74 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+from services import dispatcher
+from services.dispatcher import RATE_PER_SEC, Dispatcher
+
+class FakeClock:
+    """Stands in for time.monotonic/asyncio.sleep: sleeping only moves the clock.
+
+    Like a real sleep it never wakes early; the clock counts whole
+    microseconds, so even a tiny sleep lets the bucket refill.
+    """
+
+    def __init__(self):
+        self.micros = 0
+
+    @property
+    def now(self) -> float:
+        return self.micros / 1e6
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.micros += max(1, math.ceil(seconds * 1e6))
+        await asyncio.sleep(0)
+
+def use_clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(dispatcher, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(dispatcher, "asyncio", SimpleNamespace(
+        sleep=clock.sleep, Lock=asyncio.Lock, Semaphore=asyncio.Semaphore, gather=asyncio.gather
+    ))
+    monkeypatch.setattr(dispatcher, "random", SimpleNamespace(uniform=lambda low, high: 0))
+    return clock
+
+def test_429_is_retried_after_retry_after(monkeypatch):
+    clock = use_clock(monkeypatch)
+    sent_at = []
+
+    async def send(to, message, client=None):
+        sent_at.append(clock.now)
+        if len(sent_at) == 1:
+            return {"success": False, "status_code": 429, "retry_after": 7.0}
+        return {"success": True, "sid": "wamid.1"}
+
+    sender = Dispatcher(send=send, rate=1000, burst=10)
+    results = asyncio.run(sender.dispatch([("+2348012345678", "Hi")]))
+
+    assert results == [{"success": True, "sid": "wamid.1"}]
+    assert sent_at[1] - sent_at[0] == 7.0
+    assert (sender.metrics.throttled, sender.metrics.sent) == (1, 1)
+
+def test_bucket_caps_the_send_rate(monkeypatch):
+    clock = use_clock(monkeypatch)
+    sent_at = []
+
+    async def send(to, message, client=None):
+        sent_at.append(clock.now)
+        return {"success": True}
+
+    burst = 5
+    sender = Dispatcher(send=send, burst=burst, concurrency=64)
+    count = int(RATE_PER_SEC * 3)
+    asyncio.run(sender.dispatch([("+2348012345678", "Hi")] * count))
+
+    assert len(sent_at) == count
+    # After the banked burst, one token every 1/rate seconds
+    elapsed = sent_at[-1] - sent_at[0]
+    assert abs(elapsed - (count - burst) / RATE_PER_SEC) < 1e-3
+    for start in range(count):
+        in_window = [t for t in sent_at[start:] if t < sent_at[start] + 1.0]
+        assert len(in_window) <= RATE_PER_SEC + burst
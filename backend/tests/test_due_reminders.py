@@ -0,0 +1,47 @@
+import asyncio
+import uuid
+from datetime import date
+
+from services import due_reminders
+from services.due_reminders import run_due_reminders
+
+TODAY = date(2026, 3, 1)
+
+async def compose_drafts(batch, clinic_name, kind, booking_url, tone="friendly"):
+    return [(str(uuid.uuid4()), pet["id"], kind, "Hi") for pet in batch], 0
+
+def add_pet(conn, pet_id, due, created_at):
+    conn.execute(
+        "INSERT INTO pets (id, name, owner_name, owner_phone, next_vaccination_date, created_at) VALUES (?, ?, 'Ada', ?, ?, ?)",
+        (pet_id, pet_id, f"+234801{abs(hash(pet_id)) % 10**7:07d}", due, created_at)
+    )
+
+def vaccination_drafts(conn):
+    rows = conn.execute("SELECT pet_id FROM drafts WHERE type = 'vaccination' ORDER BY pet_id").fetchall()
+    return [row[0] for row in rows]
+
+def test_watermarks_survive_vacuum(db, monkeypatch):
+    monkeypatch.setattr(due_reminders, "compose_drafts", compose_drafts)
+    with db() as conn:
+        for i in range(30):
+            add_pet(conn, f"filler-{i:02d}", None, "2025-12-01 00:00:00")
+        add_pet(conn, "a-due", "2026-03-05", "2026-01-01 00:00:00")
+        add_pet(conn, "b-later", "2026-04-20", "2026-01-01 00:00:00")
+    asyncio.run(run_due_reminders(TODAY))
+
+    with db() as conn:
+        assert vaccination_drafts(conn) == ["a-due"]
+        # Sent drafts no longer block a new one, so reprocessing would duplicate it
+        conn.execute("UPDATE drafts SET status = 'sent'")
+        conn.execute("DELETE FROM pets WHERE id LIKE 'filler-%'")
+        add_pet(conn, "c-new", "2026-03-03", "2026-02-01 00:00:00")
+    with db() as conn:
+        conn.execute("VACUUM")
+    asyncio.run(run_due_reminders(TODAY))
+
+    with db() as conn:
+        assert vaccination_drafts(conn) == ["a-due", "c-new"]
+
+    asyncio.run(run_due_reminders(date(2026, 4, 10)))
+    with db() as conn:
+        assert vaccination_drafts(conn) == ["a-due", "b-later", "c-new"]
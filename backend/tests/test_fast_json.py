@@ -0,0 +1,11 @@
+from services import fast_json
+
+ROWS = [{"id": "p1", "name": "Ñoño", "age": 3, "weight": 4.5, "tags": None, "ok": True}]
+
+def test_orjson_is_installed():
+    assert fast_json.orjson is not None
+
+def test_stdlib_fallback_writes_the_same_bytes(monkeypatch):
+    fast = fast_json.dumps(ROWS)
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert fast_json.dumps(ROWS) == fast
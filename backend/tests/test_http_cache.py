@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+import main
+from services.http_cache import etag_matches
+
+PET = {"name": "Rex", "ownerName": "Ada Okafor", "ownerPhone": "+2348012345678", "species": "Dog"}
+
+def test_matching_etag_gets_304_until_the_table_changes(db):
+    client = TestClient(main.app)
+    client.post("/api/pets", json=PET)
+    first = client.get("/api/pets")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and len(first.json()) == 1
+
+    unchanged = client.get("/api/pets", headers={"If-None-Match": etag})
+    assert (unchanged.status_code, unchanged.content, unchanged.headers["ETag"]) == (304, b"", etag)
+
+    # Any write path bumps the version, here a direct SQL update
+    with db() as conn:
+        conn.execute("UPDATE pets SET status = 'Overdue'")
+    changed = client.get("/api/pets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()[0]["status"] == "Overdue"
+
+def test_etag_depends_on_the_query_string(db):
+    client = TestClient(main.app)
+    etag = client.get("/api/pets").headers["ETag"]
+    assert client.get("/api/pets", params={"species": "Cat"}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
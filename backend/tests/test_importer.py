@@ -0,0 +1,20 @@
+from services.importer import import_file, new_job
+
+CSV = """Pet Name,Owner Name,Owner Phone,Species
+Rex,Ada Okafor,08012345678,Dog
+
+Bella,Ada Okafor,08012345678,Cat
+rex ,Ada Okafor,+2348012345678,Dog
+Milo,Ada Okafor,12ab,Cat
+"""
+
+def test_csv_import_merges_duplicates_and_reports_file_rows(db, tmp_path):
+    path = tmp_path / "pets.csv"
+    path.write_text(CSV)
+    job = import_file(str(path), "pets.csv", new_job("pets.csv"))
+
+    assert (job["status"], job["imported"], job["merged"], job["failed"]) == ("completed", 2, 1, 1)
+    # Line 3 is blank: Milo is still reported on line 6
+    assert job["errors"] == [{"row": 6, "error": "invalid phone number"}]
+    with db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM pets").fetchone()[0] == 2
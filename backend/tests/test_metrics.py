@@ -0,0 +1,16 @@
+from services import metrics
+from services.metrics import statement_labels
+
+def test_statement_labels():
+    assert statement_labels("SELECT * FROM pets WHERE id = ?") == ("select", "pets")
+    assert statement_labels("UPDATE OR IGNORE drafts SET status = ?") == ("update", "drafts")
+    assert statement_labels("CREATE INDEX IF NOT EXISTS idx_pets_created ON pets (created_at, id)") == ("ddl", "")
+    assert statement_labels("PRAGMA cache_size = -65536") == ("pragma", "")
+
+def test_migrations_add_no_series_per_schema_object(db):
+    with db() as conn:
+        conn.execute("SELECT COUNT(*) FROM pets").fetchone()
+    operations = {operation for operation, _ in metrics.SQL_STATEMENTS._series}
+    assert {"select", "ddl", "pragma"} <= operations
+    assert not operations & {"create", "alter", "drop"}
+    assert [table for operation, table in metrics.SQL_STATEMENTS._series if operation in ("ddl", "pragma")] == ["", ""]
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from services.normalize import canonical_phone, match_headers, normalize_frame, parse_dates
+from services.pet_store import dedup_key
+
+@pytest.mark.parametrize("value, expected", [
+    ("08012345678", "+2348012345678"),      # local, with trunk zero
+    ("0801 234 5678", "+2348012345678"),
+    (8012345678.0, "+2348012345678"),       # spreadsheet number, trunk zero dropped
+    ("8012345678", "+2348012345678"),
+    ("2348012345678", "+2348012345678"),    # country code without '+'
+    ("+234 801-234-5678", "+2348012345678"),
+    ("+44 7911 123456", "+447911123456"),   # international numbers keep their country
+    ("0044 7911 123456", "+447911123456"),
+    ("whatsapp:+2348012345678", "+2348012345678"),
+    ("12ab", None),
+    ("+1234", None),
+    ("", None),
+    (None, None),
+])
+def test_canonical_phone(value, expected):
+    assert canonical_phone(value) == expected
+
+@pytest.mark.parametrize("first, second", [
+    (("Rex", "+2348012345678", "Ada"), ("  rex ", "+2348012345678", "Someone else")),
+    (("Mr  Whiskers", "+2348012345678", None), ("mr whiskers", "+2348012345678", None)),
+    (("Rex", None, "Ada  Okafor"), ("REX", "", "ada okafor")),
+])
+def test_dedup_key_ignores_case_and_spacing(first, second):
+    assert dedup_key(*first) == dedup_key(*second) is not None
+
+@pytest.mark.parametrize("name, phone, owner", [
+    ("", "+2348012345678", "Ada"),
+    ("Rex", None, None),
+    ("Rex", "08012345678", "Unknown"),  # not canonical and no real owner name
+])
+def test_dedup_key_needs_a_name_and_an_owner(name, phone, owner):
+    assert dedup_key(name, phone, owner) is None
+
+def test_headers_match_aliases_and_near_misses():
+    mapping = match_headers(["Patient Name", "ownerPhone", "Client", "Next Vacination", "Notes"])
+    assert mapping == {
+        "Patient Name": "name", "ownerPhone": "ownerPhone", "Client": "ownerName",
+        "Next Vacination": "nextVaccinationDate",
+    }
+
+def test_frame_dates_and_rejections():
+    df = pd.DataFrame({
+        "Pet": ["Rex", "", "Milo", "Bella"],
+        "Owner": ["Ada", "Ada", "", "Ada"],
+        "Phone": ["08012345678", "08012345678", "12ab", None],
+        "Due Date": ["05/03/2026", "2026-03-05", "Mar 5 2026", "31/02/2026"],
+    })
+    clean, rejected = normalize_frame(df)
+    assert rejected == [(1, "missing pet name"), (2, "invalid phone number")]
+    assert clean["name"].tolist() == ["Rex", "Bella"]
+    assert clean["ownerPhone"].tolist()[0] == "+2348012345678"
+    assert clean["nextVaccinationDate"].fillna("").tolist() == ["2026-03-05", ""]
+
+def test_parse_dates_matches_the_scalar_parser():
+    values = ["2026-03-05", "05-03-2026", "March 5, 2026", "nope", None]
+    assert parse_dates(pd.Series(values, dtype=object)).fillna("").tolist() == [
+        "2026-03-05", "2026-03-05", "2026-03-05", "", ""
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from services import outbox
+from services.outbox import claim_batch, enqueue_draft, record_results
+
+def add_draft(conn, draft_id, status, pet_id="pet"):
+    conn.execute(
+        "INSERT OR IGNORE INTO pets (id, name, owner_name, owner_phone) VALUES ('pet', 'Rex', 'Ada', '+2348012345678')"
+    )
+    conn.execute(
+        "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, 'checkup', 'Hi', ?)",
+        (draft_id, pet_id, status)
+    )
+
+def draft_status(conn, draft_id):
+    return conn.execute("SELECT status FROM drafts WHERE id = ?", (draft_id,)).fetchone()[0]
+
+def test_failed_draft_requeues_its_dead_row(db):
+    with db() as conn:
+        add_draft(conn, "d1", "pending_review")
+        assert enqueue_draft(conn, "d1")
+        rows = claim_batch(conn, 10, time.time())
+        record_results(conn, rows, [{"success": False, "status_code": 400, "error": "bad"}], time.time())
+        assert draft_status(conn, "d1") == "failed"
+
+        assert enqueue_draft(conn, "d1", "Edited")
+        row = conn.execute("SELECT status, attempts, last_error, message FROM outbox WHERE draft_id = 'd1'").fetchone()
+        assert tuple(row) == ("pending", 0, None, "Edited")
+        assert draft_status(conn, "d1") == "queued"
+        assert conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 1
+
+def test_rejected_draft_can_be_approved(db):
+    with db() as conn:
+        add_draft(conn, "d1", "rejected")
+        assert enqueue_draft(conn, "d1")
+        assert draft_status(conn, "d1") == "queued"
+        assert conn.execute("SELECT status FROM outbox WHERE draft_id = 'd1'").fetchone()[0] == "pending"
+
+def test_nothing_queued_leaves_draft_unchanged(db):
+    with db() as conn:
+        add_draft(conn, "orphan", "failed", pet_id="deleted-pet")
+        assert not enqueue_draft(conn, "orphan", "Edited")
+        assert draft_status(conn, "orphan") == "failed"
+        assert conn.execute("SELECT draft_message FROM drafts WHERE id = 'orphan'").fetchone()[0] == "Hi"
+
+        add_draft(conn, "sent", "sent")
+        assert not enqueue_draft(conn, "sent")
+        assert not enqueue_draft(conn, "missing")
+
+def test_unconfigured_kapso_spends_no_attempts(db):
+    with db() as conn:
+        add_draft(conn, "d1", "pending_review")
+        enqueue_draft(conn, "d1")
+        rows = claim_batch(conn, 10, time.time())
+        record_results(conn, rows, [{"success": False, "error": "Kapso API key is missing", "not_configured": True}],
+                       time.time())
+        row = conn.execute("SELECT status, attempts FROM outbox WHERE draft_id = 'd1'").fetchone()
+        assert tuple(row) == ("pending", 0)
+        assert draft_status(conn, "d1") == "queued"
+
+def test_worker_claims_nothing_without_credentials(db, monkeypatch):
+    monkeypatch.setattr(outbox, "get_kapso_config", lambda: SimpleNamespace(error="Kapso API key is missing"))
+    with db() as conn:
+        add_draft(conn, "d1", "pending_review")
+        enqueue_draft(conn, "d1")
+
+    async def run():
+        outbox.start_worker()
+        await asyncio.sleep(0.2)
+        await outbox.stop_worker()
+
+    asyncio.run(run())
+    with db() as conn:
+        row = conn.execute("SELECT status, attempts FROM outbox WHERE draft_id = 'd1'").fetchone()
+    assert tuple(row) == ("pending", 0)
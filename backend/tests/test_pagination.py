@@ -0,0 +1,30 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.pagination import decode_cursor, encode_cursor
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor("2026-01-01 00:00:00", "id"), 2, (str, str)) == ["2026-01-01 00:00:00", "id"]
+    assert decode_cursor(encode_cursor(1.5, 3), 2) == [1.5, 3]
+
+@pytest.mark.parametrize("values", [[{"a": 1}, 2], [[1], "id"], [None, "id"], [True, "id"], ["a"], {"a": 1}])
+def test_rejects_non_scalar_values(values):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(values), 2)
+
+def test_rejects_wrong_types():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(1, "id"), 2, (str, str))
+
+@pytest.mark.parametrize("path", ["/api/pets", "/api/agent/drafts/archive"])
+def test_routes_answer_400_for_bad_cursors(db, path):
+    client = TestClient(main.app)
+    for cursor in (raw_cursor([{"a": 1}, 2]), "not-base64!", raw_cursor([1, 2])):
+        assert client.get(path, params={"cursor": cursor}).status_code == 400
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+import main
+from services.pet_store import merge_duplicates, pet_row, upsert_pets
+
+REX = {"name": "Rex", "ownerName": "Ada Okafor", "ownerPhone": "+2348012345678"}
+
+def upsert(db, **fields):
+    with db() as conn:
+        return upsert_pets(conn, [pet_row({**REX, **fields})])[0]
+
+def stored(db, pet_id, column):
+    with db() as conn:
+        return conn.execute(f"SELECT {column} FROM pets WHERE id = ?", (pet_id,)).fetchone()[0]
+
+def test_missing_fields_get_defaults_on_insert(db):
+    pet_id = upsert(db)
+    assert stored(db, pet_id, "status") == "Healthy"
+    assert stored(db, pet_id, "species") == "Dog"
+
+def test_explicit_default_overwrites_stored_value(db):
+    pet_id = upsert(db, status="Overdue", species="Cat")
+    assert stored(db, pet_id, "status") == "Overdue"
+
+    assert upsert(db, status="Healthy", species="Dog") == pet_id
+    assert stored(db, pet_id, "status") == "Healthy"
+    assert stored(db, pet_id, "species") == "Dog"
+
+def test_missing_or_blank_fields_keep_stored_value(db):
+    pet_id = upsert(db, status="Overdue", breed="Boerboel")
+    upsert(db, status=None, breed="  ")
+    upsert(db)
+    assert stored(db, pet_id, "status") == "Overdue"
+    assert stored(db, pet_id, "breed") == "Boerboel"
+
+def test_merge_keeps_values_over_duplicate_defaults(db):
+    with db() as conn:
+        conn.execute("DROP INDEX idx_pets_dedup_key")
+        conn.execute("UPDATE pets SET dedup_key = NULL")
+        for pet_id, species, status, created_at in (("kept", "Cat", "Overdue", "2020-01-01"),
+                                                     ("dupe", "Dog", "Healthy", "2021-01-01")):
+            conn.execute(
+                "INSERT INTO pets (id, name, owner_name, owner_phone, species, status, created_at) VALUES (?, 'Rex', 'Ada', ?, ?, ?, ?)",
+                (pet_id, REX["ownerPhone"], species, status, created_at)
+            )
+        assert merge_duplicates(conn)["merged"] == 1
+        rows = conn.execute("SELECT id, species, status FROM pets").fetchall()
+    assert [tuple(row) for row in rows] == [("kept", "Cat", "Overdue")]
+
+def test_reposting_a_pet_keeps_fields_left_out(db):
+    client = TestClient(main.app)
+    first = client.post("/api/pets", json={**REX, "species": "Dog", "sex": "Male", "color": "Brown",
+                                           "weight": "20kg", "status": "Sick"}).json()
+    again = client.post("/api/pets", json={**REX, "species": "Dog"}).json()
+    assert again["merged"] and again["id"] == first["id"]
+    assert [again[key] for key in ("sex", "color", "weight", "status")] == ["Male", "Brown", "20kg", "Sick"]
+
+    new = client.post("/api/pets", json={**REX, "name": "Bingo", "species": "Cat"}).json()
+    assert [new[key] for key in ("sex", "color", "weight", "status")] == ["Unknown", "Unknown", "Unknown", "Healthy"]
@@ -0,0 +1,16 @@
+import sqlite3
+
+from benchmarks.check_query_plans import FULL_SCAN, explain_all
+from services.migrations import run_migrations
+
+def test_no_unexpected_full_scans():
+    conn = sqlite3.connect(":memory:")
+    run_migrations(conn)
+    failures = [f"{label}: {' | '.join(plan)}" for label, plan, ok in explain_all(conn) if not ok]
+    conn.close()
+    assert not failures, "\n".join(failures)
+
+def test_full_scan_pattern():
+    assert FULL_SCAN.match("SCAN pets")
+    assert not FULL_SCAN.match("SCAN pets USING COVERING INDEX idx_pets_created")
+    assert not FULL_SCAN.match("SCAN CONSTANT ROW")
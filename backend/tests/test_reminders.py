@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+import main
+from services import gemini, response_cache
+
+BATCH = {"type": "vaccination", "clinicName": "Kizuna Vets", "bookingUrl": "https://book.example", "tone": "warm"}
+
+def add_pets(db, count):
+    with db() as conn:
+        conn.executemany(
+            "INSERT INTO pets (id, name, owner_name, owner_phone) VALUES (?, ?, 'Ada', ?)",
+            [(f"pet-{i}", f"Rex{i}", f"+23480100000{i}") for i in range(count)]
+        )
+    return [f"pet-{i}" for i in range(count)]
+
+def drafts(db):
+    with db() as conn:
+        return dict(conn.execute("SELECT pet_id, draft_message FROM drafts ORDER BY pet_id").fetchall())
+
+def test_malformed_batch_falls_back_to_per_pet_calls(db, monkeypatch):
+    response_cache.response_cache.clear_memory()
+    calls = []
+
+    async def generate(prompt, model_name=gemini.GEMINI_MODEL, generation_config=None, **kwargs):
+        calls.append("batch" if generation_config else "single")
+        return '[{"ref": 1, "message": "Hi' if generation_config else "Hi {owner_name}, {pet_name} is due! 💉"
+
+    monkeypatch.setattr(gemini, "generate", generate)
+    pet_ids = add_pets(db, 3)
+    result = TestClient(main.app).post("/api/reminders/generate-batch", json={**BATCH, "petIds": pet_ids}).json()
+
+    assert (result["drafts_created"], result["llm_calls"], result["fallbacks"]) == (3, 1, 3)
+    # The per-pet template is cached after the first call
+    assert calls == ["batch", "single"]
+    assert drafts(db) == {f"pet-{i}": f"Hi Ada, Rex{i} is due! 💉" for i in range(3)}
+
+def test_unreachable_model_uses_the_template_message(db, monkeypatch):
+    response_cache.response_cache.clear_memory()
+    calls = []
+
+    async def generate(prompt, model_name=gemini.GEMINI_MODEL, generation_config=None, **kwargs):
+        calls.append("batch" if generation_config else "single")
+        raise TimeoutError("Gemini timed out")
+
+    monkeypatch.setattr(gemini, "generate", generate)
+    pet_ids = add_pets(db, 2)
+    result = TestClient(main.app).post("/api/reminders/generate-batch", json={**BATCH, "petIds": pet_ids}).json()
+
+    assert (result["drafts_created"], result["fallbacks"]) == (2, 2)
+    assert calls == ["batch"]
+    assert drafts(db)["pet-0"] == gemini.fallback_reminder("Rex0", "Ada", "Kizuna Vets", "vaccination", "https://book.example")
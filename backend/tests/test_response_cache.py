@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from services import response_cache as cache_module
+from services.response_cache import ResponseCache, cache_key
+
+def use_clock(monkeypatch, start=1_000_000.0) -> list:
+    now = [start]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_memory_hit(db, monkeypatch):
+    use_clock(monkeypatch)
+    cache = ResponseCache(memory_entries=4)
+    key = cache_key("reminder", "model", "Kizuna", "vaccination")
+
+    async def run():
+        assert await cache.get(key) is None
+        await cache.put("reminder", key, "Hi {owner_name}")
+        return await cache.get(key)
+
+    assert asyncio.run(run()) == "Hi {owner_name}"
+    assert (cache.counters["misses"], cache.counters["memoryHits"], cache.counters["diskHits"]) == (1, 1, 0)
+
+def test_disk_hit_after_the_lru_evicts(db, monkeypatch):
+    use_clock(monkeypatch)
+    cache = ResponseCache(memory_entries=2)
+    keys = [cache_key("reminder", n) for n in range(3)]
+
+    async def run():
+        for n, key in enumerate(keys):
+            await cache.put("reminder", key, f"message {n}")
+        first = await cache.get(keys[0])
+        again = await cache.get(keys[0])
+        return first, again
+
+    assert asyncio.run(run()) == ("message 0", "message 0")
+    # Evicted from memory, read from llm_cache, then promoted
+    assert (cache.counters["evictions"], cache.counters["diskHits"], cache.counters["memoryHits"]) == (2, 1, 1)
+
+def test_entries_expire_after_their_ttl(db, monkeypatch):
+    now = use_clock(monkeypatch)
+    cache = ResponseCache()
+    key = cache_key("analytics", "model", {"pets": 3})
+
+    async def get_after(seconds):
+        now[0] += seconds
+        return await cache.get(key)
+
+    asyncio.run(cache.put("analytics", key, "Summary", ttl=60))
+    assert asyncio.run(get_after(59)) == "Summary"
+    assert asyncio.run(get_after(2)) is None
+    cache.clear_memory()
+    assert asyncio.run(get_after(0)) is None
+    assert cache.counters["misses"] == 2
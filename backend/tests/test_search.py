@@ -0,0 +1,40 @@
+from services.search import search_pets
+
+PETS = [
+    # id, name, owner, phone, breed
+    ("p1", "Maxwell", "Ada Okafor", "+2348011111111", "Poodle"),
+    ("p2", "Max", "Bayo Adeyemi", "+2348022222222", "Boerboel"),
+    ("p3", "Bella", "Max Power", "+2348033333333", "Persian"),
+    ("p4", "Rex", "Chidi Obi", "+2348044444444", "Maltese"),
+    ("p5", "Zoë", "Ada Okafor", "+2348055555555", "Mixed"),
+]
+
+def seed(conn):
+    conn.executemany(
+        "INSERT INTO pets (id, name, owner_name, owner_phone, breed) VALUES (?, ?, ?, ?, ?)", PETS
+    )
+
+def search(db, query):
+    with db() as conn:
+        return [pet["id"] for pet in search_pets(conn, query, ["id", "name"])]
+
+def test_prefix_matches_rank_pet_names_and_whole_words_first(db):
+    with db() as conn:
+        seed(conn)
+    # The pet named Max, then a pet name starting with it, then an owner named Max
+    assert search(db, "max") == ["p2", "p1", "p3"]
+    assert search(db, "maxw") == ["p1"]
+    # 'ma' also prefixes Maltese, a breed: weighted below names
+    assert search(db, "ma")[-1] == "p4"
+
+def test_every_term_must_match(db):
+    with db() as conn:
+        seed(conn)
+    assert search(db, "ada zo") == ["p5"]
+    assert search(db, "zoe") == ["p5"]  # diacritics folded
+    assert search(db, "nobody") == []
+
+def test_national_phone_prefix_finds_the_canonical_number(db):
+    with db() as conn:
+        seed(conn)
+    assert search(db, "0802222") == ["p2"]
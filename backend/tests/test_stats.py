@@ -0,0 +1,58 @@
+from datetime import date
+
+from services.stats import read_stats
+
+TODAY = date(2026, 3, 1)
+
+def recount(conn) -> dict:
+    """The same numbers, counted from the tables"""
+    def grouped(sql):
+        return {key: n for key, n in conn.execute(sql) if n}
+    return {
+        "total": conn.execute("SELECT COUNT(*) FROM pets").fetchone()[0],
+        "bySpecies": grouped("SELECT species, COUNT(*) FROM pets GROUP BY species"),
+        "overdue": conn.execute("SELECT COUNT(*) FROM pets WHERE next_vaccination_date < '2026-03-01'").fetchone()[0],
+        "dueIn7Days": conn.execute(
+            "SELECT COUNT(*) FROM pets WHERE next_vaccination_date BETWEEN '2026-03-01' AND '2026-03-08'"
+        ).fetchone()[0],
+        "byStatus": grouped("SELECT status, COUNT(*) FROM drafts GROUP BY status"),
+        "byType": grouped("SELECT type, COUNT(*) FROM drafts GROUP BY type"),
+    }
+
+def counters(conn) -> dict:
+    stats = read_stats(conn, TODAY)
+    pets, drafts = stats["pets"], stats["drafts"]
+    return {
+        "total": pets["total"], "bySpecies": pets["bySpecies"], "overdue": pets["overdue"],
+        "dueIn7Days": pets["dueIn7Days"], "byStatus": drafts["byStatus"], "byType": drafts["byType"],
+    }
+
+def test_counters_follow_inserts_updates_and_deletes(db):
+    with db() as conn:
+        conn.executemany(
+            "INSERT INTO pets (id, name, owner_name, owner_phone, species, next_vaccination_date) VALUES (?, ?, 'Ada', ?, ?, ?)",
+            [
+                ("p1", "Rex", "+2348010000001", "Dog", "2026-02-20"),
+                ("p2", "Tom", "+2348010000002", "Cat", "2026-03-04"),
+                ("p3", "Bo", "+2348010000003", "Dog", None),
+                ("p4", "Kiwi", "+2348010000004", "Bird", "2026-03-08"),
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO drafts (id, pet_id, type, draft_message, status) VALUES (?, ?, ?, 'Hi', ?)",
+            [("d1", "p1", "vaccination", "pending_review"), ("d2", "p2", "checkup", "queued"),
+             ("d3", "p4", "vaccination", "sent")]
+        )
+        assert counters(conn) == recount(conn)
+        assert counters(conn)["overdue"] == 1
+
+        conn.execute("UPDATE pets SET species = 'Cat', next_vaccination_date = '2026-03-02' WHERE id = 'p3'")
+        conn.execute("UPDATE pets SET next_vaccination_date = '2026-06-01' WHERE id = 'p1'")
+        conn.execute("UPDATE drafts SET status = 'sent' WHERE id = 'd2'")
+        conn.execute("UPDATE drafts SET type = 'checkup' WHERE id = 'd1'")
+        assert counters(conn) == recount(conn)
+
+        conn.execute("DELETE FROM pets WHERE id = 'p4'")
+        conn.execute("DELETE FROM drafts WHERE id = 'd2'")
+        assert counters(conn) == recount(conn)
+        assert counters(conn)["total"] == 3
@@ -0,0 +1,22 @@
+import io
+
+from PIL import Image
+
+from services.telegram_media import IMAGE_MAX_SIDE, prepare_image
+
+def encode(size, format="PNG") -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, "white").save(out, format=format)
+    return out.getvalue()
+
+def test_oversized_photo_is_downscaled_to_max_side():
+    data, mime = prepare_image(encode((IMAGE_MAX_SIDE * 3, IMAGE_MAX_SIDE * 2), "JPEG"))
+    assert mime == "image/jpeg"
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+    assert width == IMAGE_MAX_SIDE and round(IMAGE_MAX_SIDE * 2 / 3) == height
+
+def test_small_photo_keeps_its_size():
+    data, _ = prepare_image(encode((200, 100)), "image/png")
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.size) == ("JPEG", (200, 100))
@@ -34,12 +34,28 @@ const BACKEND_URL = import.meta.env.PROD
   ? "https://kizuna-wgbv.onrender.com/api" 
   : "http://127.0.0.1:5000/api";
 
+const PET_PAGE_SIZE = 50;
+// Only the columns the patient tables render (and reminders need)
+const PET_LIST_FIELDS = [
+  "id", "name", "species", "breed", "sex", "color", "age", "weight",
+  "ownerName", "ownerPhone", "status", "nextVaccinationDate",
+].join(",");
+const PET_STATUSES = ["Healthy", "Due Soon", "Overdue"];
+
+const petsUrl = (params: Record<string, string>) =>
+  `${BACKEND_URL}/pets?${new URLSearchParams({ fields: PET_LIST_FIELDS, ...params })}`;
+
 const App: React.FC = () => {
   const [showLanding, setShowLanding] = useState(true);
   const [activeTab, setActiveTab] = useState<
     "dashboard" | "pets" | "reminders" | "campaigns" | "settings"
   >("dashboard");
+  // Pages of the patient list loaded so far; X-Next-Cursor of the last one
   const [pets, setPets] = useState<Pet[]>([]);
+  const [petsCursor, setPetsCursor] = useState<string | null>(null);
+  const [isLoadingPets, setIsLoadingPets] = useState<boolean>(false);
+  const [petStatusFilter, setPetStatusFilter] = useState<string>("");
+  const [recentPets, setRecentPets] = useState<Pet[]>([]);
   const [reminders, setReminders] = useState<Reminder[]>(INITIAL_REMINDERS);
   const [aiInsight, setAiInsight] = useState<string>("");
   const [isGeneratingMessage, setIsGeneratingMessage] =
@@ -70,7 +86,14 @@ const App: React.FC = () => {
     whatsappNumber: settings.whatsapp_number || "2348000000000",
   };
 
-  const stats = {
+  // Server-side counters (/api/stats); local numbers until they arrive
+  const [serverStats, setServerStats] = useState<any>(null);
+  const stats = serverStats ? {
+    totalPets: serverStats.pets.total,
+    remindersSent: serverStats.reminders.sent,
+    conversionRate: serverStats.reminders.conversionRate,
+    estimatedRevenue: serverStats.reminders.conversions * 5000,
+  } : {
     totalPets: pets.length,
     remindersSent: reminders.length,
     conversionRate:
@@ -83,20 +106,41 @@ const App: React.FC = () => {
       reminders.filter((r) => r.status === "converted").length * 5000,
   };
 
-  const fetchPets = useCallback(async () => {
+  // First page of the patient list, or the page after `cursor` ("Load more")
+  const fetchPets = useCallback(async (cursor: string | null = null) => {
+    setIsLoadingPets(true);
+    try {
+      const params: Record<string, string> = { limit: String(PET_PAGE_SIZE) };
+      if (cursor) params.cursor = cursor;
+      if (petStatusFilter) params.status = petStatusFilter;
+      const response = await fetch(petsUrl(params));
+      if (!response.ok) return; // Backend issue
+      const page: Pet[] = (await response.json()) || [];
+      setPets((prev) => (cursor ? [...prev, ...page] : page));
+      setPetsCursor(response.headers.get("X-Next-Cursor"));
+    } catch (err) {
+      console.error("Backend connection failed:", err);
+    } finally {
+      setIsLoadingPets(false);
+    }
+  }, [petStatusFilter]);
+
+  // The dashboard's "Recent Patients" card needs only the newest few
+  const fetchRecentPets = useCallback(async () => {
     try {
-      const response = await fetch(`${BACKEND_URL}/pets`);
+      const response = await fetch(petsUrl({ limit: "5" }));
       if (response.ok) {
-        const data = await response.json();
-        setPets(data || []);
-      } else {
-        // Backend issue
+        setRecentPets((await response.json()) || []);
       }
     } catch (err) {
       console.error("Backend connection failed:", err);
     }
   }, []);
 
+  const refreshPets = useCallback(async () => {
+    await Promise.all([fetchPets(), fetchRecentPets()]);
+  }, [fetchPets, fetchRecentPets]);
+
   const fetchSettings = useCallback(async () => {
     try {
       const response = await fetch(`${BACKEND_URL}/settings`);
@@ -109,19 +153,35 @@ const App: React.FC = () => {
     }
   }, []);
 
+  const fetchStats = useCallback(async () => {
+    try {
+      const response = await fetch(`${BACKEND_URL}/stats`);
+      if (response.ok) {
+        setServerStats(await response.json());
+      }
+    } catch (err) {
+      console.error("Failed to fetch stats:", err);
+    }
+  }, []);
+
   useEffect(() => {
     fetchPets();
+  }, [fetchPets]);
+
+  useEffect(() => {
+    fetchRecentPets();
     fetchSettings();
+    fetchStats();
     const fetchInsight = async () => {
       try {
-        const summary = await getAnalyticsSummary(stats);
+        const summary = await getAnalyticsSummary();
         setAiInsight(summary);
       } catch (e) {
         setAiInsight("AI Insights temporarily unavailable.");
       }
     };
     fetchInsight();
-  }, [stats.remindersSent, fetchPets, fetchSettings]);
+  }, [stats.remindersSent, fetchRecentPets, fetchSettings, fetchStats]);
 
   const handleSendReminder = async (pet: Pet) => {
     setIsGeneratingMessage(true);
@@ -186,7 +246,7 @@ const App: React.FC = () => {
         // Since the backend returns camelCase ownerName but db has owner_name, 
         // and fetchPets handles mapping, it's safer to just fetch again or ensure the mapping here.
         // But map_pet handles it.
-        await fetchPets(); 
+        await refreshPets();
         setIsAddPetModalOpen(false);
         setNewPet({
           name: "",
@@ -221,6 +281,7 @@ const App: React.FC = () => {
       });
       if (response.ok) {
         setPets((prev) => prev.filter((p) => p.id !== petId));
+        setRecentPets((prev) => prev.filter((p) => p.id !== petId));
         showNotification("Patient record deleted.");
       } else {
         showNotification("Failed to delete pet.");
@@ -378,7 +439,7 @@ const App: React.FC = () => {
               {/* Main Content - Patients */}
               <div className="lg:col-span-2">
                 <PetList
-                  pets={pets.slice(0, 5)}
+                  pets={recentPets}
                   onSendReminder={handleSendReminder}
                   onDeletePet={handleDeletePet}
                   onViewAll={() => setActiveTab("pets")}
@@ -460,6 +521,17 @@ const App: React.FC = () => {
                 </p>
               </div>
               <div className="flex gap-3">
+                <select
+                  value={petStatusFilter}
+                  onChange={(e) => setPetStatusFilter(e.target.value)}
+                  className="bg-white text-ink border border-ink/10 px-4 py-3 rounded-2xl font-bold shadow-sm"
+                  aria-label="Filter patients by status"
+                >
+                  <option value="">All statuses</option>
+                  {PET_STATUSES.map((status) => (
+                    <option key={status} value={status}>{status}</option>
+                  ))}
+                </select>
                 <input
                   type="file"
                   id="excel-upload"
@@ -479,12 +551,12 @@ const App: React.FC = () => {
                         body: formData,
                       });
                       const data = await res.json();
-                      if (data.success) {
-                        alert(`Successfully imported ${data.count} patients!`);
+                      if (data.success && data.background) {
+                        alert("Large file received. Patients will appear on the dashboard as the import progresses.");
+                      } else if (data.success) {
+                        alert(`Successfully imported ${data.count} patients!` + (data.merged ? ` (${data.merged} existing patients updated)` : ""));
                         // Refresh pets list
-                        const resPets = await fetch(`${BACKEND_URL}/pets`);
-                        const updatedPets = await resPets.json();
-                        setPets(updatedPets);
+                        await refreshPets();
                       } else {
                         alert("Excel import failed: " + data.detail);
                       }
@@ -507,7 +579,13 @@ const App: React.FC = () => {
                 </button>
               </div>
             </div>
-            <PetList pets={pets} onSendReminder={handleSendReminder} onDeletePet={handleDeletePet} />
+            <PetList
+              pets={pets}
+              onSendReminder={handleSendReminder}
+              onDeletePet={handleDeletePet}
+              onLoadMore={petsCursor ? () => fetchPets(petsCursor) : undefined}
+              isLoading={isLoadingPets}
+            />
           </div>
         )}
 
@@ -487,6 +487,7 @@ export const CampaignHub: React.FC = () => {
                                     <option>Cats Only</option>
                                     <option>Overdue Patients</option>
                                     <option>Due This Month</option>
+                                    <option>Due in 14 Days</option>
                                 </select>
                             </div>
                             
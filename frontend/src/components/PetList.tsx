@@ -7,9 +7,12 @@ interface PetListProps {
   onSendReminder: (pet: Pet) => void;
   onDeletePet: (petId: string) => void;
   onViewAll?: () => void;
+  // Set while the server has another page (X-Next-Cursor)
+  onLoadMore?: () => void;
+  isLoading?: boolean;
 }
 
-export const PetList: React.FC<PetListProps> = ({ pets, onSendReminder, onDeletePet, onViewAll }) => {
+export const PetList: React.FC<PetListProps> = ({ pets, onSendReminder, onDeletePet, onViewAll, onLoadMore, isLoading }) => {
   return (
     <div className="bg-white rounded-[2rem] border border-slate-100 shadow-sm overflow-hidden animate-fade-in">
       <div className="p-8 border-b border-slate-50 flex items-center justify-between">
@@ -100,6 +103,19 @@ export const PetList: React.FC<PetListProps> = ({ pets, onSendReminder, onDelete
           </tbody>
         </table>
       </div>
+      {onLoadMore && (
+        <div className="p-6 border-t border-slate-50 flex justify-center">
+          <button
+            type="button"
+            onClick={onLoadMore}
+            disabled={isLoading}
+            className="text-sm font-bold text-marine hover:text-ink transition-colors disabled:opacity-50"
+            aria-label="Load more patient records"
+          >
+            {isLoading ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
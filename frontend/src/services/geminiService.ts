@@ -32,13 +32,10 @@ export const generateReminderMessage = async (
   }
 };
 
-export const getAnalyticsSummary = async (stats: any): Promise<string> => {
+// The backend summarizes its own /api/stats counters
+export const getAnalyticsSummary = async (): Promise<string> => {
   try {
-    const response = await fetch("http://127.0.0.1:5000/api/insights", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ stats })
-    });
+    const response = await fetch("http://127.0.0.1:5000/api/insights");
     const data = await response.json();
     return data.summary || "Keep up the good work! Increasing your reminders could lead to even more bookings.";
   } catch (error) {